@@ -1,23 +1,131 @@
+import sys
+import time
+
+# Início da importação, para o relatório de inicialização (--startup-report)
+STARTUP_START = time.perf_counter()
+
 import numpy as np
 import tkinter as tk
-from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
+from tkinter import ttk, messagebox, filedialog
+# Sem pyplot: a figura é criada direto e embutida no canvas Tk. mplot3d e
+# matplotlib.animation só são importados no primeiro uso (cena 3D / animação)
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.animation import FuncAnimation
-import matplotlib.patches as patches
+
+import vetorlab_batch as batches
+import vetorlab_datasets as datasets
+import vetorlab_engine as engine
+import vetorlab_exercises as exercises
+import vetorlab_pipeline as pipeline
+from vetorlab_analysis import analyze, full_explanation
+from vetorlab_profiler import FrameProfiler
+from vetorlab_resources import ResourceManager
+from vetorlab_store import QuestionnaireStore
+from vetorlab_tasks import TaskRunner
+from vetorlab_scene import make_scene, make_animation_scene, make_column_scene, BatchSummaryScene, \
+    ANIMATION_FRAMES
+
+# Intervalo mínimo entre renderizações da prévia ao vivo (ms)
+LIVE_PREVIEW_INTERVAL = 33
+
+# Dimensões aceitas no modo nD (vistas por projeção em 3D)
+MIN_ND_DIMENSION = 4
+MAX_DIMENSION = 64
+
+# Modos de interpolação da animação (rótulo na interface -> modo do engine)
+INTERPOLATION_MODES = {"Linear": "linear", "Logaritmo": "log", "Polar": "polar"}
+
+# Passo a Passo de verdade: Av montado coluna a coluna (v1·a1 + v2·a2 + …)
+COLUMN_STEP_MODE = "Colunas"
+
+# Densidade da grade deformada (rótulo na interface -> vetorlab_scene.GRID_DENSITIES)
+GRID_DENSITY_LABELS = {"Baixa": "low", "Média": "medium", "Alta": "high"}
+
+# Reamostragem da imagem (rótulo na interface -> método)
+RESAMPLE_METHODS = {"Bilinear": "bilinear", "Vizinho": "nearest"}
+
+# Atraso do primeiro gráfico: a janela aparece antes do desenho inicial (ms)
+FIRST_PLOT_DELAY = 20
+
+IMPORT_TIME = time.perf_counter() - STARTUP_START
+
+def compute_transformation(task, vector, matrix, animation=None):
+    # Executado fora da thread do Tk: só NumPy, nada de widgets nem da figura.
+    # `animation` = (modo de interpolação, decomposição ou None) quando o
+    # "Passo a Passo" está ativo: os quadros ficam prontos no cache
+    transformed_vector = engine.transform(matrix, vector)
+    task.progress(0.25, "Analisando a matriz")
+    explanation = full_explanation(vector, matrix, transformed_vector)
+    chain = None
+    if animation is not None:
+        task.progress(0.5, "Pré-calculando a animação")
+        mode, decomposition = animation
+        if mode == "columns":
+            # Quadros-chave e textos de todos os passos, uma vez por exercício
+            engine.column_steps(matrix, vector)
+            engine.column_step_texts(vector, matrix)
+        elif decomposition is None:
+            engine.animation_frames(matrix, vector, ANIMATION_FRAMES, mode=mode)
+        else:
+            chain = pipeline.decomposition_chain(matrix, decomposition)
+            chain.animation_frames(vector, mode=mode)
+    return {"vector": vector, "matrix": matrix, "transformed": transformed_vector, 
+            "explanation": explanation, "chain": chain}
+
+def compute_random_exercise(task, dim, rng):
+    # Exercício aleatório (mesmo gerador usado em lote) com a explicação pronta
+    exercise = exercises.generate_exercises(1, dim, seed=rng)
+    vector, matrix = exercise["vector"][0], exercise["matrix"][0]
+    transformed_vector = exercise["result"][0]
+    task.progress(0.5, "Analisando a matriz")
+    return {"vector": vector, "matrix": matrix, "transformed": transformed_vector, 
+            "explanation": full_explanation(vector, matrix, transformed_vector), "chain": None}
+
+def compute_batch_pair(task, vector, matrix, transformed_vector, answer_text=None):
+    # Par de um lote importado: Av já veio da passada em lote, falta a explicação
+    explanation = full_explanation(vector, matrix, transformed_vector)
+    if answer_text is not None:
+        explanation = answer_text + "\n\n" + explanation
+    return {"vector": vector, "matrix": matrix, "transformed": transformed_vector, 
+            "explanation": explanation, "chain": None}
 
 class VetorLabApp:
-    def __init__(self, root):
+    def __init__(self, root, startup_report=False, class_label=None):
         self.root = root
         self.root.title("VetorLab - Laboratório de Transformações Lineares")
         self.root.geometry("1100x750")
         
         # Configuração inicial
         self.dimension = tk.StringVar(value="2D")
+        self.nd_dimension = tk.IntVar(value=MIN_ND_DIMENSION)
+        self.view_axes_var = tk.StringVar(value="")
         self.vector_inputs = []
         self.transformation_matrix = []
-        self.animation = None
+        self.rng = np.random.default_rng()
+        
+        # Composição de transformações e animação ativa de uma cadeia
+        self.chain = pipeline.MatrixChain()
+        self.active_chain = None
         self.step_by_step = False
+        # Cena do Passo a Passo por colunas (avanço/retorno manual)
+        self.active_steps = None
+        
+        # Prévia ao vivo: variáveis das entradas e renderização pendente
+        self.live_var = tk.BooleanVar(value=False)
+        self.vector_vars = []
+        self.matrix_vars = []
+        self._last_preview = 0.0
+        
+        # Respostas do questionário: gravador criado no primeiro envio
+        self.class_label = class_label
+        self.store = None
+        
+        # Imagem ou nuvem de pontos transformada junto com os vetores
+        self.dataset = None
+        
+        # Lote de pares (matriz, vetor) importado e par exibido
+        self.batch = None
+        self.batch_index = 0
         
         # Criar widgets
         self.create_widgets()
@@ -36,11 +144,24 @@ class VetorLabApp:
         viz_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Controles de dimensão
-        ttk.Label(control_frame, text="Dimensão:").grid(row=0, column=0, sticky=tk.W)
-        ttk.Radiobutton(control_frame, text="2D", variable=self.dimension, value="2D", 
+        dimension_frame = ttk.Frame(control_frame)
+        dimension_frame.grid(row=0, column=0, columnspan=3, sticky=tk.W)
+        ttk.Label(dimension_frame, text="Dimensão:").grid(row=0, column=0, sticky=tk.W)
+        ttk.Radiobutton(dimension_frame, text="2D", variable=self.dimension, value="2D", 
                        command=self.update_dimension).grid(row=0, column=1, sticky=tk.W)
-        ttk.Radiobutton(control_frame, text="3D", variable=self.dimension, value="3D", 
+        ttk.Radiobutton(dimension_frame, text="3D", variable=self.dimension, value="3D", 
                        command=self.update_dimension).grid(row=0, column=2, sticky=tk.W)
+        ttk.Radiobutton(dimension_frame, text="nD", variable=self.dimension, value="nD", 
+                       command=self.update_dimension).grid(row=0, column=3, sticky=tk.W)
+        ttk.Spinbox(dimension_frame, from_=MIN_ND_DIMENSION, to=MAX_DIMENSION, width=4, 
+                    textvariable=self.nd_dimension, command=self.update_nd_dimension).grid(
+            row=0, column=4, sticky=tk.W)
+        
+        # Subespaço da vista em nD: vazio para PCA, ou três eixos (ex.: "1,2,5")
+        ttk.Label(dimension_frame, text="Eixos da vista nD:").grid(row=1, column=0, columnspan=2, sticky=tk.W)
+        view_axes_entry = ttk.Entry(dimension_frame, width=10, textvariable=self.view_axes_var)
+        view_axes_entry.grid(row=1, column=2, columnspan=3, sticky=tk.W)
+        view_axes_entry.bind("<Return>", lambda event: self.update_view_axes())
         
         # Entrada de vetores
         self.vector_frame = ttk.LabelFrame(control_frame, text="Vetor de Entrada", padding="10")
@@ -65,18 +186,61 @@ class VetorLabApp:
         
         self.step_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(control_frame, text="Passo a Passo", variable=self.step_var).grid(
-            row=6, column=0, columnspan=3, pady=5)
+            row=6, column=0, pady=5, sticky=tk.W)
+        self.interpolation_var = tk.StringVar(value=COLUMN_STEP_MODE)
+        ttk.Combobox(control_frame, textvariable=self.interpolation_var, 
+                     values=[COLUMN_STEP_MODE] + list(INTERPOLATION_MODES), state="readonly", width=10).grid(
+            row=6, column=1, pady=5, sticky=tk.W)
+        step_frame = ttk.Frame(control_frame)
+        step_frame.grid(row=6, column=2, pady=5, sticky=tk.W)
+        ttk.Button(step_frame, text="◀", width=2, command=lambda: self.step_columns(-1)).grid(row=0, column=0)
+        ttk.Button(step_frame, text="▶", width=2, command=lambda: self.step_columns(1)).grid(row=0, column=1)
+        
+        grid_frame = ttk.Frame(control_frame)
+        grid_frame.grid(row=7, column=0, pady=5, sticky=tk.W)
+        self.grid_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(grid_frame, text="Grade Deformada", variable=self.grid_var,
+                        command=self.toggle_deformed_grid).grid(row=0, column=0, sticky=tk.W)
+        # Alta = 200×200 retas em 2D; a média é a maior que mantém a animação fluida
+        self.grid_density_var = tk.StringVar(value="Média")
+        density = ttk.Combobox(grid_frame, textvariable=self.grid_density_var, 
+                               values=list(GRID_DENSITY_LABELS), state="readonly", width=6)
+        density.grid(row=0, column=1, padx=2)
+        density.bind("<<ComboboxSelected>>", lambda event: self.update_grid_density())
+        
+        # Retas invariantes (autovetores) e quadrado/cubo unitário com det(A)
+        self.analysis_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="Autovetores e det", variable=self.analysis_var,
+                        command=self.toggle_analysis).grid(
+            row=7, column=1, columnspan=2, pady=5, sticky=tk.W)
+        
+        ttk.Checkbutton(control_frame, text="Prévia ao Vivo", variable=self.live_var,
+                        command=self.schedule_live_preview).grid(
+            row=8, column=0, pady=5, sticky=tk.W)
+        
+        # Instrumentação: overlay de FPS/latência e exportação dos tempos
+        self.overlay_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="Desempenho", variable=self.overlay_var,
+                        command=self.toggle_overlay).grid(row=8, column=1, pady=5, sticky=tk.W)
+        ttk.Button(control_frame, text="Exportar Tempos", command=self.export_timings).grid(
+            row=8, column=2, pady=5, sticky=tk.W)
         
         ttk.Button(control_frame, text="Gerar Exercício Aleatório", command=self.generate_random_exercise).grid(
-            row=7, column=0, columnspan=3, pady=10, sticky=tk.EW)
+            row=9, column=0, columnspan=3, pady=10, sticky=tk.EW)
         
         ttk.Button(control_frame, text="Questionário Avaliativo", command=self.show_questionnaire).grid(
-            row=8, column=0, columnspan=3, pady=5, sticky=tk.EW)
+            row=10, column=0, columnspan=3, pady=5, sticky=tk.EW)
         
         # Área de visualização
-        self.fig = plt.figure(figsize=(7, 7), tight_layout=True)
+        self.fig = Figure(figsize=(7, 7), tight_layout=True)
         self.canvas = FigureCanvasTkAgg(self.fig, master=viz_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.profiler = FrameProfiler(self.canvas)
+        
+        # Figura, cenas, animação, janelas e jobs do Tk têm um único dono
+        self.resources = ResourceManager(self.root, self.fig, self.profiler)
+        self.root.protocol("WM_DELETE_WINDOW", self.resources.close)
+        self.root.bind("<F12>", self.show_resources)
         
         # Área de explicação
         explanation_frame = ttk.Frame(viz_frame)
@@ -87,26 +251,102 @@ class VetorLabApp:
                                      wraplength=600, justify=tk.LEFT, padding=(5, 5))
         explanation_label.pack(fill=tk.X)
         
+        # Composição de transformações (A1 aplicada primeiro)
+        chain_frame = ttk.LabelFrame(control_frame, text="Composição", padding="5")
+        chain_frame.grid(row=11, column=0, columnspan=3, pady=5, sticky=tk.EW)
+        self.chain_list = tk.Listbox(chain_frame, height=4, width=30, exportselection=False)
+        self.chain_list.grid(row=0, column=0, columnspan=4, sticky=tk.EW)
+        ttk.Button(chain_frame, text="Adicionar", width=8, command=self.add_chain_stage).grid(row=1, column=0)
+        ttk.Button(chain_frame, text="Atualizar", width=8, command=self.update_chain_stage).grid(row=1, column=1)
+        ttk.Button(chain_frame, text="Remover", width=8, command=self.remove_chain_stage).grid(row=1, column=2)
+        ttk.Button(chain_frame, text="Limpar", width=8, command=self.clear_chain).grid(row=1, column=3)
+        
+        ttk.Label(chain_frame, text="Decomposição:").grid(row=2, column=0, columnspan=2, sticky=tk.W)
+        self.decomposition_var = tk.StringVar(value="Nenhuma")
+        ttk.Combobox(chain_frame, textvariable=self.decomposition_var, values=["Nenhuma", "SVD", "Polar"], 
+                     state="readonly", width=10).grid(row=2, column=2, columnspan=2, sticky=tk.W)
+        
+        ttk.Button(chain_frame, text="Animar Cadeia", command=self.animate_chain).grid(
+            row=3, column=0, columnspan=4, pady=5, sticky=tk.EW)
+        self.scrub_var = tk.DoubleVar(value=0.0)
+        ttk.Scale(chain_frame, from_=0.0, to=1.0, variable=self.scrub_var, orient=tk.HORIZONTAL, 
+                  command=self.scrub_chain).grid(row=4, column=0, columnspan=4, sticky=tk.EW)
+        
+        # Imagem ou nuvem de pontos (CSV/NPY) transformada pela matriz atual
+        data_frame = ttk.LabelFrame(control_frame, text="Imagem / Pontos", padding="5")
+        data_frame.grid(row=12, column=0, columnspan=3, pady=5, sticky=tk.EW)
+        ttk.Button(data_frame, text="Carregar", width=8, command=self.load_dataset).grid(row=0, column=0)
+        ttk.Button(data_frame, text="Remover", width=8, command=self.remove_dataset).grid(row=0, column=1)
+        self.resample_var = tk.StringVar(value="Bilinear")
+        resample = ttk.Combobox(data_frame, textvariable=self.resample_var, values=list(RESAMPLE_METHODS), 
+                                state="readonly", width=8)
+        resample.grid(row=0, column=2, padx=2)
+        resample.bind("<<ComboboxSelected>>", lambda event: self.update_resample())
+        
+        # Lote de pares (CSV/NPY/NPZ): navegação par a par e visão geral
+        batch_frame = ttk.LabelFrame(control_frame, text="Lote de Pares", padding="5")
+        batch_frame.grid(row=13, column=0, columnspan=3, pady=5, sticky=tk.EW)
+        ttk.Button(batch_frame, text="Importar", width=8, command=self.import_batch).grid(row=0, column=0)
+        ttk.Button(batch_frame, text="Fechar", width=8, command=self.close_batch).grid(row=0, column=1)
+        self.summary_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(batch_frame, text="Resumo", variable=self.summary_var, 
+                        command=self.toggle_batch_summary).grid(row=0, column=2, columnspan=2, sticky=tk.W)
+        ttk.Button(batch_frame, text="◀", width=2, command=lambda: self.step_batch(-1)).grid(row=1, column=0)
+        self.batch_scrub_var = tk.DoubleVar(value=0.0)
+        self.batch_scale = ttk.Scale(batch_frame, from_=0, to=0, variable=self.batch_scrub_var, 
+                                     orient=tk.HORIZONTAL, command=self.scrub_batch)
+        self.batch_scale.grid(row=1, column=1, columnspan=2, sticky=tk.EW)
+        ttk.Button(batch_frame, text="▶", width=2, command=lambda: self.step_batch(1)).grid(row=1, column=3)
+        self.batch_var = tk.StringVar(value="Nenhum lote")
+        ttk.Label(batch_frame, textvariable=self.batch_var).grid(row=2, column=0, columnspan=4, sticky=tk.W)
+        
         # Status bar
         self.status_var = tk.StringVar(value="Pronto")
-        ttk.Label(control_frame, textvariable=self.status_var).grid(row=9, column=0, columnspan=3, pady=10)
+        ttk.Label(control_frame, textvariable=self.status_var).grid(row=14, column=0, columnspan=3, pady=10)
         
-        # Inicializar plot
+        # Cálculos fora da thread do Tk; resultados e progresso voltam por fila
+        self.tasks = self.resources.register(TaskRunner(self.resources, self.status_var))
+        
+        # Inicializar plot depois que a janela for exibida
+        self.startup_report = startup_report
+        self.startup_times = {"importações": IMPORT_TIME, 
+                              "janela": time.perf_counter() - STARTUP_START}
+        self.root.after(FIRST_PLOT_DELAY, self.first_plot)
+    
+    def first_plot(self):
+        # A medição só começa com a cena montada: desenhos anteriores (o
+        # <Configure> do Tk) são da figura ainda vazia
         self.update_plot()
+        self._startup_cid = self.canvas.mpl_connect('draw_event', self.startup_drawn)
+    
+    def startup_drawn(self, event):
+        # Primeiro desenho completo da figura: fim da inicialização
+        self.canvas.mpl_disconnect(self._startup_cid)
+        self.startup_times["primeiro gráfico"] = time.perf_counter() - STARTUP_START
+        loaded = [name for name in ("matplotlib.pyplot", "matplotlib.animation", "mpl_toolkits.mplot3d") 
+                  if name in sys.modules]
+        self.startup_times["módulos pesados carregados"] = ", ".join(loaded) or "nenhum"
+        if self.startup_report:
+            for phase, value in self.startup_times.items():
+                print(f"{phase:28s} {value * 1e3:8.1f} ms" if isinstance(value, float) else 
+                      f"{phase:28s} {value}")
     
     def create_vector_inputs(self):
         # Limpar inputs existentes e redefinir lista
         for widget in self.vector_frame.winfo_children():
             widget.destroy()
         self.vector_inputs = []
+        self.vector_vars = []
         
         # Criar novos inputs baseados na dimensão
-        dim = 2 if self.dimension.get() == "2D" else 3
+        dim = self.get_dim()
+        parent = self.vector_frame if dim <= 3 else self.create_scrollable(self.vector_frame)
         
         for i in range(dim):
-            ttk.Label(self.vector_frame, text=f"Componente {i+1}:").grid(row=i, column=0, padx=5, pady=2)
-            entry = ttk.Entry(self.vector_frame, width=10)
-            entry.insert(0, "0.0")
+            ttk.Label(parent, text=f"Componente {i+1}:").grid(row=i, column=0, padx=5, pady=2)
+            var = self.make_input_var("0.0")
+            self.vector_vars.append(var)
+            entry = ttk.Entry(parent, width=10, textvariable=var)
             entry.grid(row=i, column=1, padx=5, pady=2)
             self.vector_inputs.append(entry)
     
@@ -115,25 +355,123 @@ class VetorLabApp:
         for widget in self.matrix_frame.winfo_children():
             widget.destroy()
         self.transformation_matrix = []
+        self.matrix_vars = []
         
         # Criar novos inputs baseados na dimensão
-        dim = 2 if self.dimension.get() == "2D" else 3
+        dim = self.get_dim()
+        parent = self.matrix_frame if dim <= 3 else self.create_scrollable(self.matrix_frame)
+        width = 8 if dim <= 3 else 5
         
         for i in range(dim):
             row = []
             for j in range(dim):
-                entry = ttk.Entry(self.matrix_frame, width=8)
-                entry.insert(0, "1.0" if i == j else "0.0")
+                var = self.make_input_var("1.0" if i == j else "0.0")
+                self.matrix_vars.append(var)
+                entry = ttk.Entry(parent, width=width, textvariable=var)
                 entry.grid(row=i, column=j, padx=2, pady=2)
                 row.append(entry)
             self.transformation_matrix.append(row)
     
+    def create_scrollable(self, parent, width=300, height=160):
+        # Área com barras de rolagem para as grades de entradas em nD
+        canvas = tk.Canvas(parent, width=width, height=height, highlightthickness=0)
+        y_scroll = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=canvas.yview)
+        x_scroll = ttk.Scrollbar(parent, orient=tk.HORIZONTAL, command=canvas.xview)
+        canvas.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
+        canvas.grid(row=0, column=0)
+        y_scroll.grid(row=0, column=1, sticky=tk.NS)
+        x_scroll.grid(row=1, column=0, sticky=tk.EW)
+        
+        inner = ttk.Frame(canvas)
+        canvas.create_window((0, 0), window=inner, anchor=tk.NW)
+        inner.bind("<Configure>", lambda event: canvas.configure(scrollregion=canvas.bbox("all")))
+        return inner
+    
+    def update_nd_dimension(self):
+        # O seletor de d só tem efeito no modo nD
+        if self.dimension.get() == "nD":
+            self.update_dimension()
+    
+    def get_dim(self):
+        if self.dimension.get() == "2D":
+            return 2
+        if self.dimension.get() == "3D":
+            return 3
+        try:
+            dim = int(self.nd_dimension.get())
+        except (tk.TclError, ValueError):
+            dim = MIN_ND_DIMENSION
+        return min(max(dim, MIN_ND_DIMENSION), MAX_DIMENSION)
+    
+    def get_view_axes(self):
+        # Eixos digitados a partir de 1; None (PCA) se vazio ou inválido
+        text = self.view_axes_var.get().strip()
+        if not text:
+            return None
+        try:
+            axes = tuple(int(x) - 1 for x in text.replace(";", ",").split(","))
+        except ValueError:
+            return None
+        dim = self.get_dim()
+        if len(axes) != 3 or len(set(axes)) != 3 or not all(0 <= a < dim for a in axes):
+            return None
+        return axes
+    
+    def update_view_axes(self):
+        dim = self.get_dim()
+        scene = self.resources.scenes.get(dim)
+        if dim > 3 and scene is not None and scene.is_alive():
+            scene.set_view_axes(self.get_view_axes())
+        if self.get_view_axes() is None and self.view_axes_var.get().strip():
+            self.status_var.set("Eixos da vista inválidos: usando PCA")
+    
+    def make_input_var(self, value):
+        # Cada edição agenda a prévia ao vivo (se ativada)
+        var = tk.StringVar(value=value)
+        var.trace_add("write", self.schedule_live_preview)
+        return var
+    
+    def schedule_live_preview(self, *args):
+        if not self.live_var.get():
+            return
+        # Uma nova edição substitui a renderização pendente; o atraso garante no
+        # máximo uma renderização por intervalo e a prévia sempre lê a entrada mais recente
+        elapsed = (time.perf_counter() - self._last_preview) * 1000
+        delay = int(max(0, LIVE_PREVIEW_INTERVAL - elapsed))
+        self.resources.schedule("preview", delay, self.live_preview)
+    
+    def live_preview(self):
+        self._last_preview = time.perf_counter()
+        
+        # Validação silenciosa: sem messagebox a cada tecla
+        vector = self.get_vector(show_errors=False)
+        matrix = self.get_matrix(show_errors=False)
+        if vector is None or matrix is None or len(vector) != len(matrix) or \
+                any(len(row) != len(vector) for row in matrix):
+            self.status_var.set("Prévia: entrada inválida")
+            return
+        
+        # Mesma chave da transformação: uma edição nova descarta o cálculo pendente
+        self.tasks.submit("transform", compute_transformation, vector, matrix, 
+                          on_done=lambda result: self.show_result(result, "Prévia"))
+    
     def update_dimension(self):
         self.create_vector_inputs()
         self.create_matrix_inputs()
         self.update_plot()
     
-    def get_vector(self):
+    def set_dim(self, dim):
+        # Ajusta o seletor de dimensão (ex.: para um par importado) e recria as entradas
+        if dim == self.get_dim():
+            return
+        if dim in (2, 3):
+            self.dimension.set(f"{dim}D")
+        else:
+            self.dimension.set("nD")
+            self.nd_dimension.set(dim)
+        self.update_dimension()
+    
+    def get_vector(self, show_errors=True):
         try:
             # Verificar se as entradas ainda existem antes de acessá-las
             valid_entries = []
@@ -147,13 +485,15 @@ class VetorLabApp:
             
             return [float(entry.get()) for entry in valid_entries]
         except ValueError:
-            messagebox.showerror("Erro", "Por favor, insira valores numéricos para o vetor.")
+            if show_errors:
+                messagebox.showerror("Erro", "Por favor, insira valores numéricos para o vetor.")
             return None
         except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao acessar entradas: {str(e)}")
+            if show_errors:
+                messagebox.showerror("Erro", f"Erro ao acessar entradas: {str(e)}")
             return None
     
-    def get_matrix(self):
+    def get_matrix(self, show_errors=True):
         try:
             matrix = []
             for row in self.transformation_matrix:
@@ -169,10 +509,12 @@ class VetorLabApp:
                     matrix.append(matrix_row)
             return matrix
         except ValueError:
-            messagebox.showerror("Erro", "Por favor, insira valores numéricos para a matriz.")
+            if show_errors:
+                messagebox.showerror("Erro", "Por favor, insira valores numéricos para a matriz.")
             return None
         except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao acessar matriz: {str(e)}")
+            if show_errors:
+                messagebox.showerror("Erro", f"Erro ao acessar matriz: {str(e)}")
             return None
     
     def apply_transformation(self):
@@ -187,335 +529,477 @@ class VetorLabApp:
             messagebox.showerror("Erro", "Dimensões incompatíveis entre vetor e matriz")
             return
         
-        # Aplicar transformação
-        try:
-            transformed_vector = np.dot(matrix, vector)
-        except ValueError:
-            messagebox.showerror("Erro", "Dimensões incompatíveis para multiplicação matriz-vetor")
+        # Aplicar transformação em segundo plano (pedidos anteriores são descartados)
+        animation = None
+        if self.step_var.get() and self.interpolation_var.get() == COLUMN_STEP_MODE:
+            animation = ("columns", None)
+        elif self.step_var.get():
+            animation = (self.get_interpolation(), 
+                         {"SVD": "svd", "Polar": "polar"}.get(self.decomposition_var.get()))
+        self.tasks.submit("transform", compute_transformation, vector, matrix, animation, 
+                          on_done=lambda result: self.show_result(result, "Transformação aplicada", 
+                                                                  animate=animation is not None), 
+                          on_error=self.transformation_failed, label="Calculando transformação")
+    
+    def show_result(self, result, status, animate=False):
+        # Thread do Tk: resultado de compute_transformation/compute_random_exercise
+        vector, matrix = result["vector"], result["matrix"]
+        transformed_vector = result["transformed"]
+        if len(vector) != self.get_dim():
+            # A dimensão mudou enquanto a tarefa rodava
             return
         
-        # Atualizar visualização
+        # Atualizar visualização, status e explicação
         self.update_plot(vector, transformed_vector, matrix)
+        self.status_var.set(f"{status}: {transformed_vector}")
+        self.explanation_var.set(result["explanation"])
         
-        # Atualizar status
-        self.status_var.set(f"Transformação aplicada: {transformed_vector}")
-        
-        # Gerar explicação
-        self.generate_explanation(vector, matrix, transformed_vector)
-        
-        # Animar se necessário
-        if self.step_var.get():
-            self.animate_transformation(vector, matrix, transformed_vector)
+        # Animar se necessário (quadros já calculados pela tarefa)
+        if animate:
+            self.animate_transformation(vector, matrix, transformed_vector, chain=result["chain"])
     
-    def generate_explanation(self, vector, matrix, transformed_vector):
-        dim = len(vector)
+    def transformation_failed(self, error):
+        if isinstance(error, ValueError):
+            messagebox.showerror("Erro", "Dimensões incompatíveis para multiplicação matriz-vetor")
+        else:
+            messagebox.showerror("Erro", f"Falha no cálculo: {error}")
+    
+    def stop_animation(self):
+        self.resources.stop_animation()
+    
+    def add_chain_stage(self):
+        matrix = self.get_matrix()
+        if matrix is None:
+            return
+        try:
+            self.chain.append(matrix)
+        except ValueError:
+            messagebox.showerror("Erro", "Todas as etapas da cadeia devem ter a mesma dimensão")
+            return
+        self.refresh_chain_list()
+    
+    def update_chain_stage(self):
+        selection = self.chain_list.curselection()
+        if not selection:
+            self.status_var.set("Selecione uma etapa da cadeia")
+            return
+        matrix = self.get_matrix()
+        if matrix is None:
+            return
+        try:
+            # Só os produtos a partir desta etapa são recalculados
+            self.chain.set_stage(selection[0], matrix)
+        except ValueError:
+            messagebox.showerror("Erro", "Todas as etapas da cadeia devem ter a mesma dimensão")
+            return
+        self.refresh_chain_list()
+    
+    def remove_chain_stage(self):
+        selection = self.chain_list.curselection()
+        if selection:
+            self.chain.remove(selection[0])
+            self.refresh_chain_list()
+    
+    def clear_chain(self):
+        self.chain.clear()
+        self.refresh_chain_list()
+    
+    def refresh_chain_list(self):
+        self.chain_list.delete(0, tk.END)
+        for label, stage in zip(self.chain.labels, self.chain.stages):
+            rows = "; ".join(" ".join(f"{x:.2g}" for x in row) for row in stage)
+            self.chain_list.insert(tk.END, f"{label}: [{rows}]")
+        self.status_var.set(f"Cadeia com {len(self.chain)} etapa(s)")
+    
+    def animate_chain(self):
+        vector = self.get_vector()
+        if vector is None:
+            return
+        if not len(self.chain):
+            messagebox.showerror("Erro", "Adicione ao menos uma matriz à cadeia")
+            return
+        if len(vector) != self.chain.dim:
+            messagebox.showerror("Erro", "Dimensões incompatíveis entre vetor e cadeia")
+            return
+        self.play_chain(self.chain, vector)
+    
+    def play_chain(self, chain, vector):
+        # Anima a cadeia etapa por etapa; os caminhos de cada etapa vêm do cache da cadeia
+        self.resources.clear_figure()
+        product = chain.product()
+        scene = make_animation_scene(self.fig, vector, product, 
+                                     view_axes=self.get_view_axes(), 
+                                     show_grid=self.grid_var.get(), 
+                                     grid_density=self.get_grid_density(), 
+                                     buffer=chain.animation_frames(vector, mode=self.get_interpolation()), 
+                                     analysis=analyze(product) if self.analysis_var.get() else None, 
+                                     dataset=self.dataset)
+        self.active_chain = (chain, scene)
+        self.scrub_var.set(0.0)
         
-        explanation = "Transformação Linear:\n"
-        explanation += f"Vetor original: v = {vector}\n"
-        explanation += f"Matriz de transformação: A = \n"
+        self.start_animation(scene, "chain")
+        self.status_var.set(" → ".join(chain.labels))
+    
+    def scrub_chain(self, value):
+        # Arrastar a linha do tempo pausa a animação e mostra o quadro escolhido
+        if self.active_chain is None:
+            return
+        chain, scene = self.active_chain
+        if scene.ax not in self.fig.axes:
+            self.active_chain = None
+            return
+        self.stop_animation()
+        frame = round(float(value) * (len(scene) - 1))
+        scene.show_frame(frame)
+        stage = chain.stage_at(frame)
+        self.status_var.set(f"Etapa {stage + 1}/{len(chain)}: {chain.labels[stage]}")
+    
+    def get_interpolation(self):
+        # "Colunas" não é um caminho entre I e A: cadeias e decomposições usam o linear
+        return INTERPOLATION_MODES.get(self.interpolation_var.get(), "linear")
+    
+    def animate_transformation(self, original_vector, matrix, transformed_vector, chain=None):
+        if self.interpolation_var.get() == COLUMN_STEP_MODE:
+            self.play_columns(original_vector, matrix)
+            return
         
-        for i in range(dim):
-            explanation += "[" + "  ".join([f"{x:.2f}" for x in matrix[i]]) + "]\n"
+        # Decomposição escolhida: animar as etapas da fatoração de A
+        kind = {"SVD": "svd", "Polar": "polar"}.get(self.decomposition_var.get())
+        if kind is not None:
+            self.play_chain(chain or pipeline.decomposition_chain(matrix, kind), original_vector)
+            return
         
-        explanation += "\nOperação realizada: Av = \n"
+        # Parar e liberar a animação anterior e as cenas do gráfico
+        self.resources.clear_figure()
+        self.active_chain = None
         
-        # Mostrar cálculo passo a passo
-        for i in range(dim):
-            terms = [f"{matrix[i][j]:.2f}×{vector[j]:.2f}" for j in range(dim)]
-            result = sum(matrix[i][j] * vector[j] for j in range(dim))
-            explanation += f"= ({' + '.join(terms)}) = {result:.2f}\n"
+        analysis = analyze(matrix)
+        interpolation = self.get_interpolation()
         
-        explanation += f"\nResultado: Av = {transformed_vector}"
+        # Configurar animação: artistas criados uma vez, quadros pré-calculados
+        scene = make_animation_scene(self.fig, original_vector, matrix, 
+                                     view_axes=self.get_view_axes(), 
+                                     show_grid=self.grid_var.get(), 
+                                     grid_density=self.get_grid_density(), 
+                                     interpolation=interpolation, 
+                                     analysis=analysis if self.analysis_var.get() else None, 
+                                     dataset=self.dataset)
         
-        self.explanation_var.set(explanation)
+        self.start_animation(scene, "animation")
+        if interpolation == "log" and not analysis.has_real_log:
+            self.status_var.set("A não tem logaritmo real (autovalor ≤ 0): animando pelo caminho polar")
     
-    def animate_transformation(self, original_vector, matrix, transformed_vector):
-        # Parar qualquer animação existente
-        if self.animation is not None:
-            try:
-                self.animation.event_source.stop()
-            except:
-                pass
-        
-        dim = len(original_vector)
-        
-        # Configurar animação
-        self.fig.clf()
-        
-        if dim == 2:
-            ax = self.fig.add_subplot(111)
-            ax.set_xlim(-5, 5)
-            ax.set_ylim(-5, 5)
-            ax.axhline(0, color='black', linewidth=0.5)
-            ax.axvline(0, color='black', linewidth=0.5)
-            ax.grid(True)
-            ax.set_title('Transformação Linear - Animação')
-            ax.set_xlabel('Eixo X')
-            ax.set_ylabel('Eixo Y')
-            
-            # Vetores base
-            base_x = np.array([1, 0])
-            base_y = np.array([0, 1])
-            trans_base_x = np.dot(matrix, base_x)
-            trans_base_y = np.dot(matrix, base_y)
-            
-            # Elementos de animação
-            orig_vector_plot = ax.quiver(0, 0, 0, 0, color='blue', scale=1, scale_units='xy', angles='xy')
-            trans_vector_plot = ax.quiver(0, 0, 0, 0, color='red', scale=1, scale_units='xy', angles='xy')
-            base_x_plot = ax.quiver(0, 0, 0, 0, color='gray', scale=1, scale_units='xy', angles='xy')
-            base_y_plot = ax.quiver(0, 0, 0, 0, color='gray', scale=1, scale_units='xy', angles='xy')
-            trans_base_x_plot = ax.quiver(0, 0, 0, 0, color='green', linestyle='--', scale=1, scale_units='xy', angles='xy')
-            trans_base_y_plot = ax.quiver(0, 0, 0, 0, color='green', linestyle='--', scale=1, scale_units='xy', angles='xy')
-            
-            # Adicionar legendas
-            ax.legend([orig_vector_plot, trans_vector_plot, trans_base_x_plot], 
-                     ['Vetor Original', 'Vetor Transformado', 'Base Transformada'],
-                     loc='upper right')
-            
-            # Função de animação
-            def update(frame):
-                progress = frame / 100
-                
-                # Vetor original (estático)
-                orig_vector_plot.set_UVC(original_vector[0], original_vector[1])
-                
-                # Base transformada animada
-                current_base_x = base_x * (1 - progress) + trans_base_x * progress
-                current_base_y = base_y * (1 - progress) + trans_base_y * progress
-                
-                base_x_plot.set_UVC(current_base_x[0], current_base_x[1])
-                base_y_plot.set_UVC(current_base_y[0], current_base_y[1])
-                trans_base_x_plot.set_UVC(current_base_x[0], current_base_x[1])
-                trans_base_y_plot.set_UVC(current_base_y[0], current_base_y[1])
-                
-                # Vetor transformado animado
-                current_transformed = np.array(original_vector) * (1 - progress) + np.array(transformed_vector) * progress
-                trans_vector_plot.set_UVC(current_transformed[0], current_transformed[1])
-                
-                return orig_vector_plot, trans_vector_plot, base_x_plot, base_y_plot, trans_base_x_plot, trans_base_y_plot
-            
-            # Criar animação
-            self.animation = FuncAnimation(self.fig, update, frames=100, 
-                                          interval=20/self.animation_speed.get(), 
-                                          blit=True)
-            
-        else:  # 3D
-            ax = self.fig.add_subplot(111, projection='3d')
-            ax.set_xlim(-5, 5)
-            ax.set_ylim(-5, 5)
-            ax.set_zlim(-5, 5)
-            ax.set_title('Transformação Linear 3D - Animação')
-            ax.set_xlabel('Eixo X')
-            ax.set_ylabel('Eixo Y')
-            ax.set_zlabel('Eixo Z')
-            
-            # Função de animação
-            def update(frame):
-                ax.cla()
-                ax.set_xlim(-5, 5)
-                ax.set_ylim(-5, 5)
-                ax.set_zlim(-5, 5)
-                ax.set_title('Transformação Linear 3D - Animação')
-                ax.set_xlabel('Eixo X')
-                ax.set_ylabel('Eixo Y')
-                ax.set_zlabel('Eixo Z')
-                
-                progress = frame / 100
-                
-                # Plotar base canônica
-                base_vectors = np.eye(3)
-                for i in range(3):
-                    ax.quiver(0, 0, 0, base_vectors[0][i], base_vectors[1][i], base_vectors[2][i], 
-                             color='gray', linestyle='-', linewidth=1, arrow_length_ratio=0.1)
-                
-                # Plotar base transformada animada
-                trans_base_vectors = np.dot(matrix, base_vectors)
-                for i in range(3):
-                    current_vec = base_vectors[:, i] * (1 - progress) + trans_base_vectors[:, i] * progress
-                    ax.quiver(0, 0, 0, current_vec[0], current_vec[1], current_vec[2], 
-                             color='green', linestyle='--', linewidth=1, arrow_length_ratio=0.1)
-                
-                # Plotar vetores
-                ax.quiver(0, 0, 0, original_vector[0], original_vector[1], original_vector[2], 
-                         color='blue', linewidth=2, arrow_length_ratio=0.1, label='Original')
-                
-                current_transformed = np.array(original_vector) * (1 - progress) + np.array(transformed_vector) * progress
-                ax.quiver(0, 0, 0, current_transformed[0], current_transformed[1], current_transformed[2], 
-                         color='red', linewidth=2, arrow_length_ratio=0.1, label='Transformado')
-                
-                ax.legend()
-                return ax
-            
-            # Criar animação
-            self.animation = FuncAnimation(self.fig, update, frames=100, 
-                                          interval=20/self.animation_speed.get())
-        
+    def play_columns(self, vector, matrix):
+        # Av como soma das colunas ponderadas; o texto do termo atual acompanha cada passo
+        self.resources.clear_figure()
+        self.active_chain = None
+        scene = make_column_scene(self.fig, vector, matrix, view_axes=self.get_view_axes(), 
+                                  on_step=self.explanation_var.set)
+        self.active_steps = scene
+        self.start_animation(scene, "columns")
+    
+    def step_columns(self, direction):
+        # Avança/volta um termo: pausa a animação e exibe o quadro-chave (já calculado)
+        scene = self.active_steps
+        if scene is None or scene.ax not in self.fig.axes:
+            self.active_steps = None
+            self.status_var.set(f"Aplique a transformação com Passo a Passo ({COLUMN_STEP_MODE})")
+            return
+        self.stop_animation()
+        step = min(max(scene.neighbor_step(direction), 0), scene.step_count())
+        scene.show_frame(scene.step_frame(step))
+        self.status_var.set(f"Passo {step} de {scene.step_count()}")
+    
+    def start_animation(self, scene, source):
+        # Criar animação (callback instrumentado: cálculo, desenho e quadros perdidos)
+        interval = 20/self.animation_speed.get()
+        self.resources.start_animation(scene, self.profiler.wrap(scene.update, source, interval), 
+                                       interval)
         self.canvas.draw()
     
     def update_plot(self, original_vector=None, transformed_vector=None, matrix=None):
-        self.fig.clf()
-        
-        dim = 2 if self.dimension.get() == "2D" else 3
-        
-        # Configurar plot
-        if dim == 2:
-            ax = self.fig.add_subplot(111)
-            ax.set_xlim(-5, 5)
-            ax.set_ylim(-5, 5)
-            ax.axhline(0, color='black', linewidth=0.5)
-            ax.axvline(0, color='black', linewidth=0.5)
-            ax.grid(True)
-            ax.set_title('Transformação Linear 2D')
-            ax.set_xlabel('Eixo X')
-            ax.set_ylabel('Eixo Y')
-            
-            # Plotar grade de fundo com menor opacidade
-            for x in range(-5, 6):
-                ax.axvline(x, color='lightgray', linestyle='-', alpha=0.3)
-            for y in range(-5, 6):
-                ax.axhline(y, color='lightgray', linestyle='-', alpha=0.3)
-            
-            # Plotar base canônica original
-            ax.quiver(0, 0, 1, 0, angles='xy', scale_units='xy', scale=1, 
-                     color='gray', width=0.005, label='Base Original')
-            ax.quiver(0, 0, 0, 1, angles='xy', scale_units='xy', scale=1, 
-                     color='gray', width=0.005)
-            
-            # Adicionar rótulos aos eixos
-            ax.text(5.2, 0, 'X', fontsize=12, ha='center', va='center')
-            ax.text(0, 5.2, 'Y', fontsize=12, ha='center', va='center')
-            
-            if original_vector is not None and transformed_vector is not None:
-                # Plotar vetores
-                ax.quiver(0, 0, original_vector[0], original_vector[1], 
-                         angles='xy', scale_units='xy', scale=1, color='blue', 
-                         width=0.015, label='Original')
-                ax.quiver(0, 0, transformed_vector[0], transformed_vector[1], 
-                         angles='xy', scale_units='xy', scale=1, color='red', 
-                         width=0.015, label='Transformado')
-                
-                # Adicionar rótulos aos vetores
-                ax.text(original_vector[0]/2, original_vector[1]/2, 'v', 
-                        fontsize=12, color='blue', ha='center', va='center')
-                ax.text(transformed_vector[0]/2, transformed_vector[1]/2, 'Av', 
-                        fontsize=12, color='red', ha='center', va='center')
-                
-                # Plotar transformação da base canônica
-                if matrix is not None:
-                    base_x = np.array([1, 0])
-                    base_y = np.array([0, 1])
-                    trans_base_x = np.dot(matrix, base_x)
-                    trans_base_y = np.dot(matrix, base_y)
-                    
-                    ax.quiver(0, 0, trans_base_x[0], trans_base_x[1], 
-                             angles='xy', scale_units='xy', scale=1, color='green', 
-                             width=0.010, linestyle='--', label='Base Transformada')
-                    ax.quiver(0, 0, trans_base_y[0], trans_base_y[1], 
-                             angles='xy', scale_units='xy', scale=1, color='green', 
-                             width=0.010, linestyle='--')
-                    
-                    # Adicionar rótulos à base transformada
-                    ax.text(trans_base_x[0]/2, trans_base_x[1]/2, 'A·i', 
-                            fontsize=10, color='green', ha='center', va='center')
-                    ax.text(trans_base_y[0]/2, trans_base_y[1]/2, 'A·j', 
-                            fontsize=10, color='green', ha='center', va='center')
-                    
-                    # Desenhar paralelogramo para mostrar combinação linear
-                    points = np.array([
-                        [0, 0],
-                        trans_base_x * original_vector[0],
-                        trans_base_x * original_vector[0] + trans_base_y * original_vector[1],
-                        trans_base_y * original_vector[1]
-                    ])
-                    
-                    polygon = patches.Polygon(points, closed=True, 
-                                             fill=True, alpha=0.1, color='purple')
-                    ax.add_patch(polygon)
-            
-            ax.legend(loc='upper right')
-            
-        else:  # 3D
-            ax = self.fig.add_subplot(111, projection='3d')
-            ax.set_xlim(-5, 5)
-            ax.set_ylim(-5, 5)
-            ax.set_zlim(-5, 5)
-            ax.set_title('Transformação Linear 3D')
-            ax.set_xlabel('Eixo X')
-            ax.set_ylabel('Eixo Y')
-            ax.set_zlabel('Eixo Z')
-            
-            # Plotar base canônica original
-            ax.quiver(0, 0, 0, 1, 0, 0, color='gray', linestyle='-', linewidth=1, arrow_length_ratio=0.1, label='Base Original')
-            ax.quiver(0, 0, 0, 0, 1, 0, color='gray', linestyle='-', linewidth=1, arrow_length_ratio=0.1)
-            ax.quiver(0, 0, 0, 0, 0, 1, color='gray', linestyle='-', linewidth=1, arrow_length_ratio=0.1)
-            
-            if original_vector is not None and transformed_vector is not None:
-                # Plotar vetores 3D
-                ax.quiver(0, 0, 0, original_vector[0], original_vector[1], original_vector[2], 
-                         color='blue', linewidth=2, arrow_length_ratio=0.1, label='Original')
-                ax.quiver(0, 0, 0, transformed_vector[0], transformed_vector[1], transformed_vector[2], 
-                         color='red', linewidth=2, arrow_length_ratio=0.1, label='Transformado')
-                
-                # Adicionar rótulos
-                ax.text(original_vector[0], original_vector[1], original_vector[2], 'v', 
-                        fontsize=12, color='blue', ha='center', va='center')
-                ax.text(transformed_vector[0], transformed_vector[1], transformed_vector[2], 'Av', 
-                        fontsize=12, color='red', ha='center', va='center')
-                
-                # Plotar transformação da base canônica
-                if matrix is not None:
-                    base_vectors = np.eye(3)
-                    trans_base_vectors = np.dot(matrix, base_vectors)
-                    
-                    for i in range(3):
-                        ax.quiver(0, 0, 0, trans_base_vectors[0][i], trans_base_vectors[1][i], trans_base_vectors[2][i], 
-                                 color='green', linestyle='--', linewidth=1, arrow_length_ratio=0.1, 
-                                 label='Base Transformada' if i == 0 else "")
-                        
-                        # Adicionar rótulos
-                        vec = trans_base_vectors[:, i]
-                        ax.text(vec[0], vec[1], vec[2], f'A·e{i+1}', 
-                                fontsize=10, color='green', ha='center', va='center')
-            
-            ax.legend()
+        dim = self.get_dim()
         
-        self.canvas.draw()
+        # A cena de cada dimensão é montada uma vez; aqui só os dados mudam
+        with self.profiler.frame("plot"):
+            scene = self.get_scene(dim)
+            if dim > 3:
+                scene.view_axes = self.get_view_axes()
+            scene.update(original_vector, transformed_vector, matrix)
     
-    def generate_random_exercise(self):
-        dim = 2 if self.dimension.get() == "2D" else 3
+    def toggle_overlay(self):
+        self.profiler.set_overlay(self.overlay_var.get())
+        self.canvas.draw_idle()
+    
+    def export_timings(self):
+        path = filedialog.asksaveasfilename(
+            title="Exportar tempos de quadro", defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("CSV (histogramas)", "*.csv")])
+        if not path:
+            return
+        try:
+            self.profiler.export(path)
+        except OSError as e:
+            messagebox.showerror("Erro", f"Não foi possível gravar {path}: {e}")
+            return
+        self.status_var.set(f"{len(self.profiler.samples)} quadros exportados para {path}")
+    
+    def toggle_deformed_grid(self):
+        # Vale para a cena atual e para as próximas animações
+        dim = self.get_dim()
+        for scene in self.resources.scenes.values():
+            scene.show_grid = self.grid_var.get()
+        self.get_scene(dim).set_grid_visible(self.grid_var.get())
+    
+    def get_grid_density(self):
+        return GRID_DENSITY_LABELS.get(self.grid_density_var.get(), "medium")
+    
+    def update_grid_density(self):
+        # Como a grade: cena atual e próximas animações (as outras cenas trocam
+        # os segmentos no próximo update)
+        dim = self.get_dim()
+        density = self.get_grid_density()
+        for scene in self.resources.scenes.values():
+            scene.grid_density = density
+        self.get_scene(dim).set_grid_density(density)
+    
+    def toggle_analysis(self):
+        # Mesmo comportamento da grade: cena atual e próximas animações
+        dim = self.get_dim()
+        for scene in self.resources.scenes.values():
+            scene.show_analysis = self.analysis_var.get()
+        self.get_scene(dim).set_analysis_visible(self.analysis_var.get())
+    
+    def load_dataset(self):
+        path = filedialog.askopenfilename(
+            title="Carregar imagem ou nuvem de pontos", 
+            filetypes=[("Imagens e pontos", " ".join("*" + ext for ext in 
+                                                     datasets.IMAGE_EXTENSIONS + datasets.POINT_EXTENSIONS)), 
+                       ("Todos os arquivos", "*.*")])
+        if not path:
+            return
+        # CSVs grandes são convertidos em segundo plano (com progresso no status)
+        self.tasks.submit("dataset", lambda task, path: datasets.load_dataset(path, progress=task.progress), 
+                          path, on_done=self.set_dataset, on_error=self.dataset_failed, 
+                          on_discard=lambda dataset: dataset.close(), label="Carregando dados")
+    
+    def dataset_failed(self, error):
+        messagebox.showerror("Erro", f"Não foi possível carregar o arquivo: {error}")
+    
+    def set_dataset(self, dataset):
+        # Troca a imagem/nuvem de todas as cenas; a anterior é liberada
+        if self.dataset is not None:
+            self.resources.unregister(self.dataset)
+            self.dataset.close()
+        self.dataset = dataset
+        if dataset is not None:
+            self.resources.register(dataset)
+            if dataset.kind == "image":
+                dataset.method = RESAMPLE_METHODS.get(self.resample_var.get(), "bilinear")
+        for scene in self.resources.scenes.values():
+            scene.dataset = dataset
+        dim = self.get_dim()
+        self.get_scene(dim).set_dataset(dataset)
+        if dataset is None:
+            self.status_var.set("Dados removidos")
+        elif dataset.supports(dim):
+            self.status_var.set(f"Carregado: {dataset}")
+        else:
+            self.status_var.set(f"Carregado: {dataset} (não exibido em {dim}D)")
+    
+    def remove_dataset(self):
+        self.tasks.cancel("dataset")
+        self.set_dataset(None)
+    
+    def update_resample(self):
+        if self.dataset is not None and self.dataset.kind == "image":
+            self.dataset.method = RESAMPLE_METHODS.get(self.resample_var.get(), "bilinear")
+            self.get_scene(self.get_dim()).set_dataset(self.dataset)
+    
+    def get_scene(self, dim):
+        scenes = self.resources.scenes
+        scene = scenes.get(dim)
+        if scene is None or not scene.is_alive():
+            # A animação limpa a figura; nesse caso as cenas são recriadas
+            if any(not s.is_alive() for s in scenes.values()) or \
+                    len(self.fig.axes) != len(scenes):
+                self.resources.clear_figure()
+                self.active_chain = None
+            scene = scenes[dim] = make_scene(self.fig, dim, view_axes=self.get_view_axes(), 
+                                             show_grid=self.grid_var.get(), 
+                                             grid_density=self.get_grid_density(), 
+                                             show_analysis=self.analysis_var.get(), 
+                                             dataset=self.dataset)
         
-        # Gerar vetor aleatório
-        random_vector = np.random.uniform(-3, 3, dim).round(1)
+        for other in scenes.values():
+            other.show(other is scene)
+        return scene
+    
+    def generate_random_exercise(self):
+        # Gerado em segundo plano com um gerador filho (o da janela não é
+        # compartilhado entre threads)
+        self.tasks.submit("transform", compute_random_exercise, self.get_dim(), self.rng.spawn(1)[0], 
+                          on_done=self.show_random_exercise, label="Gerando exercício")
+    
+    def show_random_exercise(self, result):
+        if len(result["vector"]) != self.get_dim():
+            return
+        self.fill_inputs(result["vector"], result["matrix"])
+        self.show_result(result, "Exercício aleatório gerado")
+    
+    def fill_inputs(self, vector, matrix):
+        # Escreve um vetor e uma matriz (da dimensão atual) nas entradas
+        dim = len(vector)
         for i, entry in enumerate(self.vector_inputs):
             try:
                 entry.delete(0, tk.END)
-                entry.insert(0, str(random_vector[i]))
+                entry.insert(0, str(vector[i]))
             except tk.TclError:
                 continue
         
-        # Gerar matriz de transformação aleatória
-        random_matrix = np.random.uniform(-2, 2, (dim, dim)).round(1)
         for i in range(dim):
             for j in range(dim):
                 try:
                     entry = self.transformation_matrix[i][j]
                     entry.delete(0, tk.END)
-                    entry.insert(0, str(random_matrix[i,j]))
+                    entry.insert(0, str(matrix[i,j]))
                 except (IndexError, tk.TclError):
                     continue
         
-        # Calcular vetor transformado
-        transformed_vector = np.dot(random_matrix, random_vector)
-        
-        # Atualizar visualização
-        self.update_plot(random_vector, transformed_vector, random_matrix)
-        
-        # Gerar explicação
-        self.generate_explanation(random_vector, random_matrix, transformed_vector)
-        
-        self.status_var.set("Exercício aleatório gerado")
+        # O resultado dessas entradas já está sendo exibido: sem prévia repetida
+        self.resources.cancel("preview")
+    
+    def import_batch(self):
+        path = filedialog.askopenfilename(
+            title="Importar lote de pares (matriz, vetor)", 
+            filetypes=[("Lotes", " ".join("*" + ext for ext in batches.BATCH_EXTENSIONS)), 
+                       ("Todos os arquivos", "*.*")])
+        if not path:
+            return
+        # Leitura (memmap ou CSV em blocos) e cálculo de todos os pares em segundo plano
+        self.tasks.submit("batch", lambda task, path: batches.load_batch(path, progress=task.progress), 
+                          path, on_done=self.set_batch, on_error=self.batch_failed, 
+                          on_discard=lambda batch: batch.close(), label="Importando lote")
+    
+    def batch_failed(self, error):
+        messagebox.showerror("Erro", f"Não foi possível importar o lote: {error}")
+    
+    def set_batch(self, batch):
+        # Troca o lote atual; o anterior é liberado (e seu .npy temporário apagado)
+        if batch is not None and batch.dim > MAX_DIMENSION:
+            batch.close()
+            messagebox.showerror("Erro", f"O lote tem dimensão {batch.dim} (máximo {MAX_DIMENSION})")
+            return
+        if self.batch is not None:
+            self.resources.unregister(self.batch)
+            self.batch.close()
+        summary_shown = self.get_batch_summary() is not None
+        self.batch = batch
+        self.batch_index = 0
+        self.batch_scrub_var.set(0.0)
+        if batch is None:
+            self.batch_scale.configure(to=0)
+            self.batch_var.set("Nenhum lote")
+            if summary_shown:
+                self.update_plot()
+            self.status_var.set("Lote fechado")
+            return
+        self.resources.register(batch)
+        self.batch_scale.configure(to=len(batch) - 1)
+        self.show_batch_pair(0)
+        self.status_var.set(f"Importado: {batch}")
+    
+    def close_batch(self):
+        self.tasks.cancel("batch")
+        self.set_batch(None)
+    
+    def scrub_batch(self, value):
+        # Arrastar o controle troca o par exibido (a explicação é calculada em
+        # segundo plano; pedidos intermediários são descartados)
+        index = round(float(value))
+        if self.batch is not None and index != self.batch_index:
+            self.show_batch_pair(index)
+    
+    def step_batch(self, step):
+        if self.batch is None:
+            return
+        index = min(max(self.batch_index + step, 0), len(self.batch) - 1)
+        self.batch_scrub_var.set(index)
+        self.show_batch_pair(index)
+    
+    def show_batch_pair(self, index):
+        batch = self.batch
+        self.batch_index = index
+        self.batch_var.set(f"Par {index + 1} de {len(batch)}")
+        self.set_dim(batch.dim)
+        if self.summary_var.get():
+            self.show_batch_summary().set_index(index)
+        vector, matrix, transformed_vector = batch.pair(index)
+        self.tasks.submit("transform", compute_batch_pair, vector, matrix, transformed_vector, 
+                          batch.answer_text(index), on_done=self.show_batch_result)
+    
+    def show_batch_result(self, result):
+        if len(result["vector"]) != self.get_dim():
+            return
+        self.fill_inputs(result["vector"], result["matrix"])
+        status = f"Par {self.batch_index + 1} de {len(self.batch)}" if self.batch else "Par do lote"
+        if self.get_batch_summary() is not None:
+            # Na visão geral o par atual só é marcado; o gráfico do par fica para depois
+            self.status_var.set(f"{status}: {result['transformed']}")
+            self.explanation_var.set(result["explanation"])
+        else:
+            self.show_result(result, status)
+    
+    def get_batch_summary(self):
+        # Visão geral do lote atual, se estiver na figura
+        scene = self.resources.scenes.get("batch")
+        if scene is not None and scene.is_alive() and scene.batch is self.batch:
+            return scene
+        return None
+    
+    def show_batch_summary(self):
+        # Dispersão de Av e histograma de det(A) no lugar das cenas do gráfico
+        scene = self.get_batch_summary()
+        if scene is None:
+            self.resources.clear_figure()
+            self.active_chain = None
+            scene = self.resources.scenes["batch"] = BatchSummaryScene(self.fig, self.batch, 
+                                                                       self.batch_index)
+            self.canvas.draw_idle()
+        return scene
+    
+    def toggle_batch_summary(self):
+        if self.batch is None:
+            if self.summary_var.get():
+                self.status_var.set("Importe um lote para ver o resumo")
+            self.summary_var.set(False)
+            return
+        if self.summary_var.get():
+            self.show_batch_summary()
+        else:
+            # De volta ao gráfico do par atual
+            self.update_plot()
+            self.show_batch_pair(self.batch_index)
+    
+    def get_store(self):
+        if self.store is None:
+            self.store = self.resources.register(QuestionnaireStore(class_label=self.class_label))
+        return self.store
+    
+    def exercise_context(self):
+        # Vetor e matriz na tela no momento da resposta (se forem válidos)
+        return {"vector": self.get_vector(show_errors=False), 
+                "matrix": self.get_matrix(show_errors=False)}
+    
+    def show_resources(self, event=None):
+        # F12: artistas, callbacks, janelas e memória vivos no momento
+        self.status_var.set(self.resources.format_stats())
     
     def show_questionnaire(self):
+        # Uma única janela de questionário: reabrir só a traz para a frente
+        self.resources.open_window("questionnaire", self.build_questionnaire)
+    
+    def build_questionnaire(self):
         questionnaire_window = tk.Toplevel(self.root)
         questionnaire_window.title("Questionário Avaliativo")
         questionnaire_window.geometry("500x400")
@@ -536,7 +1020,7 @@ class VetorLabApp:
             ["a) Muito Útil", "b) Útil", "c) Pouco Útil", "d) Inútil"]
         ]
         
-        self.answers = []
+        answers = []
         
         for i, (question, opts) in enumerate(zip(questions, options)):
             frame = ttk.Frame(questionnaire_window)
@@ -545,17 +1029,22 @@ class VetorLabApp:
             ttk.Label(frame, text=question, wraplength=450).pack(anchor=tk.W)
             
             var = tk.StringVar()
-            self.answers.append(var)
+            answers.append(var)
             
             for opt in opts:
                 ttk.Radiobutton(frame, text=opt, variable=var, value=opt[0]).pack(anchor=tk.W)
         
         ttk.Button(questionnaire_window, text="Enviar Respostas", 
-                  command=lambda: self.submit_questionnaire(questionnaire_window)).pack(pady=20)
+                  command=lambda: self.submit_questionnaire(questionnaire_window, answers)).pack(pady=20)
+        return questionnaire_window
     
-    def submit_questionnaire(self, window):
-        answers = [var.get() for var in self.answers]
+    def submit_questionnaire(self, window, answer_vars):
+        answers = [var.get() for var in answer_vars]
         if all(answers):
+            # Só enfileira: a gravação em lote acontece na thread do gravador
+            self.get_store().submit({i + 1: answer for i, answer in enumerate(answers)}, 
+                                    dimension=self.dimension.get(), 
+                                    exercise=self.exercise_context())
             messagebox.showinfo("Obrigado", "Obrigado por responder o questionário!")
             window.destroy()
         else:
@@ -563,5 +1052,6 @@ class VetorLabApp:
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app = VetorLabApp(root)
+    class_label = sys.argv[sys.argv.index("--turma") + 1] if "--turma" in sys.argv[:-1] else None
+    app = VetorLabApp(root, startup_report="--startup-report" in sys.argv, class_label=class_label)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,185 @@
+import functools
+import itertools
+
+import numpy as np
+
+import vetorlab_engine as engine
+import vetorlab_pipeline as pipeline
+
+# Número de matrizes cujas análises ficam em cache
+ANALYSIS_CACHE_SIZE = 128
+
+# Parte imaginária (relativa) abaixo da qual um autovalor é considerado real
+REAL_EIGEN_TOLERANCE = 1e-9
+
+# Autovalores listados no texto (matrizes nD grandes)
+MAX_LISTED_EIGENVALUES = 8
+
+# Medida multiplicada por |det| em cada dimensão
+VOLUME_NAMES = {2: "da área", 3: "do volume"}
+
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+
+@functools.lru_cache(maxsize=4)
+def unit_cell_edges(dim):
+    # Arestas (E, 2, dim) do quadrado/cubo unitário [0, 1]^dim: pares de
+    # vértices que diferem em uma única coordenada
+    vertices = np.array(list(itertools.product((0.0, 1.0), repeat=dim)))
+    edges = [(a, b) for a, b in itertools.combinations(vertices, 2)
+             if np.count_nonzero(a != b) == 1]
+    return _readonly(np.array(edges))
+
+
+class MatrixAnalysis:
+    """Propriedades de uma matriz A (d, d) usadas pelo gráfico, pela animação
+    e pela explicação.
+
+    Cada propriedade é calculada no primeiro acesso e guardada; as instâncias
+    vêm de `analyze`, que as mantém em cache pelo valor da matriz. Os arrays
+    são compartilhados e por isso somente leitura.
+    """
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        self.dim = matrix.shape[0]
+
+    @functools.cached_property
+    def basis_images(self):
+        # Linhas: A·e1, …, A·ed (colunas de A)
+        return _readonly(self.matrix.T.copy())
+
+    @functools.cached_property
+    def singular_values(self):
+        # Mesma SVD (e mesmo cache) das decomposições da cadeia
+        return pipeline.svd_factors(self.matrix)[1]
+
+    @functools.cached_property
+    def determinant(self):
+        return float(np.linalg.det(self.matrix))
+
+    @functools.cached_property
+    def rank(self):
+        # Mesmo critério de np.linalg.matrix_rank, sobre os valores singulares já calculados
+        s = self.singular_values
+        return int(np.count_nonzero(s > s[0] * self.dim * np.finfo(np.float64).eps))
+
+    @property
+    def volume_scale(self):
+        # Fator pelo qual A multiplica áreas (2D), volumes (3D) ou hipervolumes
+        return abs(self.determinant)
+
+    @property
+    def invertible(self):
+        return self.rank == self.dim
+
+    @functools.cached_property
+    def _eigen(self):
+        values, vectors = np.linalg.eig(self.matrix)
+        return _readonly(values), _readonly(vectors)
+
+    @property
+    def eigenvalues(self):
+        return self._eigen[0]
+
+    @property
+    def eigenvectors(self):
+        # Colunas: autovetores (possivelmente complexos) de A
+        return self._eigen[1]
+
+    @functools.cached_property
+    def _invariant(self):
+        values, vectors = self._eigen
+        real = np.abs(values.imag) <= REAL_EIGEN_TOLERANCE * np.maximum(1.0, np.abs(values))
+        lines, line_values = [], []
+        for value, vector in zip(values[real].real, vectors[:, real].T.real):
+            vector = vector / np.linalg.norm(vector)
+            # Autovalores repetidos de matrizes defeituosas repetem a mesma reta
+            if any(abs(vector @ other) > 1 - 1e-9 for other in lines):
+                continue
+            # Sentido determinístico: maior componente positiva
+            lines.append(vector * np.sign(vector[np.argmax(np.abs(vector))]))
+            line_values.append(value)
+        return (_readonly(np.array(lines).reshape(-1, self.dim)),
+                _readonly(np.array(line_values)))
+
+    @property
+    def invariant_lines(self):
+        # Linhas (k, d): direções unitárias das retas invariantes (autovetores reais)
+        return self._invariant[0]
+
+    @property
+    def invariant_values(self):
+        # Autovalor de cada reta invariante (fator de escala ao longo dela)
+        return self._invariant[1]
+
+    @functools.cached_property
+    def unit_cell(self):
+        # Imagem das arestas do quadrado/cubo unitário; só em 2D e 3D
+        if self.dim not in VOLUME_NAMES:
+            return None
+        return _readonly(engine.transform_segments(self.matrix, unit_cell_edges(self.dim)))
+
+    @property
+    def unit_cell_center(self):
+        # A·(½, …, ½): onde o fator de área/volume é anotado
+        return self.basis_images.sum(axis=0) / 2
+
+    @functools.cached_property
+    def has_real_log(self):
+        # Sem logaritmo real o modo "Logaritmo" da animação cai no caminho polar
+        return engine.real_log(self.matrix) is not None
+
+    @functools.cached_property
+    def summary_text(self):
+        measure = VOLUME_NAMES.get(self.dim, f"do hipervolume {self.dim}D")
+        det = self.determinant
+        lines = ["Propriedades de A:",
+                 f"det(A) = {det:.2f}: fator de escala {measure} = {self.volume_scale:.2f}"
+                 + (" com orientação invertida" if det < 0 else "")]
+        status = "invertível" if self.invertible else "singular"
+        lines.append(f"posto(A) = {self.rank} ({status})")
+
+        values = self.eigenvalues[:MAX_LISTED_EIGENVALUES]
+        listed = ", ".join(f"{v.real:.2f}" if abs(v.imag) <= REAL_EIGEN_TOLERANCE
+                           else f"{v.real:.2f}{v.imag:+.2f}i" for v in values.tolist())
+        if len(self.eigenvalues) > MAX_LISTED_EIGENVALUES:
+            listed += ", …"
+        lines.append(f"Autovalores: {listed}")
+
+        if not len(self.invariant_lines):
+            lines.append("Nenhuma reta invariante real (A gira todas as direções)")
+        elif self.dim <= 3:
+            for direction, value in zip(self.invariant_lines.tolist(), self.invariant_values.tolist()):
+                coords = ", ".join(f"{x:.2f}" for x in direction)
+                lines.append(f"Reta invariante ({coords}): escala por λ = {value:.2f}")
+        else:
+            lines.append(f"{len(self.invariant_lines)} reta(s) invariante(s) real(is)")
+        return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def _cached_analysis(matrix_bytes, d):
+    return MatrixAnalysis(np.frombuffer(matrix_bytes, dtype=np.float64).reshape(d, d))
+
+
+def analyze(matrix):
+    # Análise de A, criada uma vez por valor da matriz (LRU limitado)
+    matrix = np.ascontiguousarray(engine.as_matrix_stack(matrix))
+    if matrix.ndim != 2:
+        raise ValueError("A análise é feita para uma única matriz (d, d)")
+    return _cached_analysis(matrix.tobytes(), matrix.shape[0])
+
+
+def full_explanation(vector, matrix, transformed_vector):
+    # Cálculo de Av seguido das propriedades de A (análise em cache, a mesma do
+    # gráfico); usada pelo app e pelo serviço de renderização
+    return engine.explanation_text(vector, matrix, transformed_vector) + \
+        "\n\n" + analyze(matrix).summary_text
+
+
+def clear_analysis_cache():
+    _cached_analysis.cache_clear()
@@ -0,0 +1,175 @@
+import os
+import tempfile
+
+import numpy as np
+
+import vetorlab_engine as engine
+from vetorlab_datasets import csv_to_npy, TemporaryMemmap, MAX_DISPLAY_POINTS
+
+# Pares processados por bloco na passada em lote (limita o que sai do memmap por vez)
+BATCH_CHUNK_ROWS = 1 << 16
+
+# Distância máxima entre a resposta enviada e Av para ser considerada correta
+# (as respostas costumam vir arredondadas a duas casas)
+ANSWER_TOLERANCE = 1e-2
+
+# Intervalos do histograma de det(A)
+HISTOGRAM_BINS = 50
+
+# Pontos no máximo na dispersão dos resultados (amostra uniforme)
+MAX_SUMMARY_POINTS = MAX_DISPLAY_POINTS[2]
+
+BATCH_EXTENSIONS = (".csv", ".txt", ".npy", ".npz")
+
+
+def row_layout(columns):
+    # Linhas planas: A (d·d, por linhas), v (d) e, opcionalmente, a resposta
+    # enviada (d). Retorna (d, tem_resposta); d² + d e d² + 2d nunca coincidem.
+    for d in range(2, int(np.sqrt(columns)) + 1):
+        if d * d + d == columns:
+            return d, False
+        if d * d + 2 * d == columns:
+            return d, True
+    raise ValueError(f"{columns} colunas não formam linhas A (d×d), v (d) [, resposta (d)]")
+
+
+def split_rows(rows):
+    # Visões (sem cópia) das matrizes, vetores e respostas de um array (M, colunas)
+    d, has_answer = row_layout(rows.shape[1])
+    matrices = rows[:, :d * d].reshape(len(rows), d, d)
+    vectors = rows[:, d * d:d * d + d]
+    answers = rows[:, d * d + d:] if has_answer else None
+    return matrices, vectors, answers
+
+
+class PairBatch(TemporaryMemmap):
+    """Conjunto de pares (A, v), por exemplo as respostas de uma turma.
+
+    Matrizes e vetores podem ser memmaps do arquivo; `compute` percorre o
+    conjunto em blocos e guarda Av, det(A) e, quando há respostas enviadas,
+    a distância de cada resposta a Av. Só esses resultados ficam na memória.
+    """
+
+    memmap_attributes = ("matrices", "vectors", "answers")
+
+    def __init__(self, matrices, vectors, answers=None, name="", temporary_path=None):
+        if matrices.ndim != 3 or matrices.shape[1] != matrices.shape[2] or \
+                vectors.shape != matrices.shape[:2]:
+            raise ValueError("Esperado (M, d, d) matrizes e (M, d) vetores")
+        if answers is not None and answers.shape != vectors.shape:
+            raise ValueError("As respostas devem ter o mesmo formato dos vetores")
+        if not len(vectors) or vectors.shape[1] < 2:
+            raise ValueError("O lote deve ter ao menos um par com d ≥ 2")
+        self.matrices = matrices
+        self.vectors = vectors
+        self.answers = answers
+        self.name = name
+        self.dim = vectors.shape[1]
+        self.temporary_path = temporary_path
+        self.results = None
+        self.det = None
+        self.errors = None
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def __str__(self):
+        text = f"{self.name} ({len(self)} pares em R^{self.dim}"
+        if self.errors is not None:
+            text += f", {self.correct_count} respostas corretas"
+        return text + ")"
+
+    def compute(self, progress=None, chunk_rows=BATCH_CHUNK_ROWS):
+        # Uma única passada: cada bloco é lido do disco, multiplicado em pilha
+        # (transform_paired) e descartado
+        n, d = len(self), self.dim
+        results = np.empty((n, d))
+        det = np.empty(n)
+        errors = None if self.answers is None else np.empty(n)
+        for start in range(0, n, chunk_rows):
+            stop = min(start + chunk_rows, n)
+            matrices = np.asarray(self.matrices[start:stop], dtype=np.float64)
+            engine.transform_paired(matrices, self.vectors[start:stop], out=results[start:stop])
+            det[start:stop] = np.linalg.det(matrices)
+            if errors is not None:
+                difference = np.asarray(self.answers[start:stop], dtype=np.float64) - \
+                    results[start:stop]
+                errors[start:stop] = np.linalg.norm(difference, axis=1)
+            if progress is not None:
+                progress(stop / n, "Calculando lote")
+        self.results, self.det, self.errors = results, det, errors
+        return self
+
+    @property
+    def correct(self):
+        # Máscara das respostas corretas (None sem respostas)
+        return None if self.errors is None else self.errors <= ANSWER_TOLERANCE
+
+    @property
+    def correct_count(self):
+        return int(np.count_nonzero(self.correct))
+
+    def pair(self, index):
+        # (v, A, Av) de um par, como arrays próprios (fora do memmap)
+        return (np.array(self.vectors[index], dtype=np.float64),
+                np.array(self.matrices[index], dtype=np.float64),
+                self.results[index].copy())
+
+    def answer_text(self, index):
+        # Resposta enviada para o par e se está correta (None sem respostas)
+        if self.errors is None:
+            return None
+        answer = ", ".join(f"{x:.2f}" for x in np.asarray(self.answers[index]).tolist())
+        error = self.errors[index]
+        verdict = "correta" if error <= ANSWER_TOLERANCE else f"incorreta (distância {error:.2f})"
+        return f"Resposta enviada: [{answer}], {verdict}"
+
+    def summary_indices(self, limit=MAX_SUMMARY_POINTS):
+        # Índices da amostra uniforme exibida na dispersão
+        return np.arange(0, len(self), -(-len(self) // limit))
+
+    def det_histogram(self, bins=HISTOGRAM_BINS):
+        finite = self.det[np.isfinite(self.det)]
+        return np.histogram(finite, bins=bins)
+
+
+def _from_npz(path):
+    # Chaves "matrix" e "vector" (como em vetorlab_exercises.write_npz) e
+    # "answer" opcional. Membros de .npz não podem ser mapeados em memória:
+    # cada array é lido uma vez, por completo
+    with np.load(path) as archive:
+        if "matrix" not in archive or "vector" not in archive:
+            raise ValueError("O .npz deve conter os arrays 'matrix' e 'vector'")
+        answers = archive["answer"] if "answer" in archive else None
+        return PairBatch(archive["matrix"], archive["vector"], answers,
+                         name=os.path.basename(path))
+
+
+def load_batch(path, progress=None):
+    # Lê um lote de pares e calcula todos os resultados. .npy (M, colunas) é
+    # mapeado em memória; CSV é convertido em blocos para um .npy temporário
+    name = os.path.basename(path)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npz":
+        return _from_npz(path).compute(progress)
+    if ext == ".npy":
+        rows = np.load(path, mmap_mode="r")
+        if rows.ndim != 2:
+            raise ValueError("O .npy deve conter um array (M, colunas)")
+        return PairBatch(*split_rows(rows), name=name).compute(progress)
+    if ext not in BATCH_EXTENSIONS:
+        raise ValueError(f"Formato não suportado: {ext or path}")
+
+    fd, temporary_path = tempfile.mkstemp(suffix=".npy", prefix="vetorlab-lote-")
+    os.close(fd)
+    try:
+        rows = csv_to_npy(path, temporary_path, progress=progress)
+        batch = PairBatch(*split_rows(rows), name=name, temporary_path=temporary_path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    try:
+        return batch.compute(progress)
+    except BaseException:
+        batch.close()
+        raise
@@ -0,0 +1,327 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Backend sem janela: o benchmark roda em máquinas sem display
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import vetorlab_engine as engine
+import vetorlab_pipeline as pipeline
+from vetorlab_analysis import full_explanation, clear_analysis_cache
+from vetorlab_scene import make_scene, make_animation_scene, DEFAULT_GRID_DENSITY
+
+# Semente fixa: as mesmas entradas em todas as execuções
+SEED = 1234
+
+# Limite padrão de piora (fração) para sinalizar regressão
+DEFAULT_THRESHOLD = 0.2
+
+# Tamanhos do benchmark de transformação em lote
+TRANSFORM_COUNTS = (1_000, 100_000, 1_000_000)
+TRANSFORM_DIMS = (2, 3, 8)
+
+FIGSIZE = (7, 7)
+
+# Módulos que não devem ser carregados na inicialização do app (mplot3d fica de
+# fora: matplotlib.projections o importa sozinho nas versões recentes)
+HEAVY_MODULES = ("matplotlib.pyplot", "matplotlib.animation")
+
+# Importa o app num processo novo (importação a frio) e mede o tempo e os
+# módulos pesados carregados; a figura inicial é montada como em update_plot
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import VetorLab_pythonV3 as app
+imported = time.perf_counter()
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from vetorlab_scene import make_scene
+fig = Figure(figsize=(7, 7), tight_layout=True)
+FigureCanvasAgg(fig)
+make_scene(fig, 2).update()
+fig.canvas.draw()
+drawn = time.perf_counter()
+print(json.dumps({"import_s": imported - start, "first_plot_s": drawn - start,
+                  "heavy": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def _median_time(func, repeat=7, number=1):
+    # Mediana de `repeat` medições, em segundos por chamada (após um aquecimento)
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return statistics.median(times)
+
+
+def _metric(value, unit, better):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def _figure():
+    fig = Figure(figsize=FIGSIZE, tight_layout=True)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _inputs(rng, dim):
+    matrix = rng.uniform(-2, 2, (dim, dim)).round(1)
+    vectors = rng.uniform(-3, 3, (16, dim)).round(1)
+    return matrix, vectors
+
+
+def bench_plot(rng, quick=False):
+    # Mesmo caminho de update_plot: cena montada uma vez e atualizada por blit
+    results = {}
+    for dim in (2, 3):
+        fig = _figure()
+        scene = make_scene(fig, dim)
+        matrix, vectors = _inputs(rng, dim)
+        scene.update(vectors[0], matrix @ vectors[0], matrix)
+        full = _median_time(fig.canvas.draw, repeat=3 if quick else 5)
+        state = {"i": 0}
+
+        def step():
+            vector = vectors[state["i"] % len(vectors)]
+            state["i"] += 1
+            scene.update(vector, matrix @ vector, matrix)
+
+        results[f"update_plot_{dim}d_ms"] = _metric(
+            _median_time(step, repeat=5 if quick else 15, number=5) * 1e3, "ms", "lower")
+        results[f"full_redraw_{dim}d_ms"] = _metric(full * 1e3, "ms", "lower")
+    return results
+
+
+def _animation_fps(dim, rng, frames, blit, grid_density=None):
+    fig = _figure()
+    matrix, vectors = _inputs(rng, dim)
+    grid = {} if grid_density is None else {"show_grid": True, "grid_density": grid_density}
+    scene = make_animation_scene(fig, vectors[0], matrix, blit=blit, **grid)
+    canvas = fig.canvas
+    canvas.draw()
+    background = canvas.copy_from_bbox(scene.ax.bbox)
+    start = time.perf_counter()
+    for frame in range(frames):
+        # Mesmo trabalho da FuncAnimation com blit: restaurar, atualizar e redesenhar
+        artists = scene.update(frame % len(scene))
+        if blit:
+            canvas.restore_region(background)
+            for artist in artists:
+                scene.ax.draw_artist(artist)
+            canvas.blit(scene.ax.bbox)
+        else:
+            canvas.draw()
+    return frames / (time.perf_counter() - start)
+
+
+def bench_animation(rng, quick=False):
+    # Os dois ramos de animate_transformation (2D e 3D), com blit como no app e
+    # sem blit como na exportação
+    frames = 30 if quick else 100
+    results = {}
+    for dim in (2, 3):
+        results[f"animation_{dim}d_fps"] = _metric(
+            _animation_fps(dim, rng, frames, blit=True), "fps", "higher")
+        results[f"animation_{dim}d_full_redraw_fps"] = _metric(
+            _animation_fps(dim, rng, max(10, frames // 5), blit=False), "fps", "higher")
+        # Com a grade deformada, na densidade padrão e na mais alta
+        for density in (DEFAULT_GRID_DENSITY, "high"):
+            results[f"animation_{dim}d_grid_{density}_fps"] = _metric(
+                _animation_fps(dim, rng, frames, blit=True, grid_density=density),
+                "fps", "higher")
+    results["animation_frames_buffer_us"] = _metric(
+        _median_time(lambda: engine.interpolation_path(np.diag([2.0, 0.5, 1.0]), 100, "log"),
+                     repeat=7, number=20) * 1e6, "us", "lower")
+    return results
+
+
+def _cold_full_explanation(vector, matrix, transformed):
+    # Texto completo do app com a análise recalculada (caches esvaziados): o
+    # que o usuário espera a cada matriz nova
+    clear_analysis_cache()
+    pipeline.clear_factorization_cache()
+    return full_explanation(vector, matrix, transformed)
+
+
+def bench_explanation(rng, quick=False):
+    # Só o cálculo de Av (explanation_text) e o texto completo exibido pelo app
+    results = {}
+    for dim in (2, 3):
+        matrix, vectors = _inputs(rng, dim)
+        vector = vectors[0]
+        transformed = matrix @ vector
+        results[f"explanation_{dim}d_us"] = _metric(
+            _median_time(lambda: engine.explanation_text(vector, matrix, transformed),
+                         repeat=5 if quick else 9, number=50) * 1e6, "us", "lower")
+        results[f"explanation_full_{dim}d_us"] = _metric(
+            _median_time(lambda: _cold_full_explanation(vector, matrix, transformed),
+                         repeat=5 if quick else 9, number=20) * 1e6, "us", "lower")
+    return results
+
+
+def bench_transform(rng, quick=False):
+    # Vazão (milhões de vetores/s) de engine.transform por quantidade e dimensão
+    results = {}
+    counts = TRANSFORM_COUNTS[:2] if quick else TRANSFORM_COUNTS
+    for dim in TRANSFORM_DIMS:
+        matrix = rng.standard_normal((dim, dim))
+        for count in counts:
+            vectors = rng.standard_normal((count, dim))
+            out = np.empty_like(vectors)
+            seconds = _median_time(lambda: engine.transform(matrix, vectors, out=out),
+                                   repeat=3 if quick else 7)
+            results[f"transform_{dim}d_{count}_mvec_s"] = _metric(
+                count / seconds / 1e6, "Mvec/s", "higher")
+    return results
+
+
+def bench_startup(rng, quick=False):
+    # Inicialização a frio do app (mediana de processos novos)
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, MPLBACKEND="Agg")
+    runs = []
+    for _ in range(3 if quick else 5):
+        output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT % (HEAVY_MODULES,)],
+                                cwd=root, env=env, capture_output=True, text=True, check=True)
+        runs.append(json.loads(output.stdout))
+    return {
+        "startup_import_ms": _metric(
+            statistics.median(r["import_s"] for r in runs) * 1e3, "ms", "lower"),
+        "startup_first_plot_ms": _metric(
+            statistics.median(r["first_plot_s"] for r in runs) * 1e3, "ms", "lower"),
+        "startup_heavy_modules": dict(
+            _metric(len(runs[0]["heavy"]), "módulos", "lower"), modules=runs[0]["heavy"]),
+    }
+
+
+BENCHMARKS = {
+    "startup": bench_startup,
+    "plot": bench_plot,
+    "animation": bench_animation,
+    "explanation": bench_explanation,
+    "transform": bench_transform,
+}
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def run(names=None, quick=False):
+    # Executa os benchmarks pedidos; cada grupo recebe um gerador com a mesma semente
+    metrics = {}
+    for name, bench in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        metrics.update(bench(np.random.default_rng(SEED), quick=quick))
+    return {"environment": environment(), "quick": quick, "metrics": metrics}
+
+
+def _change(reference, current, better):
+    # Piora relativa (positiva quando piora, nos dois sentidos). Com base zero
+    # não há variação relativa: qualquer piora conta como infinita
+    if reference:
+        change = (current - reference) / reference
+    elif current == reference:
+        change = 0.0
+    else:
+        change = np.inf if current > 0 else -np.inf
+    return -change if better == "higher" else change
+
+
+def _format_change(reference, current, unit):
+    # Variação relativa; com base zero, a diferença absoluta na unidade da métrica
+    if reference:
+        return f"{(current - reference) / reference:+.1%}"
+    return f"{current - reference:+.3f} {unit}"
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    # Lista (métrica, base, atual, variação) das métricas que pioraram além do limite
+    regressions = []
+    for name, current in results["metrics"].items():
+        reference = baseline["metrics"].get(name)
+        if reference is None:
+            continue
+        change = _change(reference["value"], current["value"], current["better"])
+        if change > threshold:
+            regressions.append((name, reference["value"], current["value"], change))
+    return regressions
+
+
+def format_results(results, baseline=None):
+    lines = []
+    for name, metric in results["metrics"].items():
+        line = f"{name:40s} {metric['value']:12.3f} {metric['unit']}"
+        reference = baseline["metrics"].get(name) if baseline else None
+        if reference is not None:
+            change = _format_change(reference["value"], metric["value"], metric["unit"])
+            line += f"   (base {reference['value']:.3f}, {change})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarks do VetorLab sem janela (backend Agg)")
+    parser.add_argument("--only", action="append", choices=list(BENCHMARKS),
+                        help="Executar apenas estes grupos (pode repetir)")
+    parser.add_argument("--quick", action="store_true", help="Menos repetições e tamanhos")
+    parser.add_argument("-o", "--output", help="Gravar os resultados em JSON")
+    parser.add_argument("--baseline", help="JSON de referência para comparar")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Gravar os resultados como nova referência em --baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Piora relativa que conta como regressão (padrão: 0.2)")
+    args = parser.parse_args(argv)
+
+    results = run(args.only, quick=args.quick)
+    baseline = None
+    if args.baseline and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_results(results, baseline))
+
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+
+    # Módulo pesado na inicialização é falha sempre, com ou sem referência
+    failed = False
+    heavy = results["metrics"].get("startup_heavy_modules")
+    if heavy and heavy["value"]:
+        print(f"FALHA: módulos pesados carregados na inicialização: "
+              f"{', '.join(heavy['modules'])}")
+        failed = True
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name, reference, current, change in regressions:
+            unit = results["metrics"][name]["unit"]
+            print(f"REGRESSÃO {name}: {reference:.3f} -> {current:.3f} "
+                  f"({_format_change(reference, current, unit)})")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
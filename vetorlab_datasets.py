@@ -0,0 +1,321 @@
+import os
+import tempfile
+
+import numpy as np
+
+# Lado maior da imagem no plano (unidades dos eixos); o canto inferior
+# esquerdo fica na origem, como o quadrado unitário
+IMAGE_SIZE = 4.0
+
+# Pixels de saída processados por bloco no mapeamento inverso (limita os temporários)
+WARP_CHUNK_PIXELS = 1 << 16
+
+# Reamostragem: vizinho mais próximo ou bilinear
+RESAMPLE_METHODS = ("nearest", "bilinear")
+
+# Pontos exibidos no máximo por dimensão (a nuvem é dizimada de forma uniforme)
+MAX_DISPLAY_POINTS = {2: 100_000, 3: 20_000}
+DEFAULT_MAX_DISPLAY_POINTS = 20_000
+
+# Um .npy 2D com até esta quantidade de colunas é uma nuvem de pontos; com mais,
+# é uma imagem em tons de cinza
+MAX_POINT_DIMENSION = 64
+
+# Linhas de CSV convertidas por bloco
+CSV_CHUNK_ROWS = 1 << 16
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff")
+POINT_EXTENSIONS = (".csv", ".txt", ".npy")
+
+
+def _csv_delimiter(line):
+    for delimiter in (",", ";", "\t"):
+        if delimiter in line:
+            return delimiter
+    return None
+
+
+def _is_numeric(fields):
+    try:
+        [float(x) for x in fields]
+    except ValueError:
+        return False
+    return True
+
+
+def csv_to_npy(src_path, dst_path, progress=None, chunk_rows=CSV_CHUNK_ROWS, dtype=np.float64):
+    # Converte um CSV numérico (cabeçalho opcional, separador , ; tab ou espaço)
+    # para .npy em blocos: uma passada conta as linhas e outra grava no memmap,
+    # sem que o arquivo inteiro fique na memória. Retorna o memmap (modo leitura).
+    rows, columns, delimiter, header = 0, None, None, 0
+    with open(src_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            if columns is None:
+                # Separador e colunas vêm da primeira linha numérica: o
+                # cabeçalho pode não ter separador ou usar outro
+                delimiter = _csv_delimiter(line)
+                fields = line.strip().split(delimiter)
+                if not header and not _is_numeric(fields):
+                    header = 1
+                    continue
+                columns = len(fields)
+            rows += 1
+    if not rows:
+        raise ValueError("O arquivo não contém linhas numéricas")
+
+    out = np.lib.format.open_memmap(dst_path, mode="w+", dtype=dtype, shape=(rows, columns))
+    try:
+        with open(src_path, encoding="utf-8") as f:
+            lines = (line for line in f if line.strip() and not line.startswith("#"))
+            for _ in range(header):
+                next(lines)
+            start = 0
+            while start < rows:
+                chunk = [next(lines) for _ in range(min(chunk_rows, rows - start))]
+                out[start:start + len(chunk)] = np.loadtxt(chunk, delimiter=delimiter,
+                                                           dtype=dtype, ndmin=2)
+                start += len(chunk)
+                if progress is not None:
+                    progress(start / rows, "Convertendo CSV")
+        out.flush()
+    finally:
+        del out
+    return np.load(dst_path, mmap_mode="r")
+
+
+def _to_rgba(pixels, integer_source):
+    # Pixels (n, 1) cinza, (n, 3) RGB ou (n, 4) RGBA -> (n, 4) uint8 RGBA
+    if not integer_source:
+        pixels = np.clip(pixels, 0.0, 1.0) * 255
+    channels = pixels.shape[1]
+    out = np.empty((len(pixels), 4), dtype=np.uint8)
+    out[:, :3] = pixels[:, :3] if channels >= 3 else pixels[:, :1]
+    out[:, 3] = pixels[:, 3] if channels == 4 else 255
+    return out
+
+
+class TemporaryMemmap:
+    """Dados mapeados em memória de um .npy, apagado em `close` se temporário.
+
+    As subclasses listam em `memmap_attributes` os atributos que apontam para
+    o memmap.
+    """
+
+    memmap_attributes = ()
+    temporary_path = None
+
+    def close(self):
+        # O memmap precisa ser solto antes de apagar o .npy temporário (Windows)
+        for name in self.memmap_attributes:
+            setattr(self, name, None)
+        if self.temporary_path is not None:
+            try:
+                os.remove(self.temporary_path)
+            except OSError:
+                pass
+            self.temporary_path = None
+
+
+class ImageDataset(TemporaryMemmap):
+    """Imagem raster posicionada no plano em `extent` = (x0, x1, y0, y1).
+
+    `source` pode ser um memmap (.npy): a reamostragem só lê os pixels de que
+    precisa, então a imagem nunca é copiada inteira.
+    """
+
+    kind = "image"
+    memmap_attributes = ("source", "flat")
+
+    def __init__(self, source, name="", method="bilinear"):
+        if source.ndim not in (2, 3) or (source.ndim == 3 and source.shape[-1] not in (1, 3, 4)):
+            raise ValueError("A imagem deve ter formato (H, W), (H, W, 3) ou (H, W, 4)")
+        self.source = source
+        self.name = name
+        self.method = method
+        self.height, self.width = source.shape[:2]
+        # Visão (H·W, C) sem cópia: um índice linear por pixel na reamostragem
+        self.flat = source.reshape(self.height * self.width, -1)
+        scale = IMAGE_SIZE / max(self.height, self.width)
+        self.extent = (0.0, self.width * scale, 0.0, self.height * scale)
+        self.integer_source = np.issubdtype(source.dtype, np.integer)
+
+    def __str__(self):
+        return f"{self.name} ({self.width}×{self.height} px)"
+
+    def supports(self, dim):
+        return dim == 2
+
+
+class ImageWarp:
+    """Imagem deformada por A numa grade de saída fixa cobrindo a vista.
+
+    Mapeamento inverso: para cada pixel de saída p, a cor vem de A⁻¹p na
+    imagem original (vizinho mais próximo ou bilinear). O custo depende só da
+    resolução de saída, não do tamanho da imagem; o cálculo é feito em blocos
+    de linhas e todos os buffers são reaproveitados entre chamadas (quadros).
+    """
+
+    def __init__(self, dataset, resolution, view):
+        self.dataset = dataset
+        self.resolution = resolution
+        self.view_extent = (-view, view, -view, view)
+        # Centros dos pixels de saída (linha 0 embaixo: imshow com origin='lower')
+        self.centers = (np.arange(resolution, dtype=np.float32) + 0.5) * (2 * view / resolution) - view
+        self.output = np.zeros((resolution, resolution, 4), dtype=np.uint8)
+        rows = max(1, min(resolution, WARP_CHUNK_PIXELS // resolution))
+        self._cols = np.empty((rows, resolution), dtype=np.float32)
+        self._rows = np.empty((rows, resolution), dtype=np.float32)
+        self._key = None
+
+    def warp(self, matrix):
+        matrix = np.asarray(matrix, dtype=np.float64)
+        key = (matrix.tobytes(), self.dataset.method)
+        if key == self._key:
+            return self.output
+        self._key = key
+        try:
+            inverse = np.linalg.inv(matrix)
+        except np.linalg.LinAlgError:
+            inverse = None
+        if inverse is None or not np.isfinite(inverse).all():
+            # A singular: a imagem colapsa numa reta (área zero)
+            self.output[...] = 0
+            return self.output
+
+        # Coordenadas contínuas de pixel na origem (centros em inteiros, linha 0
+        # no topo): afins em (x, y), então cada bloco custa duas operações por eixo
+        dataset = self.dataset
+        x0, x1, y0, y1 = dataset.extent
+        sx, sy = dataset.width / (x1 - x0), dataset.height / (y1 - y0)
+        col_x, col_y, col_0 = sx * inverse[0, 0], sx * inverse[0, 1], -sx * x0 - 0.5
+        row_x, row_y, row_0 = -sy * inverse[1, 0], -sy * inverse[1, 1], sy * y1 - 0.5
+        x = self.centers
+        step = len(self._cols)
+        for start in range(0, self.resolution, step):
+            stop = min(start + step, self.resolution)
+            y = self.centers[start:stop, np.newaxis]
+            cols, rows = self._cols[:stop - start], self._rows[:stop - start]
+            np.multiply(x, col_x, out=cols)
+            cols += y * col_y + col_0
+            np.multiply(x, row_x, out=rows)
+            rows += y * row_y + row_0
+            # Só os pixels de saída que caem dentro da imagem são amostrados
+            inside = (cols > -0.5) & (cols < dataset.width - 0.5) & \
+                (rows > -0.5) & (rows < dataset.height - 0.5)
+            block = self.output[start:stop]
+            block[...] = 0
+            if inside.any():
+                block[inside] = _to_rgba(self._sample(cols[inside], rows[inside]),
+                                         dataset.integer_source)
+        return self.output
+
+    def _sample(self, cols, rows):
+        # Cores (n, C) nas coordenadas contínuas (cols, rows), lidas por índice linear
+        dataset = self.dataset
+        flat, width, height = dataset.flat, dataset.width, dataset.height
+        if dataset.method == "nearest":
+            ic = np.clip(np.rint(cols), 0, width - 1).astype(np.intp)
+            ir = np.clip(np.rint(rows), 0, height - 1).astype(np.intp)
+            return np.take(flat, ir * width + ic, axis=0)
+        c0 = np.floor(cols)
+        r0 = np.floor(rows)
+        fc, fr = (cols - c0)[:, np.newaxis], (rows - r0)[:, np.newaxis]
+        c0 = np.clip(c0, 0, width - 1).astype(np.intp)
+        r0 = np.clip(r0, 0, height - 1).astype(np.intp)
+        dc = (c0 < width - 1).astype(np.intp)
+        dr = np.where(r0 < height - 1, width, 0)
+        index = r0 * width + c0
+        p00 = np.take(flat, index, axis=0).astype(np.float32)
+        p01 = np.take(flat, index + dc, axis=0).astype(np.float32)
+        p10 = np.take(flat, index + dr, axis=0).astype(np.float32)
+        p11 = np.take(flat, index + dr + dc, axis=0).astype(np.float32)
+        p00 += (p01 - p00) * fc
+        p10 += (p11 - p10) * fc
+        p00 += (p10 - p00) * fr
+        return np.rint(p00) if dataset.integer_source else p00
+
+
+class PointDataset(TemporaryMemmap):
+    """Nuvem de pontos (N, d), em geral um memmap do arquivo.
+
+    Só uma amostra uniforme (no máximo MAX_DISPLAY_POINTS linhas) é lida para
+    exibição; os dados completos continuam no disco e podem ser transformados
+    em blocos com engine.transform_file/transform_chunked.
+    """
+
+    kind = "points"
+    memmap_attributes = ("points",)
+
+    def __init__(self, points, name="", temporary_path=None):
+        if points.ndim != 2 or points.shape[1] < 2:
+            raise ValueError("A nuvem de pontos deve ter formato (N, d) com d ≥ 2")
+        self.points = points
+        self.name = name
+        self.dim = points.shape[1]
+        self.temporary_path = temporary_path
+        limit = MAX_DISPLAY_POINTS.get(self.dim, DEFAULT_MAX_DISPLAY_POINTS)
+        stride = -(-len(points) // limit)
+        self.sample = np.ascontiguousarray(points[::stride], dtype=np.float64)
+        self.sample.setflags(write=False)
+
+    def __str__(self):
+        shown = "" if len(self.sample) == len(self.points) else f", {len(self.sample)} exibidos"
+        return f"{self.name} ({len(self.points)} pontos em R^{self.dim}{shown})"
+
+    def supports(self, dim):
+        return dim == self.dim
+
+
+class PointWarp:
+    # Amostra da nuvem transformada por uma matriz (k, d) num buffer reaproveitado
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.output = None
+
+    def warp(self, matrix):
+        matrix = np.asarray(matrix, dtype=np.float64)
+        sample = self.dataset.sample
+        if self.output is None or self.output.shape[1] != matrix.shape[0]:
+            self.output = np.empty((len(sample), matrix.shape[0]))
+        np.matmul(sample, matrix.T, out=self.output)
+        return self.output
+
+
+def load_image(path):
+    if path.lower().endswith(".npy"):
+        return ImageDataset(np.load(path, mmap_mode="r"), os.path.basename(path))
+    # PNG é lido pelo matplotlib; os demais formatos usam o Pillow
+    from matplotlib.image import imread
+    return ImageDataset(imread(path), os.path.basename(path))
+
+
+def load_points(path, progress=None):
+    name = os.path.basename(path)
+    if path.lower().endswith(".npy"):
+        return PointDataset(np.load(path, mmap_mode="r"), name)
+    fd, temporary_path = tempfile.mkstemp(suffix=".npy", prefix="vetorlab-")
+    os.close(fd)
+    try:
+        points = csv_to_npy(path, temporary_path, progress=progress)
+        return PointDataset(points, name, temporary_path=temporary_path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def load_dataset(path, progress=None):
+    # Imagem (PNG/JPEG/…, ou .npy com formato (H, W[, C])) ou nuvem de pontos
+    # (CSV ou .npy com formato (N, d))
+    ext = os.path.splitext(path)[1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        return load_image(path)
+    if ext == ".npy":
+        array = np.load(path, mmap_mode="r")
+        if array.ndim == 2 and array.shape[1] <= MAX_POINT_DIMENSION:
+            return PointDataset(array, os.path.basename(path))
+        return ImageDataset(array, os.path.basename(path))
+    if ext in POINT_EXTENSIONS:
+        return load_points(path, progress=progress)
+    raise ValueError(f"Formato não suportado: {ext or path}")
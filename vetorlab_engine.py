@@ -0,0 +1,539 @@
+import functools
+
+import numpy as np
+
+# Tamanho padrão do bloco (em vetores) para o processamento em partes
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def as_matrix_stack(matrices, dtype=None):
+    # Converte uma matriz (d, d) ou uma pilha (M, d, d) para ndarray
+    matrices = np.asarray(matrices, dtype=dtype if dtype is not None else np.float64)
+    if matrices.ndim not in (2, 3) or matrices.shape[-1] != matrices.shape[-2]:
+        raise ValueError("A matriz deve ter formato (d, d) ou (M, d, d)")
+    return matrices
+
+
+def as_vector_array(vectors, dtype=None):
+    # Converte um vetor (d,) ou um conjunto de vetores (N, d) para ndarray
+    vectors = np.asarray(vectors, dtype=dtype if dtype is not None else np.float64)
+    if vectors.ndim not in (1, 2):
+        raise ValueError("Os vetores devem ter formato (d,) ou (N, d)")
+    return vectors
+
+
+def _result_dtype(dtype):
+    return np.dtype(np.float64 if dtype is None else dtype)
+
+
+def transform(matrices, vectors, dtype=None, out=None):
+    """Aplica uma matriz ou pilha de matrizes a um conjunto de vetores.
+
+    Formatos aceitos (o resultado segue as regras de broadcast):
+      (d, d)    x (d,)   -> (d,)
+      (d, d)    x (N, d) -> (N, d)
+      (M, d, d) x (d,)   -> (M, d)
+      (M, d, d) x (N, d) -> (M, N, d)
+    """
+    dtype = _result_dtype(dtype)
+    matrices = as_matrix_stack(matrices, dtype)
+    vectors = as_vector_array(vectors, dtype)
+    d = matrices.shape[-1]
+    if vectors.shape[-1] != d:
+        raise ValueError("Dimensões incompatíveis para multiplicação matriz-vetor")
+
+    if vectors.ndim == 1:
+        # A·v para cada matriz da pilha: (..., d, d) @ (d,) -> (..., d)
+        return np.matmul(matrices, vectors, out=out)
+    # Vetores como linhas: V @ Aᵀ evita transpor o conjunto de vetores
+    return np.matmul(vectors, np.swapaxes(matrices, -1, -2), out=out)
+
+
+def transform_paired(matrices, vectors, dtype=None, out=None):
+    # Aplica a i-ésima matriz ao i-ésimo vetor: (M, d, d) x (M, d) -> (M, d)
+    dtype = _result_dtype(dtype)
+    matrices = as_matrix_stack(matrices, dtype)
+    vectors = as_vector_array(vectors, dtype)
+    if matrices.ndim != 3 or vectors.ndim != 2 or matrices.shape[:2] != vectors.shape:
+        raise ValueError("Esperado (M, d, d) matrizes e (M, d) vetores")
+    if out is None:
+        out = np.empty(vectors.shape, dtype=dtype)
+    np.matmul(matrices, vectors[..., np.newaxis], out=out[..., np.newaxis])
+    return out
+
+
+def iter_transform_chunks(matrix, vectors, chunk_size=DEFAULT_CHUNK_SIZE, dtype=None):
+    # Gera (início, resultado) bloco a bloco; só um bloco fica em memória por vez.
+    # `vectors` pode ser um np.memmap de um arquivo maior que a RAM.
+    matrix = as_matrix_stack(matrix, _result_dtype(dtype))
+    if matrix.ndim != 2:
+        raise ValueError("O processamento em blocos aceita uma única matriz (d, d)")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size deve ser positivo")
+    n = len(vectors)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        yield start, transform(matrix, vectors[start:stop], dtype=dtype)
+
+
+def transform_chunked(matrix, vectors, chunk_size=DEFAULT_CHUNK_SIZE, dtype=None, out=None):
+    # Versão em blocos de `transform` para uma matriz (d, d) e vetores (N, d).
+    # `out` pode ser um memmap de saída (ver `transform_file`).
+    dtype = _result_dtype(dtype)
+    vectors = vectors if isinstance(vectors, np.ndarray) else as_vector_array(vectors, dtype)
+    if vectors.ndim != 2:
+        raise ValueError("Os vetores devem ter formato (N, d)")
+    if out is None:
+        out = np.empty(vectors.shape, dtype=dtype)
+    elif out.shape != vectors.shape:
+        raise ValueError("`out` deve ter o mesmo formato dos vetores")
+
+    matrix = as_matrix_stack(matrix, dtype)
+    if matrix.ndim != 2 or matrix.shape[-1] != vectors.shape[-1]:
+        raise ValueError("Dimensões incompatíveis para multiplicação matriz-vetor")
+    matrix_t = matrix.T
+    for start in range(0, len(vectors), chunk_size):
+        stop = min(start + chunk_size, len(vectors))
+        chunk = np.asarray(vectors[start:stop], dtype=dtype)
+        if out.dtype == dtype and out.flags.c_contiguous:
+            np.matmul(chunk, matrix_t, out=out[start:stop])
+        else:
+            out[start:stop] = chunk @ matrix_t
+    return out
+
+
+def transform_file(matrix, src_path, dst_path, chunk_size=DEFAULT_CHUNK_SIZE, dtype=None):
+    # Transforma um arquivo .npy (N, d) em outro .npy sem carregá-lo inteiro na memória
+    vectors = np.load(src_path, mmap_mode="r")
+    if vectors.ndim != 2:
+        raise ValueError("O arquivo deve conter um array (N, d)")
+    out = np.lib.format.open_memmap(dst_path, mode="w+", dtype=_result_dtype(dtype),
+                                    shape=vectors.shape)
+    try:
+        transform_chunked(matrix, vectors, chunk_size=chunk_size, dtype=dtype, out=out)
+        out.flush()
+    finally:
+        del out
+    return dst_path
+
+
+def arrow_segments_3d(vectors, arrow_length_ratio=0.1, angle=15.0):
+    # Segmentos de k setas partindo da origem: hastes e as duas linhas da ponta,
+    # na mesma geometria usada por Axes3D.quiver. Aceita (3,), (k, 3) ou
+    # (F, k, 3) e devolve (..., 3k, 2, 3), permitindo gerar todos os quadros de uma vez
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float64))
+    norm_xy = np.hypot(vectors[..., 0], vectors[..., 1])
+    # Eixo de rotação perpendicular ao vetor no plano xy (y se o vetor for vertical)
+    axis = np.zeros_like(vectors)
+    np.divide(vectors[..., 1], norm_xy, out=axis[..., 0], where=norm_xy != 0)
+    np.divide(-vectors[..., 0], norm_xy, out=axis[..., 1], where=norm_xy != 0)
+    axis[..., 1][norm_xy == 0] = 1.0
+
+    theta = np.radians(angle)
+    cos, sin = np.cos(theta), np.sin(theta)
+    along = axis * np.sum(axis * vectors, axis=-1, keepdims=True) * (1 - cos)
+    cross = np.cross(axis, vectors) * sin
+    head_pos = vectors * cos + cross + along
+    head_neg = vectors * cos - cross + along
+
+    origin = np.zeros_like(vectors)
+    shafts = np.stack([vectors, origin], axis=-2)
+    heads_pos = np.stack([vectors, vectors - arrow_length_ratio * head_pos], axis=-2)
+    heads_neg = np.stack([vectors, vectors - arrow_length_ratio * head_neg], axis=-2)
+    return np.concatenate([shafts, heads_pos, heads_neg], axis=-3)
+
+
+# Número de animações mantidas no cache de quadros
+FRAME_CACHE_SIZE = 32
+
+# Linhas do buffer de quadros da animação
+FRAME_ORIGINAL = 0
+FRAME_TRANSFORMED = 1
+FRAME_BASIS = 2
+
+
+def interpolate_frames(start, end, frames):
+    # Interpolação linear de todos os quadros num único broadcast:
+    # (k, d) x (k, d) -> (frames, k, d), com progresso i / frames
+    start = np.asarray(start, dtype=np.float64)
+    end = np.asarray(end, dtype=np.float64)
+    progress = (np.arange(frames, dtype=np.float64) / frames)[:, np.newaxis, np.newaxis]
+    return start + (end - start) * progress
+
+
+# Modos de interpolação entre I e A na animação
+INTERPOLATION_MODES = ("linear", "log", "polar")
+
+# Ordem da série de Taylor de expm_batch (após o escalonamento, ||X|| <= 1/2)
+EXPM_TAYLOR_ORDER = 12
+
+# Tolerâncias do logaritmo real e da raiz quadrada matricial
+LOG_TOLERANCE = 1e-10
+SQRTM_MAX_ITERATIONS = 50
+ROTATION_TOLERANCE = 1e-8
+
+
+def expm_batch(matrices):
+    # Exponencial de uma pilha (F, d, d) inteira de uma vez: escalonamento e
+    # quadratura com Taylor em Horner, cada passo é um único matmul em lote
+    matrices = np.asarray(matrices, dtype=np.float64)
+    identity = np.eye(matrices.shape[-1])
+    norm = np.abs(matrices).sum(axis=-1).max() if matrices.size else 0.0
+    squarings = max(0, int(np.ceil(np.log2(norm / 0.5)))) if norm > 0.5 else 0
+    scaled = matrices / 2.0 ** squarings
+    result = identity + scaled / EXPM_TAYLOR_ORDER
+    for k in range(EXPM_TAYLOR_ORDER - 1, 0, -1):
+        result = identity + scaled @ result / k
+    for _ in range(squarings):
+        result = result @ result
+    return result
+
+
+def _sqrtm(matrix):
+    # Iteração de Denman–Beavers (autovalores fora do semieixo real negativo)
+    y, z = matrix, np.eye(len(matrix))
+    for _ in range(SQRTM_MAX_ITERATIONS):
+        y_next = (y + np.linalg.inv(z)) / 2
+        z = (z + np.linalg.inv(y)) / 2
+        done = np.abs(y_next - y).sum() <= LOG_TOLERANCE * np.abs(y_next).sum()
+        y = y_next
+        if done:
+            break
+    return y
+
+
+def real_log(matrix):
+    # Logaritmo principal real por escalonamento inverso e quadratura;
+    # None quando A tem autovalor real <= 0 (não há log real principal)
+    matrix = np.asarray(matrix, dtype=np.float64)
+    eigenvalues = np.linalg.eigvals(matrix)
+    scale = max(1.0, np.abs(eigenvalues).max())
+    on_cut = (np.abs(eigenvalues.imag) <= LOG_TOLERANCE * scale) & \
+             (eigenvalues.real <= LOG_TOLERANCE * scale)
+    if on_cut.any():
+        return None
+    identity = np.eye(len(matrix))
+    square_roots = 0
+    while np.abs(matrix - identity).sum(axis=-1).max() > 0.25 and square_roots < 64:
+        matrix = _sqrtm(matrix)
+        square_roots += 1
+    # log(I + X) = X - X²/2 + X³/3 - ..., com ||X|| <= 1/4
+    x = matrix - identity
+    term = x
+    log = x.copy()
+    for k in range(2, 30):
+        term = term @ x
+        log += (-1) ** (k + 1) * term / k
+    return log * 2.0 ** square_roots
+
+
+def rotation_log(rotation):
+    # Log real (antissimétrico) de uma rotação: nos planos invariantes, dados
+    # pelos autovetores de (R + Rᵀ)/2 = cos θ, R = cos θ·I + sin θ·J e log R = θ·J
+    rotation = np.asarray(rotation, dtype=np.float64)
+    d = len(rotation)
+    cosines, basis = np.linalg.eigh((rotation + rotation.T) / 2)
+    local = basis.T @ rotation @ basis
+    log = np.zeros((d, d))
+    start = 0
+    while start < d:
+        stop = start + 1
+        while stop < d and cosines[stop] - cosines[start] < ROTATION_TOLERANCE:
+            stop += 1
+        cos = np.clip(cosines[start:stop].mean(), -1.0, 1.0)
+        theta = np.arccos(cos)
+        block = local[start:stop, start:stop]
+        if np.sin(theta) > 1e-6:
+            log[start:stop, start:stop] = theta * (block - block.T) / (2 * np.sin(theta))
+        elif cos < 0:
+            # Meia-volta: qualquer J com J² = -I serve; gira os eixos aos pares
+            for i in range(start, stop - 1, 2):
+                log[i + 1, i] = np.pi
+                log[i, i + 1] = -np.pi
+        start = stop
+    return basis @ log @ basis.T
+
+
+def proper_svd(matrix):
+    # A = U·diag(S)·Vᵀ com U e Vᵀ rotações (det +1): um fator com det -1 tem a
+    # última coluna (U) ou linha (Vᵀ) trocada de sinal, e o sinal vai para o
+    # último valor de S. Se A inverte orientação, esse valor fica negativo
+    u, s, vt = np.linalg.svd(np.asarray(matrix, dtype=np.float64))
+    if np.linalg.det(u) < 0:
+        u[:, -1] *= -1
+        s[-1] *= -1
+    if np.linalg.det(vt) < 0:
+        vt[-1] *= -1
+        s[-1] *= -1
+    return u, s, vt
+
+
+def proper_polar(matrix):
+    # A = R·S com R rotação (det +1) e S simétrica, a partir de proper_svd. Se A
+    # inverte orientação, o reflexo fica em S ao longo da direção menos
+    # esticada: a animação "vira" o espaço por esse eixo em vez de passar por
+    # uma rotação impossível
+    u, s, vt = proper_svd(matrix)
+    return u @ vt, (vt.T * s) @ vt
+
+
+def interpolation_path(matrix, frames, mode="linear"):
+    # Pilha (frames, d, d) de M(t) de I até A, t = i / frames, numa única conta
+    # em lote sobre todos os quadros:
+    #   linear: (1 - t)·I + t·A
+    #   log:    exp(t·log A), curva a taxa constante (rotações giram de verdade)
+    #   polar:  exp(t·log R)·((1 - t)·I + t·S), ângulo e esticamento separados
+    if mode not in INTERPOLATION_MODES:
+        raise ValueError(f"Modo de interpolação desconhecido: {mode}")
+    matrix = np.asarray(matrix, dtype=np.float64)
+    identity = np.eye(len(matrix))
+    if mode == "linear":
+        return interpolate_frames(identity, matrix, frames)
+    progress = (np.arange(frames, dtype=np.float64) / frames)[:, np.newaxis, np.newaxis]
+    if mode == "log":
+        log = real_log(matrix)
+        if log is not None:
+            return expm_batch(progress * log)
+        # Sem log real (autovalor real <= 0): cai no caminho polar
+    rotation, stretch = proper_polar(matrix)
+    return expm_batch(progress * rotation_log(rotation)) @ \
+        (identity + progress * (stretch - identity))
+
+
+@functools.lru_cache(maxsize=FRAME_CACHE_SIZE)
+def _cached_animation_frames(matrix_key, vector_key, frames, mode):
+    matrix = np.array(matrix_key, dtype=np.float64)
+    vector = np.array(vector_key, dtype=np.float64)
+    if mode == "linear":
+        basis = np.eye(len(vector))
+        # Linhas: vetor original (fixo), vetor transformado e base (e1..ed -> Ae1..Aed)
+        start = np.vstack([vector, vector, basis])
+        end = np.vstack([vector, transform(matrix, vector), transform(matrix, basis)])
+        buffer = interpolate_frames(start, end, frames)
+    else:
+        buffer = frames_from_matrices(interpolation_path(matrix, frames, mode), vector)
+    # O buffer é compartilhado entre replays; impedir alterações acidentais
+    buffer.setflags(write=False)
+    return buffer
+
+
+def animation_frames(matrix, vector, frames=100, mode="linear"):
+    # Buffer (frames, d + 2, d) da animação, calculado uma vez por
+    # (matriz, vetor, número de quadros, modo) e reaproveitado nos replays
+    matrix = as_matrix_stack(matrix)
+    vector = as_vector_array(vector)
+    if matrix.ndim != 2 or vector.ndim != 1 or matrix.shape[0] != len(vector):
+        raise ValueError("Dimensões incompatíveis para multiplicação matriz-vetor")
+    if mode not in INTERPOLATION_MODES:
+        raise ValueError(f"Modo de interpolação desconhecido: {mode}")
+    matrix_key = tuple(map(tuple, matrix.tolist()))
+    return _cached_animation_frames(matrix_key, tuple(vector.tolist()), int(frames), mode)
+
+
+def frames_from_matrices(matrices, vector):
+    # Buffer de animação (F, d + 2, d) a partir de uma pilha de matrizes M(t):
+    # vetor original, M(t)·v e a base M(t)·e_i, no mesmo layout de animation_frames
+    matrices = as_matrix_stack(matrices)
+    vector = as_vector_array(vector)
+    count, d = len(matrices), len(vector)
+    buffer = np.empty((count, d + 2, d))
+    buffer[:, FRAME_ORIGINAL] = vector
+    np.matmul(matrices, vector, out=buffer[:, FRAME_TRANSFORMED])
+    buffer[:, FRAME_BASIS:] = np.swapaxes(matrices, 1, 2)
+    return buffer
+
+
+def clear_frame_cache():
+    _cached_animation_frames.cache_clear()
+    _cached_column_steps.cache_clear()
+    _cached_column_step_texts.cache_clear()
+
+
+# Quadros por termo na animação de Av como soma das colunas (Passo a Passo)
+COLUMN_STEP_FRAMES = 25
+
+
+def _column_terms(matrix, vector):
+    # Linhas: os termos v_j·A[:, j] da soma Av = v1·a1 + v2·a2 + …
+    return matrix.T * vector[:, np.newaxis]
+
+
+@functools.lru_cache(maxsize=FRAME_CACHE_SIZE)
+def _cached_column_steps(matrix_key, vector_key, frames_per_step):
+    matrix = np.array(matrix_key, dtype=np.float64)
+    vector = np.array(vector_key, dtype=np.float64)
+    d = len(vector)
+    # Quadros-chave: somas parciais 0, v1·a1, v1·a1 + v2·a2, …, Av
+    partial = np.zeros((d + 1, d))
+    np.cumsum(_column_terms(matrix, vector), axis=0, out=partial[1:])
+    # O quadro 0 é a origem; o termo j cresce até ficar inteiro no quadro (j + 1)·F.
+    # `steps` é o número de termos já iniciados (o texto exibido em cada quadro)
+    growth = np.arange(1, frames_per_step + 1) / frames_per_step
+    steps = np.concatenate([[0], np.repeat(np.arange(1, d + 1), frames_per_step)])
+    fractions = np.concatenate([[0.0], np.tile(growth, d)])
+    for array in (partial, steps, fractions):
+        array.setflags(write=False)
+    return partial, steps, fractions
+
+
+def column_steps(matrix, vector, frames_per_step=COLUMN_STEP_FRAMES):
+    """Quadros da montagem de Av coluna a coluna, em cache por (A, v).
+
+    Retorna (partial, steps, fractions): as d + 1 somas parciais (o passo k
+    é exibido no quadro k·frames_per_step) e, para cada quadro, o número de
+    termos iniciados e a fração já desenhada do termo atual.
+    """
+    matrix = as_matrix_stack(matrix)
+    vector = as_vector_array(vector)
+    if matrix.ndim != 2 or vector.ndim != 1 or matrix.shape[0] != len(vector):
+        raise ValueError("Dimensões incompatíveis para multiplicação matriz-vetor")
+    matrix_key = tuple(map(tuple, matrix.tolist()))
+    return _cached_column_steps(matrix_key, tuple(vector.tolist()), int(frames_per_step))
+
+
+def _format_vector(values):
+    # + 0.0 evita "-0.00" nos termos com componente nula
+    return "[" + ", ".join(f"{x + 0.0:.2f}" for x in values) + "]"
+
+
+@functools.lru_cache(maxsize=FRAME_CACHE_SIZE)
+def _cached_column_step_texts(matrix_key, vector_key):
+    matrix = np.array(matrix_key, dtype=np.float64)
+    vector = np.array(vector_key, dtype=np.float64)
+    d = len(vector)
+    terms = _column_terms(matrix, vector)
+    partial = np.cumsum(terms, axis=0).tolist()
+    # Linhas dos termos formatadas uma única vez; cada passo só muda os marcadores
+    lines = [f"v{j + 1}·a{j + 1} = {value:.2f}·{_format_vector(column)} = {_format_vector(term)}"
+             for j, (value, column, term) in enumerate(zip(vector.tolist(), matrix.T.tolist(),
+                                                           terms.tolist()))]
+    header = "Av como soma das colunas de A ponderadas pelas componentes de v:\n" + \
+        "Av = " + " + ".join(f"v{j + 1}·a{j + 1}" for j in range(d))
+    texts = []
+    for k in range(d + 1):
+        body = [("  ✓ " if j < k - 1 else "▶ " if j == k - 1 else "     ") + line
+                for j, line in enumerate(lines)]
+        total = _format_vector(partial[k - 1] if k else [0.0] * d)
+        texts.append("\n".join([header, *body, f"Soma parcial ({k} de {d} termos): {total}"]))
+    return tuple(texts)
+
+
+def column_step_texts(vector, matrix):
+    # Texto de cada passo (0 a d termos somados), com o termo atual marcado por ▶
+    matrix = as_matrix_stack(matrix)
+    vector = as_vector_array(vector)
+    matrix_key = tuple(map(tuple, matrix.tolist()))
+    return _cached_column_step_texts(matrix_key, tuple(vector.tolist()))
+
+
+@functools.lru_cache(maxsize=8)
+def grid_lines(dim, lines=41, extent=10.0):
+    # Segmentos (L, 2, dim) de uma grade densa em [-extent, extent]^dim: em 2D,
+    # `lines` retas em cada direção; em 3D, retas do reticulado ao longo de cada
+    # eixo. Como A leva retas em retas, basta transformar as extremidades.
+    ticks = np.linspace(-extent, extent, lines)
+    if dim == 2:
+        cross = ticks[:, np.newaxis]
+    elif dim == 3:
+        a, b = np.meshgrid(ticks, ticks, indexing='ij')
+        cross = np.column_stack([a.ravel(), b.ravel()])
+    else:
+        raise ValueError("A grade é definida apenas em 2D e 3D")
+
+    count = len(cross)
+    segments = np.empty((dim * count, 2, dim))
+    for axis in range(dim):
+        others = [k for k in range(dim) if k != axis]
+        block = segments[axis * count:(axis + 1) * count]
+        block[:, :, others] = cross[:, np.newaxis, :]
+        block[:, 0, axis] = -extent
+        block[:, 1, axis] = extent
+    # Compartilhado via cache: somente leitura
+    segments.setflags(write=False)
+    return segments
+
+
+def transform_segments(matrix, segments, out=None):
+    # Aplica A a todos os pontos de (L, 2, d) segmentos; `out` permite reaproveitar
+    # o mesmo buffer entre quadros sem alocar um novo array
+    matrix = as_matrix_stack(matrix)
+    if out is None:
+        out = np.empty_like(segments, dtype=np.float64)
+    np.matmul(segments, matrix.T, out=out)
+    return out
+
+
+def explanation_text(vector, matrix, transformed_vector):
+    # Texto da explicação exibida no app e gravada nos gabaritos dos exercícios
+    dim = len(vector)
+    # Floats do Python formatam bem mais rápido que escalares NumPy
+    rows = np.asarray(matrix, dtype=np.float64).tolist()
+    values = np.asarray(vector, dtype=np.float64).tolist()
+
+    explanation = "Transformação Linear:\n"
+    explanation += f"Vetor original: v = {vector}\n"
+    explanation += f"Matriz de transformação: A = \n"
+
+    for i in range(dim):
+        explanation += "[" + "  ".join([f"{x:.2f}" for x in rows[i]]) + "]\n"
+
+    explanation += "\nOperação realizada: Av = \n"
+
+    # Mostrar cálculo passo a passo
+    for i in range(dim):
+        terms = [f"{rows[i][j]:.2f}×{values[j]:.2f}" for j in range(dim)]
+        result = sum(rows[i][j] * values[j] for j in range(dim))
+        explanation += f"= ({' + '.join(terms)}) = {result:.2f}\n"
+
+    explanation += f"\nResultado: Av = {transformed_vector}"
+    return explanation
+
+
+# Número de projeções mantidas em cache (uma por matriz/eixos)
+PROJECTION_CACHE_SIZE = 32
+
+
+@functools.lru_cache(maxsize=PROJECTION_CACHE_SIZE)
+def _cached_projection(matrix_bytes, d, k, axes):
+    if axes is not None:
+        # Subespaço escolhido pelo usuário: eixos coordenados
+        projection = np.eye(d)[list(axes)]
+    else:
+        # PCA da base transformada: as imagens A·e_i partem da origem, então as
+        # direções principais (sem centralizar) são os vetores singulares à esquerda
+        matrix = np.frombuffer(matrix_bytes, dtype=np.float64).reshape(d, d)
+        u, _, _ = np.linalg.svd(matrix)
+        projection = u[:, :k].T.copy()
+        # Sinal determinístico: maior componente de cada direção positiva
+        signs = np.sign(projection[np.arange(k), np.argmax(np.abs(projection), axis=1)])
+        projection *= np.where(signs == 0, 1, signs)[:, np.newaxis]
+    projection.setflags(write=False)
+    return projection
+
+
+def projection_basis(matrix, k=3, axes=None):
+    """Base ortonormal (k, d) para visualizar R^d em k dimensões.
+
+    Por padrão usa a PCA da base transformada por `matrix`; `axes` escolhe um
+    subespaço de eixos coordenados (índices a partir de 0). O resultado fica em
+    cache e só é recalculado quando a matriz (ou os eixos) mudam.
+    """
+    matrix = np.ascontiguousarray(as_matrix_stack(matrix))
+    if matrix.ndim != 2:
+        raise ValueError("A projeção é calculada para uma única matriz (d, d)")
+    d = matrix.shape[0]
+    if k > d:
+        raise ValueError("A dimensão da vista não pode exceder a do espaço")
+    if axes is not None:
+        axes = tuple(int(a) for a in axes)
+        if len(axes) != k or len(set(axes)) != k or not all(0 <= a < d for a in axes):
+            raise ValueError(f"Escolha {k} eixos distintos entre 1 e {d}")
+        # A matriz não influencia a projeção por eixos: a chave não depende dela
+        return _cached_projection(b"", d, k, axes)
+    return _cached_projection(matrix.tobytes(), d, k, None)
+
+
+def project(points, projection):
+    # Projeta (..., d) pontos na base (k, d): uma única multiplicação para
+    # todos os quadros de uma animação
+    return np.matmul(points, np.asarray(projection).T)
@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+import vetorlab_engine as engine
+
+# Restrições aceitas na geração em lote
+CONSTRAINTS = ("invertible", "integer_det", "orthogonal")
+
+# Tolerâncias das restrições (as entradas são arredondadas a `decimals` casas)
+DET_TOLERANCE = 1e-9
+INTEGER_TOLERANCE = 1e-6
+EIG_IMAG_TOLERANCE = 1e-9
+
+# Candidatos sorteados sem nenhum aceito antes de desistir
+MAX_EMPTY_DRAWS = 1 << 23
+
+# Entradas de matriz sorteadas por rodada, no máximo (limita a memória das pilhas)
+MAX_DRAW_VALUES = 1 << 24
+
+
+def _check_constraints(constraints, eig_range):
+    unknown = set(constraints) - set(CONSTRAINTS)
+    if unknown:
+        raise ValueError(f"Restrições desconhecidas: {', '.join(sorted(unknown))}")
+    if eig_range is not None and eig_range[0] > eig_range[1]:
+        raise ValueError("Intervalo de autovalores inválido")
+
+
+def _sample(rng, n, dim, vector_range, matrix_range, decimals, orthogonal):
+    vectors = rng.uniform(-vector_range, vector_range, (n, dim)).round(decimals)
+    if orthogonal:
+        # QR de matrizes gaussianas empilhadas, com sinal corrigido, dá matrizes
+        # ortogonais uniformes; não são arredondadas para não perder a ortogonalidade
+        q, r = np.linalg.qr(rng.standard_normal((n, dim, dim)))
+        matrices = q * np.sign(np.diagonal(r, axis1=1, axis2=2))[:, np.newaxis, :]
+    else:
+        matrices = rng.uniform(-matrix_range, matrix_range, (n, dim, dim)).round(decimals)
+    return vectors, matrices
+
+
+def _accept(matrices, det, constraints, eig_range):
+    # Máscara dos candidatos que satisfazem todas as restrições, calculada sobre a pilha
+    mask = np.ones(len(matrices), dtype=bool)
+    if "invertible" in constraints:
+        mask &= np.abs(det) > DET_TOLERANCE
+    if "integer_det" in constraints:
+        mask &= np.abs(det - np.round(det)) < INTEGER_TOLERANCE
+    if eig_range is not None:
+        eigenvalues = np.linalg.eigvals(matrices)
+        real = eigenvalues.real
+        mask &= np.all(np.abs(eigenvalues.imag) < EIG_IMAG_TOLERANCE, axis=1)
+        mask &= np.all((real >= eig_range[0]) & (real <= eig_range[1]), axis=1)
+    return mask
+
+
+def iter_exercise_batches(count, dim=2, seed=None, constraints=(), eig_range=None,
+                          vector_range=3, matrix_range=2, decimals=1, batch_size=10000):
+    """Gera exercícios em lotes por amostragem com rejeição sobre pilhas de matrizes.
+
+    Cada lote é um dicionário com os arrays "vector" (n, d), "matrix" (n, d, d),
+    "result" (n, d) e "det" (n,). A sequência é reprodutível para a mesma
+    semente e os mesmos parâmetros; `seed` também aceita um np.random.Generator.
+    """
+    _check_constraints(constraints, eig_range)
+    rng = np.random.default_rng(seed)
+    orthogonal = "orthogonal" in constraints
+    max_draw = max(batch_size, MAX_DRAW_VALUES // (dim * dim))
+    produced = 0
+    drawn = 0
+    accepted_total = 0
+    empty_rounds = 0
+    while produced < count:
+        needed = min(batch_size, count - produced)
+        if accepted_total:
+            # Taxa de aceitação acumulada, sem piso: restrições raras (mas possíveis)
+            # pedem rodadas maiores, não uma desistência
+            draw = int(np.ceil(needed * drawn / accepted_total * 1.2))
+        else:
+            # Nada aceito ainda: a rodada dobra até o limite
+            draw = needed << min(empty_rounds, 30)
+        draw = min(max(draw, needed), max_draw)
+        vectors, matrices = _sample(rng, draw, dim, vector_range, matrix_range, decimals,
+                                    orthogonal)
+        det = np.linalg.det(matrices)
+        mask = _accept(matrices, det, constraints, eig_range)
+        accepted = int(mask.sum())
+        drawn += draw
+        accepted_total += accepted
+        if accepted == 0:
+            empty_rounds += 1
+            if not accepted_total and drawn >= MAX_EMPTY_DRAWS:
+                raise RuntimeError("Nenhum exercício satisfaz as restrições pedidas")
+            continue
+
+        vectors = vectors[mask][:needed]
+        matrices = matrices[mask][:needed]
+        produced += len(vectors)
+        yield {
+            "vector": vectors,
+            "matrix": matrices,
+            "result": engine.transform_paired(matrices, vectors),
+            "det": det[mask][:needed],
+        }
+
+
+def _empty_batch(dim):
+    return {"vector": np.empty((0, dim)), "matrix": np.empty((0, dim, dim)),
+            "result": np.empty((0, dim)), "det": np.empty(0)}
+
+
+def generate_exercises(count, dim=2, seed=None, **kwargs):
+    # Todos os exercícios num único dicionário de arrays (ver iter_exercise_batches)
+    batches = list(iter_exercise_batches(count, dim, seed=seed, **kwargs))
+    if not batches:
+        return _empty_batch(dim)
+    return {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+
+
+def _explanation(vector, matrix, result):
+    # Listas em vez de arrays no texto: array2string domina o custo da gravação em lote
+    return engine.explanation_text(vector.tolist(), matrix,
+                                   [round(x, 2) for x in result.tolist()])
+
+
+def write_jsonl(path, batches):
+    # Grava um exercício por linha, com o gabarito (Av, det e explicação)
+    index = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for batch in batches:
+            for vector, matrix, result, det in zip(batch["vector"], batch["matrix"],
+                                                   batch["result"], batch["det"]):
+                record = {
+                    "id": index,
+                    "vector": vector.tolist(),
+                    "matrix": matrix.tolist(),
+                    "answer": {
+                        "Av": result.tolist(),
+                        "det": float(det),
+                        "explanation": _explanation(vector, matrix, result),
+                    },
+                }
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                index += 1
+    return index
+
+
+def write_npz(path, batches):
+    # Grava os arrays concatenados e as explicações num único .npz compactado
+    batches = list(batches)
+    if not batches:
+        raise ValueError("Nenhum exercício para gravar")
+    arrays = {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+    arrays["explanation"] = np.array([
+        _explanation(vector, matrix, result)
+        for vector, matrix, result in zip(arrays["vector"], arrays["matrix"], arrays["result"])
+    ])
+    np.savez_compressed(path, **arrays)
+    return len(arrays["vector"])
+
+
+def positive_int(text):
+    # Tipo do argparse para contagens (também usado por vetorlab_export)
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("deve ser um inteiro positivo")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera exercícios do VetorLab em lote")
+    parser.add_argument("-n", "--count", type=positive_int, required=True)
+    parser.add_argument("--dim", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--constraint", action="append", default=[],
+                        choices=[c.replace("_", "-") for c in CONSTRAINTS])
+    parser.add_argument("--eig-range", type=float, nargs=2, metavar=("MIN", "MAX"))
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("-o", "--output", required=True, help="Arquivo .jsonl ou .npz")
+    args = parser.parse_args(argv)
+
+    batches = iter_exercise_batches(args.count, args.dim, seed=args.seed,
+                                    constraints=[c.replace("-", "_") for c in args.constraint],
+                                    eig_range=args.eig_range, batch_size=args.batch_size)
+    if os.path.splitext(args.output)[1].lower() == ".npz":
+        written = write_npz(args.output, batches)
+    else:
+        written = write_jsonl(args.output, batches)
+    print(f"{written} exercícios gravados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
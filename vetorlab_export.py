@@ -0,0 +1,172 @@
+import argparse
+import contextlib
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import vetorlab_engine as engine
+from vetorlab_exercises import positive_int
+
+# Formatos de saída aceitos: diretório de PNGs, GIF (Pillow) ou MP4 (ffmpeg)
+EXPORT_FORMATS = ("png", "gif", "mp4")
+FRAME_PATTERN = "frame_%05d.png"
+
+
+def parse_matrix(text):
+    # "1,0;0,1" -> [[1.0, 0.0], [0.0, 1.0]]
+    return [[float(x) for x in row.split(",")] for row in text.split(";")]
+
+
+def parse_vector(text):
+    return [float(x) for x in text.split(",")]
+
+
+def _render_frames(job, frame_indices, frame_dir):
+    # Executado nos processos de trabalho: monta a mesma cena da animação do
+    # app numa figura Agg própria e grava apenas os quadros recebidos
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from vetorlab_scene import make_animation_scene
+
+    fig = Figure(figsize=job["figsize"], tight_layout=True)
+    FigureCanvasAgg(fig)
+    scene = make_animation_scene(fig, job["vector"], job["matrix"], frames=job["frames"],
+                                 show_grid=job["show_grid"], blit=False,
+                                 interpolation=job["interpolation"])
+    for frame in frame_indices:
+        scene.update(frame)
+        fig.savefig(os.path.join(frame_dir, FRAME_PATTERN % frame), dpi=job["dpi"])
+    return len(frame_indices)
+
+
+def _output_format(output, fmt):
+    if fmt is None:
+        ext = os.path.splitext(output)[1].lower().lstrip(".")
+        fmt = ext if ext in ("gif", "mp4") else "png"
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação inválido: {fmt}")
+    return fmt
+
+
+def _make_job(matrix, vector, output, fmt=None, frames=100, fps=50, dpi=100,
+              figsize=(7, 7), show_grid=False, interpolation="linear"):
+    matrix = np.asarray(matrix, dtype=float)
+    vector = np.asarray(vector, dtype=float)
+    if matrix.shape != (len(vector), len(vector)) or len(vector) < 2:
+        raise ValueError("Dimensões incompatíveis entre vetor e matriz")
+    if interpolation not in engine.INTERPOLATION_MODES:
+        raise ValueError(f"Modo de interpolação desconhecido: {interpolation}")
+    if int(frames) < 1:
+        raise ValueError("A animação precisa de ao menos um quadro")
+    return {
+        "matrix": matrix, "vector": vector, "output": output,
+        "format": _output_format(output, fmt), "frames": int(frames), "fps": fps,
+        "dpi": dpi, "figsize": tuple(figsize), "show_grid": show_grid,
+        "interpolation": interpolation,
+    }
+
+
+def _split_frames(frames, parts):
+    # Blocos contíguos: cada tarefa monta a cena uma vez e renderiza vários quadros
+    size = max(1, math.ceil(frames / parts))
+    return [range(start, min(start + size, frames)) for start in range(0, frames, size)]
+
+
+def _assemble(job, frame_dir):
+    output, fmt = job["output"], job["format"]
+    if fmt == "gif":
+        from PIL import Image
+        paths = [os.path.join(frame_dir, FRAME_PATTERN % i) for i in range(job["frames"])]
+        # Cada quadro mantém o arquivo aberto até ser fechado: todos saem com o stack
+        with contextlib.ExitStack() as stack:
+            images = [stack.enter_context(Image.open(path)) for path in paths]
+            images[0].save(output, save_all=True, append_images=images[1:],
+                           duration=1000 / job["fps"], loop=0)
+    elif fmt == "mp4":
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg não encontrado; exporte em PNG ou GIF")
+        subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-framerate", str(job["fps"]),
+                        "-i", os.path.join(frame_dir, FRAME_PATTERN),
+                        # yuv420p exige largura e altura pares
+                        "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p",
+                        output], check=True)
+    return output
+
+
+def export_batch(jobs, workers=None):
+    # Exporta várias animações com um único pool de processos: os quadros de
+    # todos os clipes são distribuídos juntos e cada clipe é montado ao final
+    jobs = [_make_job(**job) if "format" not in job else job for job in jobs]
+    if any(job["format"] == "mp4" for job in jobs) and shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg não encontrado; exporte em PNG ou GIF")
+
+    # Destinos criados antes de renderizar: um diretório inexistente só
+    # apareceria na montagem, depois de todos os quadros prontos
+    for job in jobs:
+        if job["format"] == "png":
+            os.makedirs(job["output"], exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(job["output"])), exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    outputs = []
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            tempfile.TemporaryDirectory(prefix="vetorlab_") as tmp_root:
+        pending = []
+        for index, job in enumerate(jobs):
+            if job["format"] == "png":
+                frame_dir = job["output"]
+            else:
+                frame_dir = os.path.join(tmp_root, str(index))
+                os.makedirs(frame_dir)
+            futures = [executor.submit(_render_frames, job, list(chunk), frame_dir)
+                       for chunk in _split_frames(job["frames"], workers)]
+            pending.append((job, frame_dir, futures))
+
+        for job, frame_dir, futures in pending:
+            for future in futures:
+                future.result()
+            outputs.append(_assemble(job, frame_dir))
+    return outputs
+
+
+def export_animation(matrix, vector, output, fmt=None, frames=100, fps=50, dpi=100,
+                     figsize=(7, 7), show_grid=False, interpolation="linear", workers=None):
+    # Exporta a animação "Passo a Passo" de (matriz, vetor) sem janela Tk
+    job = _make_job(matrix, vector, output, fmt=fmt, frames=frames, fps=fps, dpi=dpi,
+                    figsize=figsize, show_grid=show_grid, interpolation=interpolation)
+    return export_batch([job], workers=workers)[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Exporta a animação do VetorLab como PNGs, GIF ou MP4")
+    parser.add_argument("--matrix", required=True, help='Matriz por linhas, ex.: "0,-1;1,0"')
+    parser.add_argument("--vector", required=True, help='Vetor, ex.: "1,2"')
+    parser.add_argument("-o", "--output", required=True,
+                        help="Arquivo .gif/.mp4 ou diretório para a sequência de PNGs")
+    parser.add_argument("--format", choices=EXPORT_FORMATS)
+    parser.add_argument("--frames", type=positive_int, default=100)
+    parser.add_argument("--fps", type=float, default=50)
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--grid", action="store_true", help="Incluir a grade deformada")
+    parser.add_argument("--interpolation", choices=engine.INTERPOLATION_MODES, default="linear",
+                        help="Caminho de I até A: linear, exponencial/log ou polar")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    output = export_animation(parse_matrix(args.matrix), parse_vector(args.vector), args.output,
+                              fmt=args.format, frames=args.frames, fps=args.fps, dpi=args.dpi,
+                              show_grid=args.grid, interpolation=args.interpolation,
+                              workers=args.workers)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
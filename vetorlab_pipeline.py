@@ -0,0 +1,158 @@
+import functools
+
+import numpy as np
+
+import vetorlab_engine as engine
+
+# Número de matrizes cujas fatorações ficam em cache
+FACTORIZATION_CACHE_SIZE = 64
+
+# Quadros por etapa da animação de uma cadeia
+FRAMES_PER_STAGE = 50
+
+DECOMPOSITIONS = ("svd", "polar")
+
+
+# SVD, SVD com rotações próprias e polar: até três fatorações por matriz
+@functools.lru_cache(maxsize=3 * FACTORIZATION_CACHE_SIZE)
+def _cached_factors(factorize, matrix_bytes, d):
+    matrix = np.frombuffer(matrix_bytes, dtype=np.float64).reshape(d, d)
+    factors = factorize(matrix)
+    for factor in factors:
+        factor.setflags(write=False)
+    return factors
+
+
+def _factors(factorize, matrix):
+    # factorize(A) calculada uma vez por valor da matriz (fatores só leitura)
+    matrix = np.ascontiguousarray(engine.as_matrix_stack(matrix))
+    return _cached_factors(factorize, matrix.tobytes(), matrix.shape[0])
+
+
+def svd_factors(matrix):
+    # A = U·diag(S)·Vᵀ
+    return _factors(np.linalg.svd, matrix)
+
+
+def rotation_svd_factors(matrix):
+    # A = U·diag(S)·Vᵀ de engine.proper_svd (U e Vᵀ rotações)
+    return _factors(engine.proper_svd, matrix)
+
+
+def polar_factors(matrix):
+    # A = R·S de engine.proper_polar (R rotação)
+    return _factors(engine.proper_polar, matrix)
+
+
+def clear_factorization_cache():
+    _cached_factors.cache_clear()
+
+
+def decomposition_chain(matrix, kind):
+    # Cadeia cujas etapas, aplicadas em ordem, reproduzem A
+    if kind == "svd":
+        u, s, vt = rotation_svd_factors(matrix)
+        return MatrixChain([vt, np.diag(s), u],
+                           ["Vᵀ (rotação)", "Σ (escala)", "U (rotação)"])
+    if kind == "polar":
+        rotation, stretch = polar_factors(matrix)
+        return MatrixChain([stretch, rotation], ["S (esticamento)", "R (rotação)"])
+    raise ValueError(f"Decomposição desconhecida: {kind}")
+
+
+class MatrixChain:
+    """Sequência de transformações A1…Ak aplicadas em ordem (A1 primeiro).
+
+    Os produtos acumulados Pi = Ai·…·A1 e os caminhos interpolados de cada
+    etapa ficam em cache; editar a etapa i só invalida o que vem depois dela,
+    então percorrer a cadeia nunca recalcula prefixos inalterados.
+    """
+
+    def __init__(self, stages=(), labels=None):
+        self.stages = []
+        self.labels = []
+        self._products = []
+        self._paths = {}
+        labels = list(labels) if labels is not None else [None] * len(stages)
+        for matrix, label in zip(stages, labels):
+            self.append(matrix, label)
+
+    def __len__(self):
+        return len(self.stages)
+
+    @property
+    def dim(self):
+        return self.stages[0].shape[0] if self.stages else None
+
+    def _as_stage(self, matrix):
+        matrix = np.array(engine.as_matrix_stack(matrix), dtype=np.float64)
+        if matrix.ndim != 2 or (self.stages and matrix.shape != self.stages[0].shape):
+            raise ValueError("Todas as etapas devem ter a mesma dimensão (d, d)")
+        matrix.setflags(write=False)
+        return matrix
+
+    def _invalidate(self, index):
+        del self._products[index:]
+        self._paths = {key: path for key, path in self._paths.items() if key[0] < index}
+
+    def append(self, matrix, label=None):
+        self.stages.append(self._as_stage(matrix))
+        self.labels.append(label or f"A{len(self.stages)}")
+
+    def set_stage(self, index, matrix, label=None):
+        self.stages[index] = self._as_stage(matrix)
+        if label is not None:
+            self.labels[index] = label
+        self._invalidate(index)
+
+    def remove(self, index):
+        del self.stages[index]
+        del self.labels[index]
+        self._invalidate(index)
+
+    def clear(self):
+        self.stages.clear()
+        self.labels.clear()
+        self._invalidate(0)
+
+    def product(self, index=None):
+        # Produto acumulado até a etapa `index` (-1: identidade; None: cadeia toda)
+        if index is None:
+            index = len(self.stages) - 1
+        if index < 0:
+            return np.eye(self.dim)
+        # Estende apenas a partir do último prefixo válido
+        while len(self._products) <= index:
+            i = len(self._products)
+            previous = self._products[i - 1] if i else np.eye(self.dim)
+            product = self.stages[i] @ previous
+            product.setflags(write=False)
+            self._products.append(product)
+        return self._products[index]
+
+    def stage_path(self, index, frames=FRAMES_PER_STAGE, mode="linear"):
+        # Pilha (frames, d, d) de P(i-1) até Pi (exclusivo), em cache por etapa:
+        # M(t)·P(i-1), com M(t) o caminho de I até Ai no modo de interpolação
+        key = (index, frames, mode)
+        path = self._paths.get(key)
+        if path is None:
+            path = engine.interpolation_path(self.stages[index], frames, mode)
+            path = path @ self.product(index - 1)
+            path.setflags(write=False)
+            self._paths[key] = path
+        return path
+
+    def path(self, frames_per_stage=FRAMES_PER_STAGE, mode="linear"):
+        # Caminho completo: todas as etapas seguidas do produto final
+        if not self.stages:
+            raise ValueError("A cadeia está vazia")
+        paths = [self.stage_path(i, frames_per_stage, mode) for i in range(len(self.stages))]
+        return np.concatenate(paths + [self.product()[np.newaxis]])
+
+    def animation_frames(self, vector, frames_per_stage=FRAMES_PER_STAGE, mode="linear"):
+        # Buffer (k·frames + 1, d + 2, d) para AnimationScene
+        return engine.frames_from_matrices(self.path(frames_per_stage, mode), vector)
+
+    def stage_at(self, frame, frames_per_stage=FRAMES_PER_STAGE):
+        # Índice da etapa exibida num quadro da animação da cadeia
+        return min(frame // frames_per_stage, len(self.stages) - 1)
@@ -0,0 +1,278 @@
+import collections
+import contextlib
+import csv
+import datetime
+import functools
+import json
+import time
+
+import numpy as np
+
+# Quadros guardados por sessão (os mais antigos são descartados)
+MAX_SAMPLES = 10000
+
+# Quadros recentes usados no overlay e intervalo mínimo entre atualizações do texto (s)
+OVERLAY_WINDOW = 60
+OVERLAY_REFRESH = 0.25
+
+# Limites (ms) das classes dos histogramas exportados
+HISTOGRAM_EDGES_MS = (0, 1, 2, 4, 8, 16, 20, 33, 50, 100, 250, 500, 1000, float("inf"))
+HISTOGRAM_METRICS = ("compute_ms", "draw_ms", "interval_ms")
+
+
+class FrameProfiler:
+    """Mede o custo de cada quadro do gráfico e das animações.
+
+    Os callbacks são envolvidos por `frame`/`wrap` (tempo de cálculo) e os
+    métodos `draw`/`blit` do canvas por `attach` (tempo de desenho e tipo:
+    blit ou redesenho completo). Um quadro cujo desenho acontece depois do
+    callback (FuncAnimation, draw_idle) é concluído no desenho seguinte, e o
+    tempo de desenho conta do fim do cálculo até o fim do desenho.
+    """
+
+    def __init__(self, canvas=None, max_samples=MAX_SAMPLES):
+        self.samples = collections.deque(maxlen=max_samples)
+        self.started = time.perf_counter()
+        self.started_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self.canvas = None
+        self.overlay = None
+        self.overlay_enabled = False
+        self._active = None
+        self._pending = None
+        self._draw_depth = 0
+        self._overlay_refreshed = 0.0
+        self._overlay_pixels = None
+        self._overlay_key = None
+        if canvas is not None:
+            self.attach(canvas)
+
+    def attach(self, canvas):
+        # Envolve draw e blit da própria instância do canvas (draw_idle e o
+        # Tk chamam self.draw()/self.blit(), então passam pelos envoltórios)
+        if self.canvas is canvas:
+            return
+        self.canvas = canvas
+        canvas.draw = self._timed(canvas.draw, blit=False)
+        canvas.blit = self._timed(canvas.blit, blit=True)
+
+    def _timed(self, method, blit):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            # Só o desenho mais externo é medido (o draw do Tk chama blit)
+            self._draw_depth += 1
+            start = time.perf_counter()
+            try:
+                if blit and self._draw_depth == 1:
+                    self._draw_overlay()
+                return method(*args, **kwargs)
+            finally:
+                self._draw_depth -= 1
+                if self._draw_depth == 0:
+                    self._drawn(start, time.perf_counter(), blit)
+        return wrapper
+
+    def _drawn(self, start, end, blit):
+        frame = self._active
+        if frame is not None:
+            # Desenho síncrono dentro do callback (ex.: Scene.update com blit)
+            frame["draw_ms"] += (end - start) * 1e3
+            frame["blit"] = blit if frame["blit"] is None else frame["blit"] and blit
+            return
+        frame, self._pending = self._pending, None
+        if frame is None:
+            # Redesenho sem quadro associado (redimensionamento, zoom, arraste)
+            frame = self._new_frame("redraw", start)
+            frame["compute_ms"] = 0.0
+            frame["draw_ms"] = (end - start) * 1e3
+        else:
+            frame["draw_ms"] += (end - frame.pop("compute_end")) * 1e3
+        frame["blit"] = blit
+        self._record(frame)
+
+    def _new_frame(self, source, start, requested_ms=None, interval_ms=None):
+        return {"source": source, "time_s": start - self.started, "compute_ms": 0.0,
+                "draw_ms": 0.0, "blit": None, "interval_ms": interval_ms,
+                "requested_ms": requested_ms, "dropped": 0}
+
+    def _record(self, frame):
+        requested, interval = frame["requested_ms"], frame["interval_ms"]
+        if requested and interval is not None:
+            frame["dropped"] = max(0, round(interval / requested) - 1)
+        self.samples.append(frame)
+
+    @contextlib.contextmanager
+    def frame(self, source, requested_ms=None, interval_ms=None):
+        # Mede o cálculo de um quadro; o desenho é somado quando acontecer
+        if self._pending is not None:
+            # O quadro anterior nunca foi desenhado (substituído por este)
+            self._pending.pop("compute_end")
+            self._record(self._pending)
+            self._pending = None
+        start = time.perf_counter()
+        frame = self._active = self._new_frame(source, start, requested_ms, interval_ms)
+        try:
+            yield frame
+        finally:
+            self._active = None
+            end = time.perf_counter()
+            frame["compute_ms"] = (end - start) * 1e3 - frame["draw_ms"]
+            if frame["blit"] is None:
+                frame["compute_end"] = end
+                self._pending = frame
+            else:
+                self._record(frame)
+
+    def wrap(self, callback, source, requested_ms=None):
+        # Envolve o callback de uma FuncAnimation; o intervalo real é medido
+        # entre inícios de quadros consecutivos desta mesma animação
+        previous = None
+
+        @functools.wraps(callback)
+        def wrapper(*args, **kwargs):
+            nonlocal previous
+            start = time.perf_counter()
+            interval = None if previous is None else (start - previous) * 1e3
+            previous = start
+            with self.frame(source, requested_ms, interval):
+                return callback(*args, **kwargs)
+        return wrapper
+
+    def clear(self):
+        self.samples.clear()
+        self._pending = None
+
+    def set_overlay(self, enabled):
+        self.overlay_enabled = enabled
+        if not enabled:
+            self.remove_overlay()
+
+    def remove_overlay(self):
+        if self.overlay is not None:
+            try:
+                self.overlay.remove()
+            except (ValueError, NotImplementedError):
+                # Os eixos já foram limpos (fig.clf) junto com o texto
+                pass
+            self.overlay = None
+            self._overlay_pixels = None
+
+    def _draw_overlay(self):
+        # Desenhado logo antes de cada blit, nunca no redesenho completo: o
+        # texto não entra nos fundos guardados pelas cenas e pela FuncAnimation
+        if not self.overlay_enabled or self.canvas is None:
+            return
+        fig = self.canvas.figure
+        ax = next((ax for ax in fig.axes if ax.get_visible()), None)
+        if ax is None:
+            return
+        if self.overlay is None or self.overlay.axes is not ax:
+            from matplotlib.text import Text
+            self.remove_overlay()
+            # Caixa opaca: os pixels renderizados não dependem do que está atrás
+            self.overlay = ax.add_artist(Text(
+                0.01, 0.99, "", transform=ax.transAxes, ha="left", va="top",
+                family="monospace", fontsize=8, animated=True,
+                bbox=dict(boxstyle="round", facecolor="white", edgecolor="0.6")))
+            self._overlay_pixels = None
+        now = time.perf_counter()
+        key = fig.bbox.bounds
+        if self._overlay_pixels is None or key != self._overlay_key or \
+                now - self._overlay_refreshed >= OVERLAY_REFRESH:
+            # Renderizar texto custa vários ms; entre atualizações só se copiam os pixels
+            self._overlay_refreshed = now
+            self._overlay_key = key
+            self.overlay.set_text(self.overlay_text())
+            ax.draw_artist(self.overlay)
+            extent = self.overlay.get_bbox_patch().get_window_extent().padded(2)
+            self._overlay_pixels = self.canvas.copy_from_bbox(extent)
+        else:
+            self.canvas.restore_region(self._overlay_pixels)
+
+    def overlay_text(self):
+        frames = [f for f in list(self.samples)[-OVERLAY_WINDOW:] if f["source"] != "redraw"]
+        if not frames:
+            return "sem quadros medidos"
+        compute = np.mean([f["compute_ms"] for f in frames])
+        draw = np.mean([f["draw_ms"] for f in frames])
+        blits = sum(bool(f["blit"]) for f in frames)
+        lines = [f"cálculo {compute:5.1f} ms  desenho {draw:5.1f} ms",
+                 f"blit {blits}/{len(frames)}  perdidos {sum(f['dropped'] for f in frames)}"]
+        intervals = [f["interval_ms"] for f in frames if f["interval_ms"] is not None]
+        if intervals:
+            fps = 1000 / np.mean(intervals)
+            requested = frames[-1]["requested_ms"]
+            target = f" (alvo {1000 / requested:.0f})" if requested else ""
+            lines.insert(0, f"FPS {fps:5.1f}{target}")
+        return "\n".join(lines)
+
+    def summary(self):
+        # Estatísticas por origem (plot, animation, chain, redraw)
+        by_source = collections.defaultdict(list)
+        for frame in self.samples:
+            by_source[frame["source"]].append(frame)
+        result = {}
+        for source, frames in by_source.items():
+            stats = {
+                "frames": len(frames),
+                "blit_frames": sum(bool(f["blit"]) for f in frames),
+                "full_redraws": sum(f["blit"] is False for f in frames),
+                "dropped": sum(f["dropped"] for f in frames),
+            }
+            for metric in HISTOGRAM_METRICS:
+                values = np.array([f[metric] for f in frames if f[metric] is not None])
+                if len(values):
+                    stats[metric] = {
+                        "mean": float(values.mean()), "p50": float(np.percentile(values, 50)),
+                        "p95": float(np.percentile(values, 95)), "max": float(values.max()),
+                    }
+            if "interval_ms" in stats:
+                stats["fps"] = 1000 / stats["interval_ms"]["mean"]
+                requested = [f["requested_ms"] for f in frames if f["requested_ms"]]
+                if requested:
+                    stats["requested_fps"] = 1000 / float(np.mean(requested))
+            result[source] = stats
+        return result
+
+    def histograms(self):
+        edges = np.array(HISTOGRAM_EDGES_MS)
+        result = {}
+        for source in sorted({f["source"] for f in self.samples}):
+            result[source] = {}
+            for metric in HISTOGRAM_METRICS:
+                values = [f[metric] for f in self.samples
+                          if f["source"] == source and f[metric] is not None]
+                counts, _ = np.histogram(values, bins=edges)
+                result[source][metric] = counts.tolist()
+        return result
+
+    def write_json(self, path):
+        data = {
+            "started_at": self.started_at,
+            "duration_s": time.perf_counter() - self.started,
+            "histogram_edges_ms": [e if np.isfinite(e) else None for e in HISTOGRAM_EDGES_MS],
+            "summary": self.summary(),
+            "histograms": self.histograms(),
+            "frames": list(self.samples),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        return path
+
+    def write_csv(self, path):
+        # Uma linha por classe de histograma: origem, métrica, limites e contagem
+        edges = HISTOGRAM_EDGES_MS
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["source", "metric", "bin_start_ms", "bin_end_ms", "count"])
+            for source, metrics in self.histograms().items():
+                for metric, counts in metrics.items():
+                    for start, end, count in zip(edges[:-1], edges[1:], counts):
+                        writer.writerow([source, metric, start, "" if end == float("inf") else end,
+                                         count])
+        return path
+
+    def export(self, path):
+        # .json: resumo, histogramas e quadros; .csv: histogramas
+        if path.lower().endswith(".csv"):
+            return self.write_csv(path)
+        return self.write_json(path)
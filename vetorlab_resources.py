@@ -0,0 +1,163 @@
+import gc
+import os
+import sys
+
+
+def process_rss():
+    # Memória residente atual do processo em bytes (None se não for possível medir)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + \
+                [(name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                    "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage",
+                    "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+
+class ResourceManager:
+    """Dono da figura, das cenas, da animação, das janelas auxiliares e dos
+    callbacks agendados no Tk.
+
+    Existe no máximo uma animação viva; substituí-la ou limpar a figura
+    cancela o timer e desconecta todos os callbacks antes de soltar as
+    referências, para que sessões longas não acumulem artistas nem timers.
+    """
+
+    def __init__(self, root, fig, profiler=None):
+        self.root = root
+        self.fig = fig
+        self.profiler = profiler
+        self.scenes = {}
+        self.animation = None
+        self.animation_scene = None
+        self.windows = {}
+        self.jobs = {}
+        self.closeables = []
+
+    def start_animation(self, scene, func, interval):
+        # Importada só na primeira animação (não pesa na inicialização)
+        from matplotlib.animation import FuncAnimation
+
+        self.stop_animation()
+        self.animation_scene = scene
+        self.animation = FuncAnimation(self.fig, func, frames=len(scene), interval=interval,
+                                       blit=True)
+        return self.animation
+
+    def stop_animation(self):
+        # FuncAnimation não tem um descarte público: pause() deixa o tratador de
+        # redimensionamento conectado, e ele religa o timer no próximo resize.
+        # Aqui o timer é parado e todos os callbacks da animação desconectados.
+        animation, self.animation = self.animation, None
+        if animation is None:
+            return
+        self.fig.canvas.mpl_disconnect(animation._first_draw_id)
+        if animation.event_source is not None:
+            animation.event_source.stop()
+            animation._stop()
+
+    def discard_scenes(self):
+        for scene in list(self.scenes.values()) + [self.animation_scene]:
+            if scene is not None:
+                scene.disconnect()
+        self.scenes.clear()
+        self.animation_scene = None
+
+    def clear_figure(self):
+        # Para a animação, desconecta as cenas e esvazia a figura
+        self.stop_animation()
+        self.discard_scenes()
+        if self.profiler is not None:
+            self.profiler.remove_overlay()
+        self.fig.clf()
+
+    def open_window(self, key, build):
+        # Uma janela auxiliar por chave: se já estiver aberta, só é trazida à frente.
+        # Retorna (janela, criada)
+        window = self.windows.get(key)
+        if window is not None and window.winfo_exists():
+            window.deiconify()
+            window.lift()
+            window.focus_set()
+            return window, False
+        window = build()
+        self.windows[key] = window
+
+        def forget(event):
+            if event.widget is window and self.windows.get(key) is window:
+                del self.windows[key]
+        window.bind("<Destroy>", forget, add="+")
+        return window, True
+
+    def close_window(self, key):
+        window = self.windows.pop(key, None)
+        if window is not None and window.winfo_exists():
+            window.destroy()
+
+    def schedule(self, key, delay, callback):
+        # Um job por chave: reagendar substitui o pendente
+        self.cancel(key)
+
+        def run():
+            self.jobs.pop(key, None)
+            callback()
+        self.jobs[key] = self.root.after(delay, run)
+
+    def cancel(self, key):
+        job = self.jobs.pop(key, None)
+        if job is not None:
+            self.root.after_cancel(job)
+
+    def register(self, resource):
+        # Objetos com close() liberados no encerramento (ex.: gravador do questionário)
+        self.closeables.append(resource)
+        return resource
+
+    def unregister(self, resource):
+        if resource in self.closeables:
+            self.closeables.remove(resource)
+
+    def stats(self):
+        rss = process_rss()
+        return {
+            "eixos": len(self.fig.axes),
+            "artistas": len(self.fig.findobj()),
+            "callbacks": sum(len(c) for c in self.fig.canvas.callbacks.callbacks.values()),
+            "animações": int(self.animation is not None),
+            "janelas": sum(w.winfo_exists() for w in self.windows.values()),
+            "agendados": len(self.jobs),
+            "objetos": len(gc.get_objects()),
+            "rss_mb": None if rss is None else rss / 2 ** 20,
+        }
+
+    def format_stats(self):
+        stats = self.stats()
+        rss = stats.pop("rss_mb")
+        text = " | ".join(f"{name}: {value}" for name, value in stats.items())
+        return text if rss is None else f"{text} | RSS: {rss:.1f} MB"
+
+    def close(self):
+        # Encerramento: cancela os jobs, fecha as janelas, libera a figura e o Tk
+        for key in list(self.jobs):
+            self.cancel(key)
+        for key in list(self.windows):
+            self.close_window(key)
+        for resource in self.closeables:
+            resource.close()
+        self.clear_figure()
+        self.root.destroy()
@@ -0,0 +1,1018 @@
+import numpy as np
+from matplotlib.collections import LineCollection
+import matplotlib.patches as patches
+
+import vetorlab_engine as engine
+from vetorlab_analysis import analyze, unit_cell_edges
+from vetorlab_datasets import ImageWarp, PointWarp
+
+# Limites dos eixos e linhas inteiras da grade de fundo
+AXIS_LIMIT = 5
+GRID_TICKS = np.arange(-AXIS_LIMIT, AXIS_LIMIT + 1)
+
+# Resolução (pixels por lado) da imagem deformada no gráfico e na animação
+WARP_RESOLUTION = 512
+ANIMATION_WARP_RESOLUTION = 320
+
+# Grade deformada: retas por direção (2D) ou por eixo do reticulado (3D, 3·n²
+# retas) em cada densidade. Com blit no Agg, 201 retas em 2D custam ~20 ms por
+# quadro (abaixo dos 50 quadros/s da animação) e, em 3D, a projeção do mplot3d
+# domina a partir de n = 15: o padrão é a maior densidade que mantém a taxa
+GRID_DENSITIES = {"low": {2: 41, 3: 5}, "medium": {2: 101, 3: 11}, "high": {2: 201, 3: 15}}
+DEFAULT_GRID_DENSITY = "medium"
+
+# Alcance da grade em cada dimensão. Em 2D ela vai além dos eixos para
+# continuar cobrindo a vista quando A contrai.
+GRID_EXTENT = {2: 2 * AXIS_LIMIT, 3: AXIS_LIMIT}
+
+
+def grid_segments_2d(ticks=GRID_TICKS, limit=AXIS_LIMIT):
+    # Todas as linhas verticais e horizontais da grade como segmentos (2n, 2, 2)
+    ticks = np.asarray(ticks, dtype=np.float64)
+    lo = np.full_like(ticks, -limit)
+    hi = np.full_like(ticks, limit)
+    vertical = np.stack([np.column_stack([ticks, lo]), np.column_stack([ticks, hi])], axis=1)
+    horizontal = np.stack([np.column_stack([lo, ticks]), np.column_stack([hi, ticks])], axis=1)
+    return np.concatenate([vertical, horizontal])
+
+
+class DeformedGrid:
+    # Grade densa deformada por uma matriz, desenhada como uma única coleção.
+    # Os segmentos-base são fixos e o resultado é escrito sempre no mesmo buffer.
+    def __init__(self, ax, dim, density=DEFAULT_GRID_DENSITY):
+        self.dim = dim
+        self.density = None
+        self.set_density(density)
+        style = dict(colors='orange', linewidths=0.6, alpha=0.5)
+        if dim == 2:
+            self.artist = LineCollection(self.buffer, **style)
+            ax.add_collection(self.artist, autolim=False)
+        else:
+            # mplot3d só é carregado quando uma cena 3D é usada pela primeira vez
+            from mpl_toolkits.mplot3d import art3d
+            self.artist = art3d.Line3DCollection(self.buffer, **style)
+            ax.add_collection3d(self.artist, autolim=False)
+
+    def set_density(self, density):
+        # Troca os segmentos-base mantendo o mesmo artista (nada muda se a
+        # densidade é a atual)
+        if density == self.density:
+            return
+        self.density = density
+        self.base = engine.grid_lines(self.dim, GRID_DENSITIES[density][self.dim],
+                                      GRID_EXTENT[self.dim])
+        self.buffer = self.base.copy()
+
+    def set_matrix(self, matrix):
+        engine.transform_segments(matrix, self.base, out=self.buffer)
+        self.artist.set_segments(self.buffer)
+
+
+def _set_text(text, position):
+    # Posiciona um texto 2D ou 3D
+    if len(position) == 3:
+        _set_text_3d(text, position)
+    else:
+        text.set_position((position[0], position[1]))
+
+
+class AnalysisOverlay:
+    # Retas invariantes (autovetores reais) e imagem do quadrado/cubo unitário
+    # anotada com det(A). Os dados vêm da análise em cache da matriz: redesenhar
+    # não repete nenhuma decomposição.
+    def __init__(self, ax, dim, extent=AXIS_LIMIT):
+        self.dim = dim
+        self.extent = extent
+        line_style = dict(colors='purple', linewidths=1.0, linestyles='--', alpha=0.7)
+        cell_style = dict(colors='purple', linewidths=1.5)
+        if dim == 2:
+            self.lines = LineCollection(np.zeros((0, 2, 2)), **line_style)
+            self.cell = LineCollection(np.zeros((0, 2, 2)), **cell_style)
+            for collection in (self.lines, self.cell):
+                ax.add_collection(collection, autolim=False)
+        else:
+            from mpl_toolkits.mplot3d import art3d
+            self.lines = art3d.Line3DCollection(np.zeros((0, 2, 3)), **line_style)
+            self.cell = art3d.Line3DCollection(np.zeros((0, 2, 3)), **cell_style)
+            for collection in (self.lines, self.cell):
+                ax.add_collection3d(collection, autolim=False)
+        origin = (0,) * dim
+        self.line_texts = [ax.text(*origin, '', fontsize=9, color='purple', ha='left', va='bottom')
+                           for _ in range(dim)]
+        self.det_text = ax.text(*origin, '', fontsize=10, color='purple', ha='center',
+                                va='center')
+        self.artists = (self.lines, self.cell, *self.line_texts, self.det_text)
+
+    def set_visible(self, visible):
+        for artist in self.artists:
+            artist.set_visible(visible)
+
+    def set_lines(self, analysis):
+        directions = analysis.invariant_lines * self.extent
+        self.lines.set_segments(np.stack([-directions, directions], axis=1))
+        for i, text in enumerate(self.line_texts):
+            if i < len(directions):
+                text.set_text(f'λ={analysis.invariant_values[i]:.2f}')
+                _set_text(text, directions[i])
+            text.set_visible(i < len(directions) and self.lines.get_visible())
+
+    def set_cell(self, segments, center, det):
+        self.cell.set_segments(segments)
+        self.det_text.set_text(f'det={det:.2f}')
+        _set_text(self.det_text, center)
+
+    def set_analysis(self, analysis):
+        self.set_lines(analysis)
+        self.set_cell(analysis.unit_cell, analysis.unit_cell_center, analysis.determinant)
+
+
+class DatasetLayer:
+    # Imagem ou nuvem de pontos transformada, num único artista (AxesImage ou
+    # coleção de pontos). `set_matrix` recebe uma matriz (k, d): A, ou P·A nas
+    # projeções de R^d; os buffers de saída são reaproveitados a cada chamada.
+    def __init__(self, ax, dataset, resolution=WARP_RESOLUTION, animated=False):
+        self.dataset = dataset
+        if dataset.kind == "image":
+            self.warp = ImageWarp(dataset, resolution, AXIS_LIMIT)
+            self.artist = ax.imshow(self.warp.output, extent=self.warp.view_extent, origin='lower',
+                                    interpolation='none', aspect='auto', zorder=0.8,
+                                    animated=animated)
+        else:
+            self.warp = PointWarp(dataset)
+            style = dict(s=2, color='teal', alpha=0.4, linewidths=0, zorder=1.5, animated=animated)
+            if ax.name == '3d':
+                self.artist = ax.scatter([], [], [], depthshade=False, **style)
+            else:
+                self.artist = ax.scatter(np.zeros(0), np.zeros(0), **style)
+
+    def set_matrix(self, matrix):
+        output = self.warp.warp(matrix)
+        if self.dataset.kind == "image":
+            self.artist.set_data(output)
+        elif output.shape[1] == 3:
+            self.artist._offsets3d = tuple(output.T)
+        else:
+            self.artist.set_offsets(output)
+
+    def remove(self):
+        self.artist.remove()
+
+
+class Scene:
+    # Cena retida: a estrutura estática (eixos, grade, base canônica) é criada
+    # uma única vez; `update` só altera os dados dos artistas dinâmicos e os
+    # redesenha por blit sobre o fundo em cache, limitado à área do gráfico.
+    dim = None
+    # A grade deformada e o overlay da análise só existem em 2D e 3D (não em
+    # projeções de R^d)
+    supports_grid = True
+    supports_analysis = True
+
+    def __init__(self, fig, show_grid=False, blit=True, show_analysis=False, dataset=None,
+                 grid_density=DEFAULT_GRID_DENSITY):
+        self.fig = fig
+        self.ax = None
+        self.show_grid = show_grid
+        self.grid_density = grid_density
+        self.show_analysis = show_analysis
+        # Imagem/nuvem de pontos exibida junto com os vetores (camada criada no update)
+        self.dataset = dataset
+        self.layer = None
+        # Sem blit (exportação/renderização fora da tela) todos os artistas
+        # participam do desenho completo da figura
+        self.use_blit = blit
+        self.dynamic_artists = []
+        self._background = None
+        self._legend_key = None
+        self._state = (None, None, None)
+        self.analysis = None
+        self.build()
+        self.grid.artist.set_visible(False)
+        if self.supports_analysis:
+            self.analysis = AnalysisOverlay(self.ax, self.dim)
+            for artist in self.analysis.artists:
+                self.add_dynamic(artist)
+            self.analysis.set_visible(False)
+        self._draw_cid = fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def build(self):
+        raise NotImplementedError
+
+    def set_data(self, original_vector, transformed_vector, matrix):
+        raise NotImplementedError
+
+    def legend_entries(self):
+        # Pares (artista, rótulo) visíveis na legenda
+        entries = [(self.base_plot, 'Base Original')]
+        if self.orig_plot.get_visible():
+            entries += [(self.orig_plot, 'Original'), (self.trans_plot, 'Transformado')]
+        if self.trans_base_plot.get_visible():
+            entries.append((self.trans_base_plot, 'Base Transformada'))
+        return entries
+
+    def is_alive(self):
+        return self.ax is not None and self.ax in self.fig.axes
+
+    def show(self, visible=True):
+        if self.ax.get_visible() != visible:
+            self.ax.set_visible(visible)
+            # O fundo guardado não corresponde mais ao que está na tela
+            self._background = None
+
+    def disconnect(self):
+        self.fig.canvas.mpl_disconnect(self._draw_cid)
+
+    def add_dynamic(self, artist):
+        artist.set_animated(self.use_blit)
+        self.dynamic_artists.append(artist)
+        return artist
+
+    def set_grid_visible(self, visible):
+        # Mostrar/ocultar a grade deformada mantendo os dados atuais
+        self.show_grid = visible
+        self.update(*self._state)
+
+    def set_grid_density(self, density):
+        self.grid_density = density
+        self.update(*self._state)
+
+    def set_analysis_visible(self, visible):
+        # Mostrar/ocultar autovetores e quadrado/cubo unitário transformado
+        self.show_analysis = visible
+        self.update(*self._state)
+
+    def set_dataset(self, dataset):
+        self.dataset = dataset
+        self.update(*self._state)
+
+    def dataset_matrix(self, matrix):
+        # Matriz aplicada à camada de dados: A (identidade sem matriz)
+        return np.eye(self.dim) if matrix is None else matrix
+
+    def sync_layer(self):
+        # Recria a camada quando o conjunto de dados muda; a imagem/nuvem fica
+        # atrás dos vetores (primeiro artista dinâmico)
+        dataset = self.dataset if self.dataset is not None and \
+            self.dataset.supports(self.dim) else None
+        if (self.layer and self.layer.dataset) is dataset:
+            return
+        if self.layer is not None:
+            self.dynamic_artists.remove(self.layer.artist)
+            self.layer.remove()
+            self.layer = None
+        if dataset is not None:
+            self.layer = DatasetLayer(self.ax, dataset, animated=self.use_blit)
+            self.dynamic_artists.insert(0, self.layer.artist)
+
+    def update(self, original_vector=None, transformed_vector=None, matrix=None):
+        self._state = (original_vector, transformed_vector, matrix)
+        has_vector = original_vector is not None and transformed_vector is not None
+        has_matrix = has_vector and matrix is not None
+        self.set_data(original_vector if has_vector else None,
+                      transformed_vector if has_vector else None,
+                      matrix if has_matrix else None)
+
+        show_grid = self.show_grid and self.supports_grid and has_matrix
+        self.grid.artist.set_visible(show_grid)
+        if show_grid:
+            self.grid.set_density(self.grid_density)
+            self.grid.set_matrix(matrix)
+
+        self.sync_layer()
+        if self.layer is not None:
+            self.layer.set_matrix(self.dataset_matrix(matrix if has_matrix else None))
+
+        if self.analysis is not None:
+            show_analysis = self.show_analysis and has_matrix
+            self.analysis.set_visible(show_analysis)
+            if show_analysis:
+                self.analysis.set_analysis(analyze(matrix))
+
+        # A legenda faz parte do fundo: só é refeita quando muda o conjunto de
+        # elementos exibidos, e nesse caso é necessário um redesenho completo
+        legend_key = (has_vector, has_matrix)
+        if legend_key != self._legend_key:
+            self._legend_key = legend_key
+            handles, labels = zip(*self.legend_entries())
+            self.ax.legend(handles, labels, **self.legend_kwargs())
+            self._background = None
+        if not self.use_blit:
+            return
+        if self._background is None:
+            self.fig.canvas.draw_idle()
+        else:
+            self.blit()
+
+    def legend_kwargs(self):
+        return {}
+
+    def blit(self):
+        canvas = self.fig.canvas
+        canvas.restore_region(self._background)
+        self.draw_dynamic()
+        canvas.blit(self.ax.bbox)
+
+    def draw_dynamic(self):
+        for artist in self.dynamic_artists:
+            if artist.get_visible():
+                self.ax.draw_artist(artist)
+
+    def _on_draw(self, event):
+        # Após cada redesenho completo (inclusive redimensionamento), guardar o
+        # fundo e desenhar os artistas dinâmicos por cima
+        if not self.use_blit or not self.is_alive() or not self.ax.get_visible():
+            return
+        self._background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        self.draw_dynamic()
+
+
+class Scene2D(Scene):
+    dim = 2
+
+    def build(self):
+        ax = self.ax = self.fig.add_subplot(111)
+        ax.set_xlim(-AXIS_LIMIT, AXIS_LIMIT)
+        ax.set_ylim(-AXIS_LIMIT, AXIS_LIMIT)
+        ax.axhline(0, color='black', linewidth=0.5)
+        ax.axvline(0, color='black', linewidth=0.5)
+        ax.grid(True)
+        ax.set_title('Transformação Linear 2D')
+        ax.set_xlabel('Eixo X')
+        ax.set_ylabel('Eixo Y')
+
+        # Grade de fundo com menor opacidade, numa única coleção
+        ax.add_collection(LineCollection(grid_segments_2d(), colors='lightgray',
+                                         linestyles='-', alpha=0.3), autolim=False)
+
+        # Plotar base canônica original
+        self.base_plot = ax.quiver(0, 0, 1, 0, angles='xy', scale_units='xy', scale=1,
+                                   color='gray', width=0.005, label='Base Original')
+        ax.quiver(0, 0, 0, 1, angles='xy', scale_units='xy', scale=1,
+                  color='gray', width=0.005)
+
+        # Adicionar rótulos aos eixos
+        ax.text(AXIS_LIMIT + 0.2, 0, 'X', fontsize=12, ha='center', va='center')
+        ax.text(0, AXIS_LIMIT + 0.2, 'Y', fontsize=12, ha='center', va='center')
+
+        # Artistas dinâmicos: criados uma vez, atualizados a cada chamada
+        self.grid = DeformedGrid(ax, 2, self.grid_density)
+        self.add_dynamic(self.grid.artist)
+        self.polygon = self.add_dynamic(patches.Polygon(np.zeros((4, 2)), closed=True,
+                                                        fill=True, alpha=0.1, color='purple'))
+        ax.add_patch(self.polygon)
+        self.orig_plot = self.add_dynamic(ax.quiver(0, 0, 0, 0, angles='xy', scale_units='xy',
+                                                    scale=1, color='blue', width=0.015,
+                                                    label='Original'))
+        self.trans_plot = self.add_dynamic(ax.quiver(0, 0, 0, 0, angles='xy', scale_units='xy',
+                                                     scale=1, color='red', width=0.015,
+                                                     label='Transformado'))
+        self.trans_base_plot = self.add_dynamic(ax.quiver([0, 0], [0, 0], [0, 0], [0, 0],
+                                                          angles='xy', scale_units='xy', scale=1,
+                                                          color='green', width=0.010,
+                                                          linestyle='--', label='Base Transformada'))
+        self.orig_text = self.add_dynamic(ax.text(0, 0, 'v', fontsize=12, color='blue',
+                                                  ha='center', va='center'))
+        self.trans_text = self.add_dynamic(ax.text(0, 0, 'Av', fontsize=12, color='red',
+                                                   ha='center', va='center'))
+        self.base_texts = [self.add_dynamic(ax.text(0, 0, label, fontsize=10, color='green',
+                                                    ha='center', va='center'))
+                           for label in ('A·i', 'A·j')]
+        self.set_data(None, None, None)
+
+    def set_data(self, original_vector, transformed_vector, matrix):
+        has_vector = original_vector is not None
+        has_matrix = matrix is not None
+        for artist in (self.orig_plot, self.trans_plot, self.orig_text, self.trans_text):
+            artist.set_visible(has_vector)
+        for artist in (self.trans_base_plot, self.polygon, *self.base_texts):
+            artist.set_visible(has_matrix)
+
+        if has_vector:
+            self.orig_plot.set_UVC(original_vector[0], original_vector[1])
+            self.trans_plot.set_UVC(transformed_vector[0], transformed_vector[1])
+            self.orig_text.set_position((original_vector[0] / 2, original_vector[1] / 2))
+            self.trans_text.set_position((transformed_vector[0] / 2, transformed_vector[1] / 2))
+
+        if has_matrix:
+            # Colunas de A: imagens da base canônica
+            trans_base_x, trans_base_y = analyze(matrix).basis_images
+            self.trans_base_plot.set_UVC([trans_base_x[0], trans_base_y[0]],
+                                         [trans_base_x[1], trans_base_y[1]])
+            for text, vec in zip(self.base_texts, (trans_base_x, trans_base_y)):
+                text.set_position((vec[0] / 2, vec[1] / 2))
+
+            # Paralelogramo da combinação linear
+            self.polygon.set_xy(np.array([
+                [0, 0],
+                trans_base_x * original_vector[0],
+                trans_base_x * original_vector[0] + trans_base_y * original_vector[1],
+                trans_base_y * original_vector[1]
+            ]))
+
+    def legend_kwargs(self):
+        return {'loc': 'upper right'}
+
+
+class Scene3D(Scene):
+    dim = 3
+
+    def build(self):
+        ax = self.ax = self.fig.add_subplot(111, projection='3d')
+        ax.set_xlim(-AXIS_LIMIT, AXIS_LIMIT)
+        ax.set_ylim(-AXIS_LIMIT, AXIS_LIMIT)
+        ax.set_zlim(-AXIS_LIMIT, AXIS_LIMIT)
+        ax.set_title('Transformação Linear 3D')
+        ax.set_xlabel('Eixo X')
+        ax.set_ylabel('Eixo Y')
+        ax.set_zlabel('Eixo Z')
+
+        # Plotar base canônica original
+        base_vectors = np.eye(3)
+        self.base_plot = ax.quiver(0, 0, 0, base_vectors[0], base_vectors[1], base_vectors[2],
+                                   color='gray', linestyle='-', linewidth=1,
+                                   arrow_length_ratio=0.1, label='Base Original')
+
+        # Artistas dinâmicos: criados uma vez, atualizados a cada chamada
+        self.grid = DeformedGrid(ax, 3, self.grid_density)
+        self.add_dynamic(self.grid.artist)
+        self.orig_plot = self.add_dynamic(ax.quiver(0, 0, 0, 1, 1, 1, color='blue', linewidth=2,
+                                                    arrow_length_ratio=0.1, label='Original'))
+        self.trans_plot = self.add_dynamic(ax.quiver(0, 0, 0, 1, 1, 1, color='red', linewidth=2,
+                                                     arrow_length_ratio=0.1, label='Transformado'))
+        self.trans_base_plot = self.add_dynamic(ax.quiver(0, 0, 0, base_vectors[0], base_vectors[1],
+                                                          base_vectors[2], color='green',
+                                                          linestyle='--', linewidth=1,
+                                                          arrow_length_ratio=0.1,
+                                                          label='Base Transformada'))
+        self.orig_text = self.add_dynamic(ax.text(0, 0, 0, 'v', fontsize=12, color='blue',
+                                                  ha='center', va='center'))
+        self.trans_text = self.add_dynamic(ax.text(0, 0, 0, 'Av', fontsize=12, color='red',
+                                                   ha='center', va='center'))
+        self.base_texts = [self.add_dynamic(ax.text(0, 0, 0, f'A·e{i+1}', fontsize=10,
+                                                    color='green', ha='center', va='center'))
+                           for i in range(3)]
+        self.set_data(None, None, None)
+
+    def set_data(self, original_vector, transformed_vector, matrix):
+        has_vector = original_vector is not None
+        has_matrix = matrix is not None
+        for artist in (self.orig_plot, self.trans_plot, self.orig_text, self.trans_text):
+            artist.set_visible(has_vector)
+        for artist in (self.trans_base_plot, *self.base_texts):
+            artist.set_visible(has_matrix)
+
+        if has_vector:
+            self.orig_plot.set_segments(engine.arrow_segments_3d(original_vector))
+            self.trans_plot.set_segments(engine.arrow_segments_3d(transformed_vector))
+            _set_text_3d(self.orig_text, original_vector)
+            _set_text_3d(self.trans_text, transformed_vector)
+
+        if has_matrix:
+            trans_base_vectors = self.basis_images(matrix)
+            self.trans_base_plot.set_segments(engine.arrow_segments_3d(trans_base_vectors))
+            for text, vec in zip(self.base_texts, trans_base_vectors):
+                _set_text_3d(text, vec)
+
+    def basis_images(self, matrix):
+        # Linhas: A·e1, A·e2, A·e3
+        return analyze(matrix).basis_images
+
+    def draw_dynamic(self):
+        # No blit os artistas são desenhados fora de Axes3D.draw: projetar aqui
+        for artist in self.dynamic_artists:
+            if artist.get_visible() and hasattr(artist, 'do_3d_projection'):
+                artist.do_3d_projection()
+        super().draw_dynamic()
+
+
+class ProjectedScene(Scene3D):
+    # R^d (d > 3) visto em 3D por uma base ortonormal P (3, d): PCA da base
+    # transformada ou eixos escolhidos. P vem do cache de engine.projection_basis
+    # e a base canônica projetada (parte do fundo) só é refeita quando P muda.
+    supports_grid = False
+    supports_analysis = False
+
+    def __init__(self, fig, dim, view_axes=None, show_grid=False, blit=True, show_analysis=False,
+                 dataset=None, grid_density=DEFAULT_GRID_DENSITY):
+        self.dim = dim
+        self.view_axes = view_axes
+        self.projection = np.eye(3, dim)
+        super().__init__(fig, show_grid=show_grid, blit=blit, show_analysis=show_analysis,
+                         dataset=dataset, grid_density=grid_density)
+
+    def build(self):
+        super().build()
+        self.ax.set_title(f'Transformação Linear {self.dim}D (projeção em 3D)')
+        self.ax.set_xlabel('Direção 1')
+        self.ax.set_ylabel('Direção 2')
+        self.ax.set_zlabel('Direção 3')
+        self.base_plot.set_segments(engine.arrow_segments_3d(self.projection.T))
+
+    def set_view_axes(self, view_axes):
+        if view_axes != self.view_axes:
+            self.view_axes = view_axes
+            self.update(*self._state)
+
+    def set_data(self, original_vector, transformed_vector, matrix):
+        if matrix is not None:
+            projection = engine.projection_basis(matrix, 3, self.view_axes)
+            if projection is not self.projection:
+                self.projection = projection
+                self.base_plot.set_segments(engine.arrow_segments_3d(projection.T))
+                # A base canônica projetada está no fundo em cache
+                self._background = None
+        if original_vector is not None:
+            original_vector = engine.project(original_vector, self.projection)
+            transformed_vector = engine.project(transformed_vector, self.projection)
+        super().set_data(original_vector, transformed_vector, matrix)
+
+    def basis_images(self, matrix):
+        # Linhas: P·A·e_i para i = 1..d
+        return engine.project(analyze(matrix).basis_images, self.projection)
+
+    def dataset_matrix(self, matrix):
+        # Pontos de R^d vão direto para a vista: P·A (3, d)
+        return self.projection if matrix is None else \
+            self.projection @ np.asarray(matrix, dtype=np.float64)
+
+
+# Número de quadros da animação "Passo a Passo"
+ANIMATION_FRAMES = 100
+
+
+class AnimationScene:
+    # Cena da animação "Passo a Passo": os artistas são criados uma vez e cada
+    # quadro só indexa o buffer pré-calculado de engine.animation_frames.
+    # Usada tanto pela FuncAnimation do app quanto pela exportação fora da tela.
+    dim = None
+
+    def __init__(self, fig, original_vector, matrix, frames=ANIMATION_FRAMES,
+                 show_grid=False, blit=True, projection=None, buffer=None,
+                 interpolation="linear", analysis=None, dataset=None,
+                 grid_density=DEFAULT_GRID_DENSITY):
+        self.fig = fig
+        self.use_blit = blit
+        self._background = None
+        self._resize_cid = fig.canvas.mpl_connect('resize_event', self._on_resize)
+        # Buffer (quadros, d + 2, d): vetor original, vetor transformado e base.
+        # `buffer` permite animar caminhos já calculados (ex.: cadeias de matrizes)
+        if buffer is None:
+            buffer = engine.animation_frames(matrix, original_vector, frames, mode=interpolation)
+        self.frames = buffer
+        # Base canônica (linhas) exibida como referência estática
+        self.canonical_basis = np.eye(self.dim)
+        if projection is not None:
+            # R^d: todos os quadros projetados numa única multiplicação
+            self.frames = engine.project(self.frames, projection)
+            self.canonical_basis = np.asarray(projection).T
+            show_grid = False
+        self.original_frames = self.frames[:, engine.FRAME_ORIGINAL]
+        self.transformed_frames = self.frames[:, engine.FRAME_TRANSFORMED]
+        self.basis_frames = self.frames[:, engine.FRAME_BASIS:]
+        self.grid = None
+        self.build()
+        if projection is not None:
+            self.ax.set_title(f'Transformação Linear {len(projection[0])}D (projeção em 3D) - Animação')
+        if show_grid:
+            self.grid = DeformedGrid(self.ax, self.dim, grid_density)
+            self.grid.artist.set_animated(blit)
+        self.overlay = None
+        if analysis is not None and projection is None:
+            # Retas invariantes de A (destino da animação): fixas, ficam no fundo
+            self.overlay = AnalysisOverlay(self.ax, self.dim)
+            self.overlay.set_lines(analysis)
+            self.overlay.cell.set_animated(blit)
+            self.overlay.det_text.set_animated(blit)
+            # Quadrado/cubo unitário e det(M(t)) de todos os quadros num único cálculo
+            self.cell_frames = np.matmul(unit_cell_edges(self.dim),
+                                         self.basis_frames[:, np.newaxis])
+            self.det_frames = np.linalg.det(self.basis_frames)
+        self.layer = None
+        if dataset is not None and dataset.supports(len(self.basis_frames[0])):
+            # M(t) de cada quadro vem do buffer (em R^d, já projetada: P·M(t))
+            self.layer = DatasetLayer(self.ax, dataset, resolution=ANIMATION_WARP_RESOLUTION,
+                                      animated=blit)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def build(self):
+        raise NotImplementedError
+
+    def update_frame(self, frame):
+        raise NotImplementedError
+
+    def disconnect(self):
+        self.fig.canvas.mpl_disconnect(self._resize_cid)
+
+    def _on_resize(self, event):
+        self._background = None
+
+    def show_frame(self, frame):
+        # Exibe um quadro avulso (arraste da linha do tempo), fora da FuncAnimation
+        artists = self.update(frame)
+        canvas = self.fig.canvas
+        if not self.use_blit:
+            canvas.draw_idle()
+            return artists
+        if self._background is None:
+            for artist in artists:
+                artist.set_animated(True)
+            canvas.draw()
+            self._background = canvas.copy_from_bbox(self.fig.bbox)
+        canvas.restore_region(self._background)
+        for artist in artists:
+            self.ax.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+        return artists
+
+    def update(self, frame):
+        artists = self.update_frame(frame)
+        if self.grid is not None:
+            # M(t)ᵀ são as linhas do quadro da base: nenhuma álgebra extra
+            self.grid.set_matrix(self.basis_frames[frame].T)
+            artists = (self.grid.artist,) + artists
+        if self.layer is not None:
+            self.layer.set_matrix(self.basis_frames[frame].T)
+            artists = (self.layer.artist,) + artists
+        if self.overlay is not None:
+            self.overlay.set_cell(self.cell_frames[frame], self.basis_frames[frame].sum(axis=0) / 2,
+                                  self.det_frames[frame])
+            artists = artists + (self.overlay.cell, self.overlay.det_text)
+        return artists
+
+
+class AnimationScene2D(AnimationScene):
+    dim = 2
+
+    def build(self):
+        ax = self.ax = self.fig.add_subplot(111)
+        ax.set_xlim(-AXIS_LIMIT, AXIS_LIMIT)
+        ax.set_ylim(-AXIS_LIMIT, AXIS_LIMIT)
+        ax.axhline(0, color='black', linewidth=0.5)
+        ax.axvline(0, color='black', linewidth=0.5)
+        ax.grid(True)
+        ax.set_title('Transformação Linear - Animação')
+        ax.set_xlabel('Eixo X')
+        ax.set_ylabel('Eixo Y')
+
+        # Elementos de animação
+        style = dict(scale=1, scale_units='xy', angles='xy')
+        self.orig_vector_plot = ax.quiver(0, 0, 0, 0, color='blue', **style)
+        self.trans_vector_plot = ax.quiver(0, 0, 0, 0, color='red', **style)
+        self.base_x_plot = ax.quiver(0, 0, 0, 0, color='gray', **style)
+        self.base_y_plot = ax.quiver(0, 0, 0, 0, color='gray', **style)
+        self.trans_base_x_plot = ax.quiver(0, 0, 0, 0, color='green', linestyle='--', **style)
+        self.trans_base_y_plot = ax.quiver(0, 0, 0, 0, color='green', linestyle='--', **style)
+
+        # Adicionar legendas
+        ax.legend([self.orig_vector_plot, self.trans_vector_plot, self.trans_base_x_plot],
+                  ['Vetor Original', 'Vetor Transformado', 'Base Transformada'],
+                  loc='upper right')
+
+    def update_frame(self, frame):
+        # Vetor original (estático)
+        self.orig_vector_plot.set_UVC(*self.original_frames[frame])
+
+        # Base transformada animada
+        current_base_x, current_base_y = self.basis_frames[frame]
+        self.base_x_plot.set_UVC(*current_base_x)
+        self.base_y_plot.set_UVC(*current_base_y)
+        self.trans_base_x_plot.set_UVC(*current_base_x)
+        self.trans_base_y_plot.set_UVC(*current_base_y)
+
+        # Vetor transformado animado
+        self.trans_vector_plot.set_UVC(*self.transformed_frames[frame])
+
+        return (self.orig_vector_plot, self.trans_vector_plot, self.base_x_plot,
+                self.base_y_plot, self.trans_base_x_plot, self.trans_base_y_plot)
+
+
+class AnimationScene3D(AnimationScene):
+    dim = 3
+
+    def build(self):
+        ax = self.ax = self.fig.add_subplot(111, projection='3d')
+        ax.set_xlim(-AXIS_LIMIT, AXIS_LIMIT)
+        ax.set_ylim(-AXIS_LIMIT, AXIS_LIMIT)
+        ax.set_zlim(-AXIS_LIMIT, AXIS_LIMIT)
+        ax.set_title('Transformação Linear 3D - Animação')
+        ax.set_xlabel('Eixo X')
+        ax.set_ylabel('Eixo Y')
+        ax.set_zlabel('Eixo Z')
+
+        # Base canônica e vetor original são estáticos e ficam no fundo em cache;
+        # só a base transformada e o vetor transformado são redesenhados (blit)
+        base_vectors = self.canonical_basis
+        original_vector = self.original_frames[0]
+        ax.quiver(0, 0, 0, *base_vectors.T,
+                  color='gray', linestyle='-', linewidth=1, arrow_length_ratio=0.1)
+        ax.quiver(0, 0, 0, original_vector[0], original_vector[1], original_vector[2],
+                  color='blue', linewidth=2, arrow_length_ratio=0.1, label='Original')
+
+        # Artistas animados criados uma única vez
+        self.trans_base_plot = ax.quiver(0, 0, 0, *base_vectors.T,
+                                         color='green', linestyle='--', linewidth=1,
+                                         arrow_length_ratio=0.1, animated=self.use_blit)
+        self.trans_vector_plot = ax.quiver(0, 0, 0, original_vector[0], original_vector[1],
+                                           original_vector[2], color='red', linewidth=2,
+                                           arrow_length_ratio=0.1, label='Transformado',
+                                           animated=self.use_blit)
+        ax.legend()
+
+        if self.use_blit:
+            # A rotação com o mouse invalidaria o fundo em cache
+            ax.disable_mouse_rotation()
+
+        # Segmentos das setas de todos os quadros num único cálculo
+        self.base_segments = engine.arrow_segments_3d(self.basis_frames)
+        self.vector_segments = engine.arrow_segments_3d(self.transformed_frames[:, np.newaxis])
+
+    def update_frame(self, frame):
+        self.trans_base_plot.set_segments(self.base_segments[frame])
+        self.trans_vector_plot.set_segments(self.vector_segments[frame])
+        return self.trans_base_plot, self.trans_vector_plot
+
+    def update(self, frame):
+        artists = super().update(frame)
+        if self.use_blit:
+            # O blit desenha os artistas fora de Axes3D.draw, então a projeção é feita aqui
+            for artist in artists:
+                if hasattr(artist, 'do_3d_projection'):
+                    artist.do_3d_projection()
+        return artists
+
+
+class ColumnScene(AnimationScene):
+    # Passo a Passo por colunas: Av montado como v1·a1 + v2·a2 + …, com os termos
+    # encadeados (cauda na soma anterior) e o termo atual destacado. Quadros e
+    # textos de cada passo vêm do cache de engine.column_steps/column_step_texts:
+    # avançar ou voltar um passo só exibe outro quadro. Em R^d, tudo é projetado.
+    def __init__(self, fig, original_vector, matrix, frames_per_step=engine.COLUMN_STEP_FRAMES,
+                 blit=True, projection=None, on_step=None):
+        self.fig = fig
+        self.use_blit = blit
+        self._background = None
+        self._resize_cid = fig.canvas.mpl_connect('resize_event', self._on_resize)
+        self.on_step = on_step
+        self.frames_per_step = frames_per_step
+        self.source_dim = len(original_vector)
+
+        partial, self.steps, fractions = engine.column_steps(matrix, original_vector,
+                                                             frames_per_step)
+        self.texts = engine.column_step_texts(original_vector, matrix)
+        vector = np.asarray(original_vector, dtype=np.float64)
+        columns = np.asarray(matrix, dtype=np.float64).T
+        if projection is not None:
+            partial, vector, columns = (engine.project(x, projection)
+                                        for x in (partial, vector, columns))
+        self.dim = partial.shape[1]
+        self.tails = partial[:-1]
+        terms = np.diff(partial, axis=0)
+
+        # Por quadro, num único cálculo: termos já somados (os demais zerados),
+        # termo atual (parcial) a partir da soma anterior e a soma acumulada
+        current = np.maximum(self.steps - 1, 0)
+        done = np.arange(len(terms)) < current[:, np.newaxis]
+        self.done_frames = terms * done[..., np.newaxis]
+        self.current_tails = partial[current]
+        self.current_frames = terms[current] * fractions[:, np.newaxis]
+        self.frames = self.current_tails + self.current_frames
+
+        # Vista grande o bastante para o caminho inteiro da soma
+        extent = np.abs(np.concatenate([partial, columns, vector[np.newaxis]])).max()
+        self.limit = max(AXIS_LIMIT, float(np.ceil(extent * 1.1)))
+        self.frame = 0
+        self._shown_step = None
+        self.build(vector, columns)
+        if projection is not None:
+            self.ax.set_title(f'Av como soma das colunas de A ({self.source_dim}D, projeção em 3D)')
+
+    def step_count(self):
+        return len(self.texts) - 1
+
+    def step_frame(self, step):
+        # Quadro-chave do passo (0 a d termos inteiros)
+        return min(max(step, 0), self.step_count()) * self.frames_per_step
+
+    def neighbor_step(self, direction):
+        # Passo seguinte/anterior ao quadro atual (no meio de um termo, o mais próximo
+        # naquele sentido)
+        if direction > 0:
+            return self.frame // self.frames_per_step + 1
+        return -(-self.frame // self.frames_per_step) - 1
+
+    def build(self, vector, columns):
+        ax = self.ax = self.fig.add_subplot(111, projection='3d' if self.dim == 3 else None)
+        for set_lim in (ax.set_xlim, ax.set_ylim) + ((ax.set_zlim,) if self.dim == 3 else ()):
+            set_lim(-self.limit, self.limit)
+        ax.set_title('Av como soma das colunas de A')
+        ax.set_xlabel('Eixo X')
+        ax.set_ylabel('Eixo Y')
+        self.term_text = ax.text(*(0,) * self.dim, '', fontsize=11, color='darkorange',
+                                 ha='center', va='bottom', animated=self.use_blit)
+        if self.dim == 2:
+            self.build_2d(vector, columns)
+        else:
+            self.build_3d(vector, columns)
+
+    def build_2d(self, vector, columns):
+        ax = self.ax
+        ax.axhline(0, color='black', linewidth=0.5)
+        ax.axvline(0, color='black', linewidth=0.5)
+        ax.grid(True)
+
+        # Colunas de A e vetor original são estáticos (fundo em cache)
+        style = dict(angles='xy', scale_units='xy', scale=1)
+        zeros = np.zeros(len(columns))
+        columns_plot = ax.quiver(zeros, zeros, columns[:, 0], columns[:, 1], color='green',
+                                 alpha=0.35, width=0.006, **style)
+        vector_plot = ax.quiver(0, 0, *vector, color='blue', width=0.008, **style)
+
+        # minlength=0: termos ainda não somados (comprimento zero) não aparecem
+        dynamic = dict(minlength=0, animated=self.use_blit, **style)
+        self.done_plot = ax.quiver(self.tails[:, 0], self.tails[:, 1], zeros, zeros,
+                                   color='gray', width=0.008, **dynamic)
+        self.current_plot = ax.quiver(0, 0, 0, 0, color='darkorange', width=0.012, **dynamic)
+        self.sum_plot = ax.quiver(0, 0, 0, 0, color='red', width=0.010, **dynamic)
+        ax.legend([vector_plot, columns_plot, self.done_plot, self.current_plot, self.sum_plot],
+                  ['Vetor Original v', 'Colunas de A', 'Termos somados', 'Termo atual',
+                   'Soma parcial'], loc='upper right')
+
+    def build_3d(self, vector, columns):
+        ax = self.ax
+        ax.set_zlabel('Eixo Z')
+        origin = np.zeros((3, len(columns)))
+        ax.quiver(*origin, *columns.T, color='green', alpha=0.35, linewidth=1,
+                  arrow_length_ratio=0.1, label='Colunas de A')
+        ax.quiver(0, 0, 0, *vector, color='blue', linewidth=2, arrow_length_ratio=0.1,
+                  label='Vetor Original v')
+
+        # Segmentos das setas de todos os quadros: as setas partem da origem em
+        # arrow_segments_3d e são deslocadas para as caudas (hastes, pontas, pontas)
+        tails = np.tile(self.tails, (3, 1))[:, np.newaxis]
+        self.done_segments = engine.arrow_segments_3d(self.done_frames) + tails
+        self.current_segments = engine.arrow_segments_3d(self.current_frames[:, np.newaxis]) + \
+            self.current_tails[:, np.newaxis, np.newaxis]
+        self.sum_segments = engine.arrow_segments_3d(self.frames[:, np.newaxis])
+
+        from mpl_toolkits.mplot3d import art3d
+        self.done_plot = art3d.Line3DCollection(self.done_segments[0], colors='gray',
+                                                linewidths=2, label='Termos somados')
+        self.current_plot = art3d.Line3DCollection(self.current_segments[0], colors='darkorange',
+                                                   linewidths=3, label='Termo atual')
+        self.sum_plot = art3d.Line3DCollection(self.sum_segments[0], colors='red',
+                                               linewidths=2, label='Soma parcial')
+        for collection in (self.done_plot, self.current_plot, self.sum_plot):
+            collection.set_animated(self.use_blit)
+            ax.add_collection3d(collection, autolim=False)
+        ax.legend()
+        if self.use_blit:
+            # A rotação com o mouse invalidaria o fundo em cache
+            ax.disable_mouse_rotation()
+
+    def update(self, frame):
+        self.frame = frame
+        if self.dim == 2:
+            self.done_plot.set_UVC(*self.done_frames[frame].T)
+            self.current_plot.set_offsets(self.current_tails[frame])
+            self.current_plot.set_UVC(*self.current_frames[frame])
+            self.sum_plot.set_UVC(*self.frames[frame])
+        else:
+            self.done_plot.set_segments(self.done_segments[frame])
+            self.current_plot.set_segments(self.current_segments[frame])
+            self.sum_plot.set_segments(self.sum_segments[frame])
+
+        step = self.steps[frame]
+        _set_text(self.term_text, self.current_tails[frame] + self.current_frames[frame] / 2)
+        if step != self._shown_step:
+            # Rótulo no gráfico e texto da explicação trocam juntos, uma vez por termo
+            self._shown_step = step
+            self.term_text.set_text(f'v{step}·a{step}' if step else '')
+            if self.on_step is not None:
+                self.on_step(self.texts[step])
+
+        # Soma parcial por baixo: o termo atual fica visível quando os dois coincidem
+        artists = (self.sum_plot, self.done_plot, self.current_plot, self.term_text)
+        if self.dim == 3 and self.use_blit:
+            # O blit desenha os artistas fora de Axes3D.draw, então a projeção é feita aqui
+            for artist in artists:
+                if hasattr(artist, 'do_3d_projection'):
+                    artist.do_3d_projection()
+        return artists
+
+
+class BatchSummaryScene:
+    # Visão geral de um lote de pares (vetorlab_batch.PairBatch): dispersão de
+    # Av (duas primeiras componentes, amostra uniforme) e histograma de det(A),
+    # cada um num único artista. Só o marcador do par atual é dinâmico e é
+    # redesenhado por blit sobre o fundo em cache.
+    def __init__(self, fig, batch, index=0, blit=True):
+        self.fig = fig
+        self.batch = batch
+        self.use_blit = blit
+        self._background = None
+        self.ax, self.hist_ax = fig.subplots(1, 2)
+        ax, hist_ax = self.ax, self.hist_ax
+
+        # Cor única: o Agg desenha todos os marcadores de uma vez (cores por
+        # ponto caem no caminho genérico de coleções, várias vezes mais lento)
+        points = batch.results[batch.summary_indices(), :2]
+        ax.scatter(points[:, 0], points[:, 1], s=4, color='red', alpha=0.5, linewidths=0)
+        if batch.errors is None:
+            title = f'Av de {len(batch)} pares'
+        else:
+            title = f'Av: {batch.correct_count} de {len(batch)} respostas corretas'
+        ax.axhline(0, color='black', linewidth=0.5)
+        ax.axvline(0, color='black', linewidth=0.5)
+        ax.grid(True)
+        ax.set_title(title)
+        ax.set_xlabel('Componente 1')
+        ax.set_ylabel('Componente 2')
+
+        counts, edges = batch.det_histogram()
+        hist_ax.stairs(counts, edges, fill=True, color='purple', alpha=0.6)
+        hist_ax.grid(True)
+        hist_ax.set_title('Histograma de det(A)')
+        hist_ax.set_xlabel('det(A)')
+        hist_ax.set_ylabel('Pares')
+
+        self.marker, = ax.plot([], [], 'o', markersize=10, markerfacecolor='none',
+                               markeredgecolor='black', markeredgewidth=1.5, animated=blit)
+        self.det_line = hist_ax.axvline(0, color='black', linewidth=1.5, animated=blit)
+        self.index = index
+        self._set_marker(index)
+        self._draw_cid = fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def is_alive(self):
+        return self.ax in self.fig.axes
+
+    def show(self, visible=True):
+        for ax in (self.ax, self.hist_ax):
+            ax.set_visible(visible)
+
+    def disconnect(self):
+        self.fig.canvas.mpl_disconnect(self._draw_cid)
+
+    def _set_marker(self, index):
+        result = self.batch.results[index]
+        self.marker.set_data([result[0]], [result[1]])
+        det = self.batch.det[index]
+        self.det_line.set_xdata([det, det])
+        self.det_line.set_visible(bool(np.isfinite(det)))
+
+    def set_index(self, index):
+        self.index = index
+        self._set_marker(index)
+        if not self.use_blit:
+            return
+        if self._background is None:
+            self.fig.canvas.draw_idle()
+            return
+        canvas = self.fig.canvas
+        canvas.restore_region(self._background)
+        self.draw_dynamic()
+        canvas.blit(self.fig.bbox)
+
+    def draw_dynamic(self):
+        self.ax.draw_artist(self.marker)
+        if self.det_line.get_visible():
+            self.hist_ax.draw_artist(self.det_line)
+
+    def _on_draw(self, event):
+        if not self.use_blit or not self.is_alive():
+            return
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_dynamic()
+
+
+def _set_text_3d(text, position):
+    text.set_position((position[0], position[1]))
+    text.set_3d_properties(position[2], None)
+
+
+SCENE_CLASSES = {2: Scene2D, 3: Scene3D}
+ANIMATION_SCENE_CLASSES = {2: AnimationScene2D, 3: AnimationScene3D}
+
+
+def make_scene(fig, dim, view_axes=None, **kwargs):
+    # Cena do plot para qualquer dimensão: acima de 3D, projeção em 3D
+    if dim in SCENE_CLASSES:
+        return SCENE_CLASSES[dim](fig, **kwargs)
+    return ProjectedScene(fig, dim, view_axes=view_axes, **kwargs)
+
+
+def make_animation_scene(fig, original_vector, matrix, view_axes=None, **kwargs):
+    dim = len(original_vector)
+    if dim in ANIMATION_SCENE_CLASSES:
+        return ANIMATION_SCENE_CLASSES[dim](fig, original_vector, matrix, **kwargs)
+    projection = engine.projection_basis(matrix, 3, view_axes)
+    return AnimationScene3D(fig, original_vector, matrix, projection=projection, **kwargs)
+
+
+def make_column_scene(fig, original_vector, matrix, view_axes=None, **kwargs):
+    # Passo a Passo por colunas em qualquer dimensão: acima de 3D, projeção em 3D
+    projection = None
+    if len(original_vector) > 3:
+        projection = engine.projection_basis(matrix, 3, view_axes)
+    return ColumnScene(fig, original_vector, matrix, projection=projection, **kwargs)
@@ -0,0 +1,371 @@
+import argparse
+import asyncio
+import base64
+import collections
+import hashlib
+import io
+import json
+import os
+import sys
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import vetorlab_engine as engine
+from vetorlab_analysis import full_explanation
+from vetorlab_export import parse_matrix, parse_vector
+
+# Formatos de imagem servidos e tipo MIME de cada um
+IMAGE_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+# As entradas são arredondadas antes de virar chave: exercícios iguais
+# digitados com ruído de ponto flutuante caem na mesma entrada do cache
+KEY_DECIMALS = 6
+
+# Limites de uma requisição
+MAX_DIMENSION = 16
+MAX_BODY = 64 * 1024
+MAX_HEADER = 16 * 1024
+
+DEFAULT_CACHE_MB = 256
+DEFAULT_DPI = 100
+FIGSIZE = (7, 7)
+
+STATUS_TEXT = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large",
+               500: "Internal Server Error"}
+
+# Cenas já montadas em cada processo de renderização: como no update_plot do
+# app, a figura de cada (dimensão, eixos da vista) é criada uma vez e só os
+# dados mudam entre pedidos
+_worker_scenes = {}
+
+
+def _worker_scene(dim, view_axes):
+    key = (dim, view_axes)
+    scene = _worker_scenes.get(key)
+    if scene is None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from vetorlab_scene import make_scene
+
+        fig = Figure(figsize=FIGSIZE, tight_layout=True)
+        FigureCanvasAgg(fig)
+        scene = _worker_scenes[key] = make_scene(fig, dim, view_axes=view_axes, blit=False)
+    return scene
+
+
+def render_scene(vector, matrix, fmt="png", show_grid=False, view_axes=None, dpi=DEFAULT_DPI):
+    # Executado nos processos de trabalho: mesma cena e mesma explicação do app
+    transformed = engine.transform(matrix, vector)
+    scene = _worker_scene(len(vector), view_axes)
+    scene.show_grid = show_grid
+    scene.update(vector, transformed, matrix)
+    buffer = io.BytesIO()
+    scene.fig.savefig(buffer, format=fmt, dpi=dpi)
+    return {
+        "image": buffer.getvalue(),
+        "explanation": full_explanation(vector, matrix, transformed),
+        "result": transformed.tolist(),
+    }
+
+
+def _worker_ready():
+    return os.getpid()
+
+
+def normalize_request(params):
+    # Valida e arredonda os parâmetros; devolve (pedido canônico, chave)
+    try:
+        matrix = params["matrix"]
+        vector = params["vector"]
+        matrix = parse_matrix(matrix) if isinstance(matrix, str) else matrix
+        vector = parse_vector(vector) if isinstance(vector, str) else vector
+        matrix = np.round(np.asarray(matrix, dtype=np.float64), KEY_DECIMALS) + 0.0
+        vector = np.round(np.asarray(vector, dtype=np.float64), KEY_DECIMALS) + 0.0
+    except KeyError as e:
+        raise ValueError(f"Parâmetro obrigatório ausente: {e.args[0]}")
+    except (TypeError, ValueError):
+        raise ValueError("Matriz e vetor devem ser numéricos (ex.: matrix=0,-1;1,0&vector=1,2)")
+    # Escalares e arrays de formato errado também são recusados aqui (400)
+    if vector.ndim != 1 or matrix.shape != (len(vector), len(vector)):
+        raise ValueError("Dimensões incompatíveis entre vetor e matriz")
+    dim = len(vector)
+    if not 2 <= dim <= MAX_DIMENSION:
+        raise ValueError(f"Dimensão deve estar entre 2 e {MAX_DIMENSION}")
+    if not (np.isfinite(matrix).all() and np.isfinite(vector).all()):
+        raise ValueError("Valores devem ser finitos")
+
+    fmt = str(params.get("format", "png")).lower()
+    if fmt not in IMAGE_TYPES:
+        raise ValueError(f"Formato inválido: {fmt}")
+    show_grid = str(params.get("grid", "")).lower() in ("1", "true", "sim", "yes")
+    view_axes = params.get("view_axes")
+    if view_axes not in (None, ""):
+        try:
+            # Mesma convenção do app: eixos numerados a partir de 1
+            view_axes = tuple(int(a) - 1 for a in str(view_axes).replace(" ", "").split(","))
+        except ValueError:
+            raise ValueError("view_axes deve ser uma lista de três eixos, ex.: 1,2,3")
+        if dim <= 3 or len(view_axes) != 3 or len(set(view_axes)) != 3 or \
+                not all(0 <= a < dim for a in view_axes):
+            raise ValueError("view_axes deve ter três eixos distintos entre 1 e a dimensão")
+    else:
+        view_axes = None
+
+    request = {"matrix": matrix.tolist(), "vector": vector.tolist(), "format": fmt,
+               "grid": show_grid, "view_axes": view_axes}
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"))
+    return request, hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class RenderCache:
+    """Cache endereçado por conteúdo (chave = hash do pedido arredondado),
+    limitado em bytes com descarte LRU. Pedidos idênticos simultâneos
+    aguardam a mesma renderização em vez de renderizar de novo."""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_MB * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        if key in self._entries:
+            return
+        self._entries[key] = entry
+        self.size += len(entry["image"])
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self.size -= len(old["image"])
+
+    async def fetch(self, key, render):
+        # render: corrotina chamada só na primeira vez que a chave aparece
+        entry = self.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+        self.misses += 1
+        future = self._pending[key] = asyncio.ensure_future(render())
+        try:
+            entry = await asyncio.shield(future)
+        finally:
+            self._pending.pop(key, None)
+        self.put(key, entry)
+        return entry
+
+
+INDEX_PAGE = """<!DOCTYPE html>
+<html lang="pt-br"><head><meta charset="utf-8"><title>VetorLab</title></head>
+<body style="font-family: sans-serif; max-width: 760px; margin: auto">
+<h1>VetorLab</h1>
+<form id="f">
+Matriz (linhas separadas por ;) <input name="matrix" value="0,-1;1,0">
+Vetor <input name="vector" value="1,2">
+<label><input type="checkbox" name="grid" value="1"> Grade deformada</label>
+<button>Aplicar</button>
+</form>
+<img id="img" alt="" style="width: 100%">
+<pre id="txt"></pre>
+<script>
+document.getElementById("f").onsubmit = async (e) => {
+  e.preventDefault();
+  const params = new URLSearchParams(new FormData(e.target));
+  const r = await fetch("/api/render?" + params);
+  const data = await r.json();
+  if (!r.ok) { document.getElementById("txt").textContent = data.error; return; }
+  document.getElementById("img").src = data.image_url;
+  document.getElementById("txt").textContent = data.explanation;
+};
+</script>
+</body></html>
+"""
+
+
+class RenderService:
+    """Serviço HTTP local (asyncio) que renderiza cenas do VetorLab.
+
+    GET  /                      página simples para navegadores
+    GET  /api/render?matrix=..&vector=..[&format=png|svg][&grid=1][&view_axes=1,2,3][&inline=1]
+    POST /api/render            mesmo pedido em JSON
+         -> {"key", "result", "explanation", "image_url"[, "image_base64"]}
+    GET  /image/<chave>.<fmt>   imagem renderizada (imutável, ETag = chave)
+    GET  /health                estado do cache e dos trabalhadores
+    """
+
+    def __init__(self, workers=None, cache_mb=DEFAULT_CACHE_MB, dpi=DEFAULT_DPI):
+        self.workers = workers or os.cpu_count() or 1
+        self.dpi = dpi
+        self.cache = RenderCache(int(cache_mb * 2 ** 20))
+        self.executor = None
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        # Os processos de trabalho são criados antes de abrir o socket: criados no
+        # primeiro pedido (fork), herdariam o socket do servidor e o do cliente, e
+        # a resposta com "Connection: close" nunca chegaria ao fim do arquivo
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, _worker_ready)
+                               for _ in range(self.workers)))
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def render(self, request, key):
+        loop = asyncio.get_running_loop()
+        return await self.cache.fetch(key, lambda: loop.run_in_executor(
+            self.executor, render_scene, request["vector"], request["matrix"],
+            request["format"], request["grid"], request["view_axes"], self.dpi))
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                method, path, query, headers, body = await self.read_request(reader)
+            except ValueError as e:
+                await self.respond(writer, e.args[1] if len(e.args) > 1 else 400,
+                                   {"error": e.args[0]})
+                return
+            status, payload, extra = await self.dispatch(method, path, query, headers, body)
+            await self.respond(writer, status, payload, extra)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise ValueError("Cabeçalho muito grande", 413)
+        if len(head) > MAX_HEADER:
+            raise ValueError("Cabeçalho muito grande", 413)
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise ValueError("Linha de requisição inválida")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0) or 0)
+        if length > MAX_BODY:
+            raise ValueError("Corpo muito grande", 413)
+        body = await reader.readexactly(length) if length else b""
+        url = urllib.parse.urlsplit(target)
+        query = {k: v[-1] for k, v in urllib.parse.parse_qs(url.query).items()}
+        return method.upper(), url.path, query, headers, body
+
+    async def dispatch(self, method, path, query, headers, body):
+        if path == "/":
+            return 200, INDEX_PAGE.encode(), {"Content-Type": "text/html; charset=utf-8"}
+        if path == "/health":
+            return 200, {"workers": self.workers, "cached": len(self.cache),
+                         "cache_bytes": self.cache.size, "hits": self.cache.hits,
+                         "misses": self.cache.misses}, {}
+        if path == "/api/render":
+            if method == "POST":
+                try:
+                    query = dict(query, **json.loads(body or b"{}"))
+                except (ValueError, TypeError):
+                    return 400, {"error": "Corpo JSON inválido"}, {}
+            elif method != "GET":
+                return 405, {"error": "Use GET ou POST"}, {}
+            return await self.api_render(query)
+        if path.startswith("/image/"):
+            return self.image(path[len("/image/"):], headers)
+        return 404, {"error": "Caminho não encontrado"}, {}
+
+    async def api_render(self, params):
+        try:
+            request, key = normalize_request(params)
+        except ValueError as e:
+            return 400, {"error": str(e)}, {}
+        try:
+            entry = await self.render(request, key)
+        except Exception as e:
+            return 500, {"error": f"Falha na renderização: {e}"}, {}
+        payload = {"key": key, "result": entry["result"], "explanation": entry["explanation"],
+                   "image_url": f"/image/{key}.{request['format']}"}
+        if str(params.get("inline", "")).lower() in ("1", "true"):
+            payload["image_base64"] = base64.b64encode(entry["image"]).decode("ascii")
+        return 200, payload, {}
+
+    def image(self, name, headers):
+        key, _, fmt = name.partition(".")
+        entry = self.cache.get(key)
+        if entry is None or fmt not in IMAGE_TYPES:
+            # Imagens só existem depois de /api/render (ou foram descartadas do cache)
+            return 404, {"error": "Imagem não encontrada; refaça o pedido em /api/render"}, {}
+        extra = {"Content-Type": IMAGE_TYPES[fmt], "ETag": f'"{key}"',
+                 "Cache-Control": "public, max-age=31536000, immutable"}
+        if headers.get("if-none-match") == f'"{key}"':
+            return 304, b"", extra
+        return 200, entry["image"], extra
+
+    async def respond(self, writer, status, payload, extra=None):
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        headers.update(extra or {})
+        if not isinstance(payload, bytes):
+            payload = json.dumps(payload, ensure_ascii=False).encode()
+        headers["Content-Length"] = str(len(payload))
+        headers["Connection"] = "close"
+        head = f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n" + \
+            "".join(f"{name}: {value}\r\n" for name, value in headers.items()) + "\r\n"
+        writer.write(head.encode("latin-1") + payload)
+        await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8765, workers=None, cache_mb=DEFAULT_CACHE_MB,
+                dpi=DEFAULT_DPI):
+    service = RenderService(workers=workers, cache_mb=cache_mb, dpi=dpi)
+    address = await service.start(host, port)
+    print(f"VetorLab servindo em http://{address[0]}:{address[1]}/", flush=True)
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço local de renderização do VetorLab")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Endereço (use 0.0.0.0 para atender a sala inteira)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-mb", type=float, default=DEFAULT_CACHE_MB)
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.cache_mb, args.dpi))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+import argparse
+import csv
+import datetime
+import json
+import os
+import platform
+import queue
+import sqlite3
+import sys
+import threading
+
+# Banco padrão (pode ser trocado pela variável de ambiente VETORLAB_DB)
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".vetorlab", "questionario.db")
+
+# Escrita em lote: até BATCH_SIZE respostas por transação, ou o que chegou em
+# FLUSH_INTERVAL segundos
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    host TEXT,
+    class_label TEXT
+);
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    submitted_at TEXT NOT NULL,
+    dimension TEXT,
+    exercise TEXT
+);
+CREATE TABLE IF NOT EXISTS answers (
+    response_id INTEGER NOT NULL REFERENCES responses(id),
+    question INTEGER NOT NULL,
+    answer TEXT NOT NULL,
+    PRIMARY KEY (response_id, question)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS answers_question ON answers(question, answer);
+CREATE INDEX IF NOT EXISTS responses_session ON responses(session_id);
+CREATE INDEX IF NOT EXISTS sessions_class ON sessions(class_label);
+"""
+
+_STOP = object()
+
+
+def default_db_path():
+    return os.environ.get("VETORLAB_DB", DEFAULT_DB_PATH)
+
+
+def connect(path):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path)
+    # WAL: leitores (relatórios) não bloqueiam o gravador e vice-versa
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class QuestionnaireStore:
+    """Grava as respostas do questionário em SQLite sem bloquear a interface.
+
+    `submit` só enfileira; uma thread própria (dona da conexão) grava em lotes,
+    uma transação por lote. `close` grava o que estiver pendente.
+    """
+
+    def __init__(self, path=None, class_label=None):
+        self.path = path or default_db_path()
+        self.class_label = class_label
+        self.errors = []
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="vetorlab-store", daemon=True)
+        self._thread.start()
+
+    def submit(self, answers, dimension=None, exercise=None):
+        # answers: {número da pergunta: resposta}; exercise: dados serializáveis em JSON
+        self._queue.put((_now(), dimension, json.dumps(exercise) if exercise is not None else None,
+                         dict(answers)))
+
+    def flush(self, timeout=None):
+        # Espera até que tudo o que foi enfileirado esteja gravado
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self):
+        connection = None
+        try:
+            connection = connect(self.path)
+            with connection:
+                session_id = connection.execute(
+                    "INSERT INTO sessions (started_at, host, class_label) VALUES (?, ?, ?)",
+                    (_now(), platform.node(), self.class_label)).lastrowid
+            stop = False
+            while not stop:
+                batch, events, stop = self._next_batch()
+                if batch:
+                    self._write(connection, session_id, batch)
+                for event in events:
+                    event.set()
+        except (sqlite3.Error, OSError) as e:
+            self.errors.append(e)
+            # Sem banco: esvaziar a fila para que flush/close não fiquem esperando
+            while True:
+                item = self._queue.get()
+                if isinstance(item, threading.Event):
+                    item.set()
+                elif item is _STOP:
+                    break
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def _next_batch(self):
+        # Bloqueia até a primeira resposta e junta as que chegarem em seguida
+        batch, events = [], []
+        item = self._queue.get()
+        while True:
+            if item is _STOP:
+                return batch, events, True
+            if isinstance(item, threading.Event):
+                events.append(item)
+                return batch, events, False
+            batch.append(item)
+            if len(batch) >= BATCH_SIZE:
+                return batch, events, False
+            try:
+                item = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                return batch, events, False
+
+    def _write(self, connection, session_id, batch):
+        try:
+            with connection:
+                rows = []
+                for submitted_at, dimension, exercise, answers in batch:
+                    response_id = connection.execute(
+                        "INSERT INTO responses (session_id, submitted_at, dimension, exercise) "
+                        "VALUES (?, ?, ?, ?)",
+                        (session_id, submitted_at, dimension, exercise)).lastrowid
+                    rows.extend((response_id, int(q), str(a)) for q, a in answers.items())
+                connection.executemany(
+                    "INSERT INTO answers (response_id, question, answer) VALUES (?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            self.errors.append(e)
+
+
+def answer_distribution(path=None, class_label=None, since=None):
+    # Distribuição das respostas por pergunta numa única consulta agrupada
+    # (coberta pelo índice answers_question): {pergunta: {resposta: contagem}}
+    connection = connect(path or default_db_path())
+    try:
+        query = "SELECT a.question, a.answer, COUNT(*) FROM answers a"
+        where, params = [], []
+        if class_label is not None or since is not None:
+            query += " JOIN responses r ON r.id = a.response_id"
+            if class_label is not None:
+                query += " JOIN sessions s ON s.id = r.session_id"
+                where.append("s.class_label = ?")
+                params.append(class_label)
+            if since is not None:
+                where.append("r.submitted_at >= ?")
+                params.append(since)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " GROUP BY a.question, a.answer ORDER BY a.question, a.answer"
+        distribution = {}
+        for question, answer, count in connection.execute(query, params):
+            distribution.setdefault(question, {})[answer] = count
+        return distribution
+    finally:
+        connection.close()
+
+
+def format_distribution(distribution):
+    lines = []
+    for question, counts in distribution.items():
+        total = sum(counts.values())
+        lines.append(f"Pergunta {question} ({total} respostas)")
+        for answer, count in counts.items():
+            lines.append(f"  {answer}) {count:8d}  {count / total:6.1%}")
+    return "\n".join(lines)
+
+
+def write_distribution_csv(path, distribution):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["question", "answer", "count", "share"])
+        for question, counts in distribution.items():
+            total = sum(counts.values())
+            for answer, count in counts.items():
+                writer.writerow([question, answer, count, count / total])
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Relatório das respostas do questionário")
+    parser.add_argument("--db", default=None, help="Banco SQLite (padrão: VETORLAB_DB ou ~/.vetorlab)")
+    parser.add_argument("--turma", default=None, help="Filtrar por turma")
+    parser.add_argument("--since", default=None, help="Só respostas a partir desta data (AAAA-MM-DD)")
+    parser.add_argument("--csv", default=None, help="Gravar a distribuição em CSV")
+    args = parser.parse_args(argv)
+
+    distribution = answer_distribution(args.db, class_label=args.turma, since=args.since)
+    if not distribution:
+        print("Nenhuma resposta encontrada")
+        return 1
+    print(format_distribution(distribution))
+    if args.csv:
+        write_distribution_csv(args.csv, distribution)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
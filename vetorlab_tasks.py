@@ -0,0 +1,174 @@
+import concurrent.futures
+import itertools
+import queue
+import threading
+import time
+
+# Intervalo (ms) entre leituras da fila de resultados pelo Tk enquanto houver tarefas
+POLL_INTERVAL = 15
+
+# Tarefas mais rápidas que isto (s) não chegam a mostrar progresso (sem piscar o status)
+PROGRESS_DELAY = 0.15
+
+# Threads de cálculo: as operações pesadas do NumPy liberam o GIL
+DEFAULT_WORKERS = 2
+
+
+class TaskCancelled(Exception):
+    """Levantada por `Task.progress` quando a tarefa foi substituída ou cancelada."""
+
+
+class Task:
+    """Um pedido de cálculo em segundo plano.
+
+    A função da tarefa recebe a própria tarefa como primeiro argumento e pode
+    chamar `progress` entre etapas: além de informar o andamento, é ali que
+    um cálculo substituído é interrompido.
+    """
+
+    def __init__(self, key, label, results, on_discard=None):
+        self.key = key
+        self.label = label
+        self.on_discard = on_discard
+        self.started = time.perf_counter()
+        self._results = results
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def progress(self, fraction, message=None):
+        if self.cancelled:
+            raise TaskCancelled
+        self._results.put(("progress", self, (fraction, message)))
+
+
+class TaskRunner:
+    """Executa cálculos fora da thread do Tk para a janela nunca travar.
+
+    Há no máximo uma tarefa por chave: enviar outra com a mesma chave cancela
+    a anterior (se ainda não começou, não roda; se já está rodando, para no
+    próximo `progress`) e o resultado dela é descartado (passado a `on_discard`,
+    para soltar arquivos e memmaps que ninguém vai usar). Progresso, resultados
+    e erros voltam por uma fila lida com `root.after` (via ResourceManager),
+    então os callbacks rodam na thread do Tk e podem mexer em widgets e na
+    figura. As funções das tarefas só podem usar NumPy e dados próprios.
+    """
+
+    def __init__(self, resources, status_var=None, workers=DEFAULT_WORKERS,
+                 poll_interval=POLL_INTERVAL):
+        self.resources = resources
+        self.status_var = status_var
+        self.poll_interval = poll_interval
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="vetorlab-task")
+        self.results = queue.Queue()
+        self.active = {}
+        self._ids = itertools.count()
+
+    def __len__(self):
+        return len(self.active)
+
+    def submit(self, key, func, *args, on_done=None, on_error=None, on_discard=None,
+               label=None):
+        # on_done(resultado) / on_error(exceção) são chamados na thread do Tk;
+        # on_discard(resultado) recebe o resultado de uma tarefa substituída ou
+        # cancelada (em qualquer thread); `label` ativa o progresso no status_var
+        self.cancel(key)
+        task = Task(key, label, self.results, on_discard)
+        future = self.executor.submit(self._run, task, func, args)
+        self.active[key] = (task, future, on_done, on_error)
+        self._schedule_poll()
+        return task
+
+    def _run(self, task, func, args):
+        # Thread de trabalho: nada de Tk aqui, só a fila
+        if task.cancelled:
+            return
+        try:
+            result = func(task, *args)
+        except TaskCancelled:
+            return
+        except Exception as e:
+            self.results.put(("error", task, e))
+            return
+        if task.cancelled:
+            # Cancelada durante o último trecho: ninguém vai receber o resultado
+            self._discard(task, result)
+            return
+        self.results.put(("done", task, result))
+
+    def _discard(self, task, result):
+        if task.on_discard is not None:
+            task.on_discard(result)
+
+    def cancel(self, key):
+        entry = self.active.pop(key, None)
+        if entry is not None:
+            task, future = entry[:2]
+            task.cancel()
+            future.cancel()
+
+    def poll(self):
+        # Thread do Tk: entrega o que chegou e reagenda enquanto houver tarefas
+        while True:
+            try:
+                kind, task, payload = self.results.get_nowait()
+            except queue.Empty:
+                break
+            entry = self.active.get(task.key)
+            if entry is None or entry[0] is not task:
+                # Tarefa substituída ou cancelada: resultado descartado
+                if kind == "done":
+                    self._discard(task, payload)
+                continue
+            if kind == "progress":
+                self._show_progress(task, *payload)
+                continue
+            del self.active[task.key]
+            on_done, on_error = entry[2:]
+            if kind == "done":
+                if on_done is not None:
+                    on_done(payload)
+            elif on_error is not None:
+                on_error(payload)
+            elif self.status_var is not None:
+                self.status_var.set(f"Erro em {task.label or task.key}: {payload}")
+        if self.active:
+            self._schedule_poll()
+
+    def _schedule_poll(self):
+        if "tasks" not in self.resources.jobs:
+            self.resources.schedule("tasks", self.poll_interval, self.poll)
+
+    def _show_progress(self, task, fraction, message):
+        if self.status_var is None or task.label is None or \
+                time.perf_counter() - task.started < PROGRESS_DELAY:
+            return
+        self.status_var.set(f"{message or task.label}… {fraction:.0%}")
+
+    def drain(self, timeout=None):
+        # Espera as tarefas ativas e entrega os resultados sem o laço do Tk
+        # (execução sem janela: benchmarks e scripts)
+        futures = [entry[1] for entry in self.active.values()]
+        concurrent.futures.wait(futures, timeout)
+        self.resources.cancel("tasks")
+        self.poll()
+
+    def close(self):
+        # Tarefas ainda rodando descartam o resultado ao terminar; o que já
+        # estava na fila é descartado aqui
+        for key in list(self.active):
+            self.cancel(key)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        while True:
+            try:
+                kind, task, payload = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "done":
+                self._discard(task, payload)